@@ -4,7 +4,7 @@ from hail.api1 import HailContext, VariantDataset, KeyTable
 from hail.expr.types import Type, TInt32, TInt64, TFloat32, TFloat64, TSet, TString, TBoolean, TArray, TDict, TLocus, \
     TVariant, TAltAllele, TCall, TInterval, TStruct
 from hail.genetics import *
-from hail.utils import hadoop_read, hadoop_write, hadoop_copy, Struct
+from hail.utils import hadoop_read, hadoop_write, hadoop_copy, hadoop_copy_tree, Struct
 
 if sys.version_info >= (3, 0) or sys.version_info <= (2, 6):
     raise EnvironmentError('Hail requires Python 2.7, found {}.{}'.format(
@@ -41,6 +41,7 @@ __all__ = ['HailContext',
            'hadoop_read',
            'hadoop_write',
            'hadoop_copy',
+           'hadoop_copy_tree',
            'KinshipMatrix',
            'LDMatrix',
            ]
@@ -7,10 +7,11 @@ from hail.api1.dataset import VariantDataset
 from hail.api1.keytable import KeyTable
 from hail.expr.types import Type, TInt64, TDict, TString
 from hail.genetics.genomeref import GenomeReference
+from hail.genetics.interval import Interval
 from hail.history import *
 from hail.stats import UniformDist, TruncatedBetaDist, BetaDist
 from hail.typecheck import *
-from hail.utils import wrap_to_list, get_env_or_default
+from hail.utils import wrap_to_list, get_env_or_default, Profile
 from hail.utils.java import *
 
 
@@ -161,6 +162,34 @@ class HailContext(HistoryMixin):
         """
         return self._jhc.version()
 
+    @handle_py4j
+    def profile(self):
+        """Profile the Hail operations run within a ``with`` block.
+
+        **Examples**
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> with hc.profile() as p:
+            ...     vds = hc.import_vcf('data/sample.vcf').split_multi().sample_qc()
+            ...     vds.write('output/sample.vds', overwrite=True)
+            >>> print(p)
+            >>> p.slowest(3)
+            >>> p.export_chrome_trace('output/trace.json')
+
+        **Notes**
+
+        Each top-level Hail method call made inside the block is recorded with
+        its wall-clock duration and the Spark jobs it started. Each job also
+        records its stages, bytes shuffled, and input and output record counts.
+        The profile can be exported as JSON or in Chrome trace event format.
+
+        :rtype: :class:`.Profile`
+        """
+
+        return Profile()
+
     @property
     @record_property
     def default_reference(self):
@@ -211,8 +240,12 @@ class HailContext(HistoryMixin):
                       sample_file=nullable(strlike),
                       min_partitions=nullable(integral),
                       reference_genome=nullable(GenomeReference),
-                      contig_recoding=nullable(dictof(strlike, strlike)))
-    def import_bgen(self, path, tolerance=0.2, sample_file=None, min_partitions=None, reference_genome=None, contig_recoding=None):
+                      contig_recoding=nullable(dictof(strlike, strlike)),
+                      samples=nullable(listof(strlike)),
+                      intervals=nullable(oneof(Interval, listof(Interval))),
+                      dosage_only=bool)
+    def import_bgen(self, path, tolerance=0.2, sample_file=None, min_partitions=None, reference_genome=None, contig_recoding=None,
+                    samples=None, intervals=None, dosage_only=False):
         """Import .bgen file(s) as variant dataset.
         
         .. warning::
@@ -249,6 +282,29 @@ class HailContext(HistoryMixin):
 
           - :py:meth:`~hail.HailContext.import_bgen` normalizes all probabilities to sum to 1.0. Therefore, an input distribution of (0.98, 0.0, 0.0) will be stored as (1.0, 0.0, 0.0) in Hail.
 
+        **Reading part of a file**
+
+        ``samples`` restricts the dataset to the listed samples, in the order they appear in the files;
+        the genotype probabilities of the other samples are never decoded. ``intervals`` reads only the
+        variants in the given intervals, finding them by binary search over the ``.idx`` file instead of
+        scanning the files, so the variants of each file must be sorted by locus.
+
+        >>> vds = hc.import_bgen("data/example3.bgen", sample_file="data/example3.sample",
+        ...                      intervals=Interval.parse('1:1-100000')) # doctest: +SKIP
+
+        **Dosages only**
+
+        With ``dosage_only=True``, each genotype is imported as a struct with a single field
+        ``dosage`` (*Float32*), the expected number of alternate alleles, decoded directly from the
+        stored probabilities. No calls or probability arrays are built, which makes the dataset much
+        smaller and faster to import when only dosages are needed, for example for
+        :py:meth:`~hail.VariantDataset.linreg`:
+
+        >>> (hc.import_bgen("data/example3.bgen", sample_file="data/example3.sample", dosage_only=True)
+        ...    .linreg('sa.pheno.isCase', x='g.dosage')) # doctest: +SKIP
+
+        Dosages are missing for variants with more than two alleles.
+
         **Annotations**
 
         :py:meth:`~hail.HailContext.import_bgen` adds the following variant annotations:
@@ -276,6 +332,14 @@ class HailContext(HistoryMixin):
         :param contig_recoding: Dict of old contig name to new contig name. The new contig name must be in the reference genome given by ``reference_genome``.
         :type contig_recoding: dict of str to str (or None)
 
+        :param samples: Only import these samples.
+        :type samples: list of str or None
+
+        :param intervals: Only import variants in these intervals. An empty list imports no variants.
+        :type intervals: :class:`.Interval` or list of :class:`.Interval` or None
+
+        :param bool dosage_only: Import only the dosage of each genotype, as ``g.dosage``.
+
         :return: Variant dataset imported from .bgen file.
         :rtype: :class:`.VariantDataset`
         """
@@ -287,7 +351,10 @@ class HailContext(HistoryMixin):
 
         jvds = self._jhc.importBgens(jindexed_seq_args(path), joption(sample_file),
                                      tolerance, joption(min_partitions), rg._jrep,
-                                     joption(contig_recoding))
+                                     joption(contig_recoding),
+                                     joption(jindexed_seq(samples) if samples is not None else None),
+                                     joption(jindexed_seq([i._jrep for i in wrap_to_list(intervals)]) if intervals is not None else None),
+                                     dosage_only)
         return VariantDataset(self, jvds)
 
     @handle_py4j
@@ -381,9 +448,11 @@ class HailContext(HistoryMixin):
                       missing=strlike,
                       types=dictof(strlike, Type),
                       quote=nullable(char),
-                      reference_genome=nullable(GenomeReference))
+                      reference_genome=nullable(GenomeReference),
+                      impute_sample=nullable(integral))
     def import_table(self, paths, key=[], min_partitions=None, impute=False, no_header=False,
-                     comment=None, delimiter="\t", missing="NA", types={}, quote=None, reference_genome=None):
+                     comment=None, delimiter="\t", missing="NA", types={}, quote=None, reference_genome=None,
+                     impute_sample=None):
         """Import delimited text file (text table) as key table.
 
         The resulting key table will have no key columns, use :py:meth:`.KeyTable.key_by`
@@ -466,6 +535,11 @@ class HailContext(HistoryMixin):
         The ``impute`` option tells Hail to scan the file an extra time to gather
         information about possible field types. While this is a bit slower for large files, (the 
         file is parsed twice), the convenience is often worth this cost.
+
+        For large files, ``impute_sample`` limits imputation to the first
+        ``impute_sample`` lines of each partition, so only those lines are read
+        before the import itself. If a later line contradicts an imputed type, the
+        import fails; pass the type of that column in ``types``.
         
         The ``delimiter`` parameter is a field separator regex. This regex follows the 
          `Java regex standard <http://docs.oracle.com/javase/7/docs/api/java/util/regex/Pattern.html>`_.
@@ -526,6 +600,9 @@ class HailContext(HistoryMixin):
         :param reference_genome: Reference genome to use when imputing Variant or Locus columns. Default is :class:`~.HailContext.default_reference`.
         :type reference_genome: :class:`.GenomeReference`
 
+        :param impute_sample: Number of lines of each partition to impute types from. If None, impute from every line.
+        :type impute_sample: int or None
+
         :return: Key table constructed from text table.
         :rtype: :class:`.KeyTable`
         """
@@ -536,7 +613,7 @@ class HailContext(HistoryMixin):
         rg = reference_genome if reference_genome else self.default_reference
 
         jkt = self._jhc.importTable(paths, key, min_partitions, jtypes, comment, delimiter, missing,
-                                    no_header, impute, quote, rg._jrep)
+                                    no_header, impute, quote, rg._jrep, impute_sample)
         return KeyTable(self, jkt)
 
     @handle_py4j
@@ -706,9 +783,11 @@ class HailContext(HistoryMixin):
                       drop_samples=bool,
                       call_fields=oneof(strlike, listof(strlike)),
                       reference_genome=nullable(GenomeReference),
-                      contig_recoding=nullable(dictof(strlike, strlike)))
+                      contig_recoding=nullable(dictof(strlike, strlike)),
+                      intervals=nullable(oneof(Interval, listof(Interval))))
     def import_vcf(self, path, force=False, force_bgz=False, header_file=None, min_partitions=None,
-                   drop_samples=False, call_fields=[], reference_genome=None, contig_recoding=None):
+                   drop_samples=False, call_fields=[], reference_genome=None, contig_recoding=None,
+                   intervals=None):
         """Import VCF file(s) as variant dataset.
 
         **Examples**
@@ -728,6 +807,10 @@ class HailContext(HistoryMixin):
         it to Hail using the ``force`` optional parameter. However, this is not recommended -- all parsing will have to take place on one node because
         gzip decompression is not parallelizable. In this case, import could take significantly longer.
 
+        Block-compressed files are split on BGZF block boundaries and blocks are decompressed ahead of parsing.
+        Each partition finds the first block boundary of its byte range itself, so nothing is written next to
+        the input and the file is not scanned before import.
+
         If ``generic`` equals False (default), Hail makes certain assumptions about the genotype fields, see :class:`Representation <hail.representation.Genotype>`. On import, Hail filters
         (sets to no-call) any genotype that violates these assumptions. Hail interprets the format fields: GT, AD, OD, DP, GQ, PL; all others are
         silently dropped.
@@ -785,6 +868,21 @@ class HailContext(HistoryMixin):
             
             >>> pass_vds = vds.filter_variants_expr('va.filters.isEmpty()', keep=True)
 
+        .. note::
+
+            Reading intervals from indexed files:
+
+            If ``intervals`` is given, every file must be block compressed and have a tabix
+            index next to it (*file.tbi*, as created by ``tabix -p vcf file``). Only the
+            blocks of each file that overlap an interval are read, so importing a small
+            region of a large VCF is fast. Each group of overlapping intervals becomes one
+            partition per file and ``min_partitions`` is ignored. The result contains
+            exactly the variants whose position lies in an interval, as with
+            :py:meth:`.VariantDataset.filter_intervals`. CSI indices are not supported.
+
+            >>> vds = hc.import_vcf('data/sample2.vcf.gz',
+            ...                     intervals=Interval.parse('22:16050000-16060000')) # doctest: +SKIP
+
         **Annotations**
 
         - **va.filters** (*Set[String]*) -- Set containing all filters applied to a variant. 
@@ -824,6 +922,9 @@ class HailContext(HistoryMixin):
         :param contig_recoding: Dict of old contig name to new contig name. The new contig name must be in the reference genome given by ``reference_genome``.
         :type contig_recoding: dict of str to str (or None).
 
+        :param intervals: Only import variants in these intervals, using the files' tabix indices. An empty list imports no variants.
+        :type intervals: :class:`.Interval` or list of :class:`.Interval` or None
+
         :return: Variant dataset imported from VCF file(s)
         :rtype: :py:class:`.VariantDataset`
 
@@ -836,7 +937,8 @@ class HailContext(HistoryMixin):
         
         jvds = self._jhc.importVCFs(jindexed_seq_args(path), force, force_bgz, joption(header_file),
                                     joption(min_partitions), drop_samples, jset_args(call_fields), rg._jrep,
-                                    joption(contig_recoding))
+                                    joption(contig_recoding),
+                                    joption(jindexed_seq([i._jrep for i in wrap_to_list(intervals)]) if intervals is not None else None))
 
         return VariantDataset(self, jvds)
 
@@ -878,6 +980,33 @@ class HailContext(HistoryMixin):
                                                        missing,
                                                        has_row_id_name))
 
+    @handle_py4j
+    @record_method
+    @typecheck_method(path=strlike,
+                      min_partitions=nullable(integral))
+    def import_npy(self, path, min_partitions=None):
+        """Import a two-dimensional NumPy array saved with ``numpy.save``.
+
+        Each row of the array becomes a variant keyed by its row index (``Long``) and each column a
+        sample keyed by its column index (``Int``). The genotype schema is the array's element type:
+        ``Double`` for float64, ``Float`` for float32, ``Int`` for int32 and ``Long`` for int64.
+
+        Partitions read their rows straight from the file's byte range, so no parsing is involved.
+        The array must be stored in C (row-major) order; save others with
+        ``numpy.save(path, numpy.ascontiguousarray(a))``. To import an array in either order as a
+        :py:class:`~hail.linalg.BlockMatrix`, use :py:meth:`~hail.linalg.BlockMatrix.import_npy`.
+
+        :param str path: .npy file to read.
+
+        :param min_partitions: Number of partitions.
+        :type min_partitions: int or None
+
+        :return: Variant dataset imported from the array.
+        :rtype: :py:class:`.VariantDataset`
+        """
+
+        return VariantDataset(self, self._jhc.importNpy(path, joption(min_partitions)))
+
     @handle_py4j
     @typecheck_method(path=oneof(strlike, listof(strlike)))
     def index_bgen(self, path):
@@ -889,10 +1018,16 @@ class HailContext(HistoryMixin):
 
         >>> hc.index_bgen("data/example3.bgen")
 
+        Files whose index is already complete and newer than the file are skipped. Progress on
+        each file is saved to the directory ``<path>.idx.partial`` as it goes, each checkpoint
+        writing only the offsets found since the last, so an interrupted run picks up where it
+        stopped when called again.
+
         .. warning::
 
             While this method parallelizes over a list of BGEN files, each file is
-            indexed serially by one core. Indexing several BGEN files on a large
+            indexed serially by one core, since each variant block can only be found
+            from the length of the one before it. Indexing several BGEN files on a large
             cluster is a waste of resources, so indexing should generally be done
             as a one-time step separately from large analyses.
 
@@ -1056,6 +1191,45 @@ class HailContext(HistoryMixin):
         r, t = self.eval_expr_typed(expr)
         return r
 
+    @handle_py4j
+    @typecheck_method(path=strlike,
+                      max_size=integral)
+    def enable_import_cache(self, path, max_size):
+        """Cache imported text tables in the native key table format.
+
+        **Examples**
+
+        Cache imports in up to 50 GB of ``output/import_cache``:
+
+        >>> hc.enable_import_cache('output/import_cache', 50 * 1024 ** 3)
+        >>> table = hc.import_table('data/samples1.tsv', impute=True)
+        >>> hc.disable_import_cache()
+
+        **Notes**
+
+        Once enabled, :py:meth:`.import_table`, :py:meth:`.KeyTable.import_interval_list`,
+        :py:meth:`.KeyTable.import_bed` and :py:meth:`.KeyTable.import_fam` write each imported
+        table under ``path``, keyed by the path, size and modification time of every input
+        file and by the import arguments. Importing the same unchanged files with the same
+        arguments again reads the cached table instead of parsing and imputing types. A
+        modified input file gets a new entry.
+
+        When the cache grows beyond ``max_size`` bytes, the least recently used entries are
+        deleted.
+
+        :param str path: Directory of the cache.
+
+        :param int max_size: Maximum total size of the cache in bytes.
+        """
+
+        self._jhc.enableImportCache(path, max_size)
+
+    @handle_py4j
+    def disable_import_cache(self):
+        """Stop caching imported text tables. Entries already in the cache are kept."""
+
+        self._jhc.disableImportCache()
+
     def stop(self):
         """ Shut down the Hail context.
 
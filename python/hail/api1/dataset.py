@@ -727,7 +727,11 @@ class VariantDataset(HistoryMixin):
         locus object in variant annotations, for instance) for these types, then the ``vds_key`` argument 
         should be passed. This argument expects a list of expressions whose types match, in order, 
         the table's key types. Note that using ``vds_key`` is slower than annotation with a standard 
-        key type.
+        key type, unless the table is small.
+
+        Tables of at most a million rows, joined by ``vds_key`` or keyed by ``Variant`` or ``Interval``,
+        are collected and broadcast to every worker and joined without shuffling the dataset. Larger
+        interval tables are sorted and merged with the variants of each partition.
 
         Each expression in the list ``vds_key`` has the following symbols in
         scope:
@@ -1410,8 +1414,10 @@ class VariantDataset(HistoryMixin):
     @require_biallelic
     @write_history('output')
     @typecheck_method(output=strlike,
-                      fam_expr=strlike)
-    def export_plink(self, output, fam_expr='id = s'):
+                      fam_expr=strlike,
+                      per_contig=bool,
+                      parallelism=nullable(integral))
+    def export_plink(self, output, fam_expr='id = s', per_contig=False, parallelism=None):
         """Export variant dataset as `PLINK2 <https://www.cog-genomics.org/plink2/formats>`__ BED, BIM and FAM.
 
         .. include:: ../_templates/req_tvariant.rst
@@ -1424,6 +1430,10 @@ class VariantDataset(HistoryMixin):
 
         >>> vds.split_multi().export_plink('output/plink')
 
+        Export one fileset per contig, ``output/plink.20.bed`` and so on:
+
+        >>> vds.split_multi().export_plink('output/plink', per_contig=True)
+
         **Notes**
 
         ``fam_expr`` can be used to set the fields in the FAM file.
@@ -1466,22 +1476,35 @@ class VariantDataset(HistoryMixin):
           file may disagree.
         - PLINK uses the rsID for the BIM file ID.
 
+        The BED and BIM rows are written in a single pass over the dataset. When
+        ``per_contig`` is true, the filesets of all contigs are then assembled
+        concurrently, each with the same FAM file. Contigs without variants are
+        not written.
+
         A text file containing the python code to generate this output file is available at ``<output>.history.txt``.
 
         :param str output: Output file base.  Will write BED, BIM, and FAM files.
 
         :param str fam_expr: Expression for FAM file fields.
+
+        :param bool per_contig: If true, write one fileset per contig, with base ``<output>.<contig>``.
+
+        :param parallelism: Number of files assembled concurrently. Defaults to 16.
+        :type parallelism: int or None
         """
 
-        self._jvdf.exportPlink(output, fam_expr)
+        if parallelism is None:
+            parallelism = scala_object(Env.hail().utils.richUtils, 'RichHadoopConfiguration').defaultMergeParallelism()
+        self._jvdf.exportPlink(output, fam_expr, per_contig, parallelism)
 
     @handle_py4j
     @write_history('output', parallel_write='parallel')
     @typecheck_method(output=strlike,
                       append_to_header=nullable(strlike),
                       parallel=bool,
-                      metadata=nullable(dictof(strlike, dictof(strlike, dictof(strlike, strlike)))))
-    def export_vcf(self, output, append_to_header=None, parallel=False, metadata=None):
+                      metadata=nullable(dictof(strlike, dictof(strlike, dictof(strlike, strlike)))),
+                      tabix=bool)
+    def export_vcf(self, output, append_to_header=None, parallel=False, metadata=None, tabix=False):
         """Export variant dataset as a .vcf or .vcf.bgz file.
 
         .. include:: ../_templates/req_tvariant.rst
@@ -1492,6 +1515,10 @@ class VariantDataset(HistoryMixin):
 
         >>> vds.export_vcf('output/example.vcf.bgz')
 
+        Export to a block-compressed file with a tabix index, ``output/example.vcf.bgz.tbi``:
+
+        >>> vds.export_vcf('output/example.vcf.bgz', tabix=True)
+
         **Notes**
 
         :py:meth:`~hail.VariantDataset.export_vcf` writes the VDS to disk in VCF format as described in the `VCF 4.2 spec <https://samtools.github.io/hts-specs/VCFv4.2.pdf>`__.
@@ -1502,6 +1529,16 @@ class VariantDataset(HistoryMixin):
 
             We strongly recommended compressed (``.bgz`` extension) and parallel output (``parallel=True``) when exporting large VCFs.
 
+        Unless ``parallel`` is true, the files written by each partition are
+        concatenated into a single file by a pool of threads.
+
+        With ``tabix=True``, each partition indexes the records it writes, and the
+        indices are merged into a `tabix <http://www.htslib.org/doc/tabix.html>`__
+        index at ``<output>.tbi`` without reading the VCF again. On HDFS, the parts
+        are then joined with HDFS concat, which moves blocks rather than copying bytes. The output must be
+        block compressed, so ``output`` must end in ``.bgz`` or ``.gz``, and
+        ``parallel`` must be false.
+
         Hail exports the fields of Struct ``va.info`` as INFO fields,
         the elements of Set[String] ``va.filters`` as FILTERS, and the
         value of Float64 ``va.qual`` as QUAL. No other variant
@@ -1555,10 +1592,12 @@ class VariantDataset(HistoryMixin):
 
         :param metadata: Dictionary with information to fill in the VCF header. See :py:class:`~hail.api1.HailContext.get_vcf_metadata` for an example.
         :type metadata: (dict of str to (dict of str to (dict of str to str))) or None
+
+        :param bool tabix: If true, write a tabix index of the block-compressed output to ``<output>.tbi``.
         """
 
         typ = TDict(TString(), TDict(TString(), TDict(TString(), TString())))
-        self._jvds.exportVCF(output, joption(append_to_header), parallel, joption(typ._convert_to_j(metadata)))
+        self._jvds.exportVCF(output, joption(append_to_header), parallel, joption(typ._convert_to_j(metadata)), tabix)
 
     @handle_py4j
     @write_history('output', is_dir=True)
@@ -1585,6 +1624,38 @@ class VariantDataset(HistoryMixin):
 
         self._jvds.write(output, overwrite)
 
+    @handle_py4j
+    @typecheck_method(output=strlike)
+    def append_samples(self, output):
+        """Append the samples of this dataset to an existing VDS without rewriting it.
+
+        **Examples**
+
+        Import a new batch of samples and add them to a VDS written earlier:
+
+        >>> (hc.import_vcf('data/sample.vcf')
+        ...    .filter_samples_expr('s == "C1046::HG02024"')
+        ...    .write('output/batches.vds', overwrite=True))
+        >>> (hc.import_vcf('data/sample.vcf')
+        ...    .filter_samples_expr('s != "C1046::HG02024"')
+        ...    .append_samples('output/batches.vds'))
+
+        **Notes**
+
+        The genotypes of the new samples are written as a separate column group in ``<output>/columns``,
+        partitioned like the existing VDS. Reading the VDS lines the groups up with its variants, so the
+        result is a single dataset with the new samples after the existing ones.
+
+        The sample, sample annotation, variant and genotype schemas must match those of the VDS, and
+        no sample may already be present. The variants of the VDS do not change: genotypes of the new
+        samples at variants not in this dataset are missing, and variants of this dataset that are not
+        in the VDS are dropped.
+
+        :param str output: Path of the VDS to append to.
+        """
+
+        self._jvds.appendSamples(output)
+
     @handle_py4j
     @record_method
     @typecheck_method(expr=strlike,
@@ -2632,6 +2703,48 @@ class VariantDataset(HistoryMixin):
 
         return VariantDataset(self.hc, self._jvds.join(right._jvds))
 
+    @handle_py4j
+    @record_method
+    @typecheck_method(others=listof(vds_type),
+                      join_type=enumeration('inner', 'outer'))
+    def join_all(self, others, join_type='inner'):
+        """Join many variant datasets, concatenating their samples.
+
+        **Examples**
+
+        .. testsetup::
+
+            vds_batch1 = vds.rename_samples({s: s + '_1' for s in vds.sample_ids})
+            vds_batch2 = vds.rename_samples({s: s + '_2' for s in vds.sample_ids})
+
+        Combine cohort batches, keeping the variants in any batch:
+
+        >>> vds_joined = vds.join_all([vds_batch1, vds_batch2], join_type='outer')
+
+        **Notes**
+
+        All datasets are aligned by variant in a single pass, rather than by
+        joining them two at a time. With ``join_type='inner'``, the result has
+        the variants in every dataset; with ``join_type='outer'``, it has the
+        variants in any dataset, and the genotypes of the samples of datasets
+        without a variant are missing. Variant and global annotations are taken
+        from the first dataset with the variant, this dataset first.
+
+        The datasets must have distinct samples and the same sample, sample
+        annotation, variant, variant annotation and genotype schemas.
+
+        :param others: Datasets to join with this one, in sample order.
+        :type others: list of :py:class:`.VariantDataset`
+
+        :param str join_type: Join type, ``inner`` or ``outer``.
+
+        :return: Joined variant dataset
+        :rtype: :py:class:`.VariantDataset`
+        """
+
+        jvds = Env.hail().variant.VariantSampleMatrix.joinAll([self._jvds] + [d._jvds for d in others], join_type)
+        return VariantDataset(self.hc, jvds)
+
     @handle_py4j
     @record_method
     @typecheck(datasets=tupleof(vds_type))
@@ -2670,7 +2783,8 @@ class VariantDataset(HistoryMixin):
         The column annotations in the resulting dataset are simply the column annotations
         from the first dataset; the column annotation schemas do not need to match.
 
-        This method can trigger a shuffle, if partitions from two datasets overlap.
+        All datasets are combined in one pass without a shuffle: each partition of the result
+        merges, in variant order, the partitions of the datasets that overlap its range.
 
         :param vds_type: Datasets to combine.
         :type vds_type: tuple of :class:`.VariantDataset`
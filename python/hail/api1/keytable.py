@@ -409,6 +409,10 @@ class KeyTable(HistoryMixin):
 
         The scope for both ``key_expr`` and ``agg_expr`` is all column names in the input :class:`KeyTable`.
 
+        Each partition is aggregated by key before the shuffle. When the aggregations of a partition
+        outgrow the execution memory Spark grants its task, they are sorted by key and spilled to
+        local disk, so grouping by many keys does not run executors out of memory.
+
         For more information, see the documentation on writing :ref:`expressions <overview-expressions>`
         and using the `Hail Expression Language <https://hail.is/expr_lang.html>`__
 
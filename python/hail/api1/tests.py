@@ -3,6 +3,7 @@ Unit tests for Hail.
 """
 from __future__ import print_function  # Python 2 and 3 print compatibility
 
+import json
 import os
 import random
 import shutil
@@ -13,6 +14,7 @@ from hail.api1.keytable import asc, desc
 from hail.expr.types import *
 from hail.genetics import *
 from hail.utils import *
+from hail.utils.java import JavaBatch
 
 hc = None
 
@@ -62,6 +64,10 @@ class ContextTests(unittest.TestCase):
                             contig_recoding={"22": "chr22"}).split_multi()
 
         self.assertTrue(vcf.variants_table().forall("""v.contig == "chr22" """))
+
+        interval = Interval.parse('22:16050000-16100000')
+        self.assertEqual(hc.import_vcf(test_resources + '/sample2.vcf.gz', intervals=interval).count_variants(),
+                         hc.import_vcf(test_resources + '/sample2.vcf').filter_intervals(interval).count_variants())
         vcf.export_plink('/tmp/sample_plink')
 
         bfile = '/tmp/sample_plink'
@@ -105,6 +111,18 @@ class ContextTests(unittest.TestCase):
         matrix = hc.import_matrix(test_resources + '/samplematrix1.txt')
         self.assertEqual(matrix.count()[1], 10)
 
+    def test_import_plink(self):
+        bfile = 'src/test/resources/fastlmmTest'
+
+        plink = hc.import_plink(bfile + '.bed', bfile + '.bim', bfile + '.fam')
+        self.assertEqual(plink.count(), (250, 2000))
+        self.assertTrue(plink.variants_table().forall('v.contig == "1" || v.contig == "3"'))
+
+        plink = hc.import_plink(bfile + '.bed', bfile + '.bim', bfile + '.fam',
+                                min_partitions=4, contig_recoding={'1': '2'})
+        self.assertTrue(plink.variants_table().forall('v.contig == "2" || v.contig == "3"'))
+        self.assertEqual(plink.count_variants(), 2000)
+
     def test_dataset(self):
         test_resources = 'src/test/resources'
 
@@ -794,6 +812,30 @@ class ContextTests(unittest.TestCase):
         reqint2 = TInt32(required=True)
         self.assertEqual(id(reqint), id(reqint2))
 
+        # types are rebuilt from the JVM string representation
+        odd_names = TStruct(['a b', '`x`', u'\u00e9', 'd'],
+                            [TDict(TString(), TArray(TInt32(required=True))), TLocus(), TStruct([], []),
+                             TStruct(['e'], [TSet(TCall())], required=True)])
+        # toString marks required structs with "!!", so types are sent in their compact pretty form
+        required_structs = [TStruct(['a', 'b'], [TInt32(), TString()], required=True),
+                            TArray(TStruct(['a'], [TInt32(required=True)], required=True)),
+                            TSet(TStruct(['a'], [TFloat64()], required=True), required=True),
+                            TDict(TStruct(['k'], [TString()], required=True),
+                                  TArray(TStruct(['v'], [TInt64()], required=True)))]
+        odd_identifiers = TStruct(['$a', 'a$b', 'a\nb', 'a\tb\x01', 'a"b', 'a\\b', u'\u00e9\u2603'],
+                                  [TInt32()] * 7)
+        for t in some_random_types + [odd_names, odd_identifiers] + required_structs:
+            self.assertEqual(Type._from_java(t._jtype), t)
+            self.assertEqual(Type._from_string(t._jtype.toPrettyString(0, True))._jtype, t._jtype)
+            self.assertTrue(Type._from_java(t._jtype) is Type._from_java(t._jtype))
+            self.assertEqual(str(Type._from_java(t._jtype)), t._jtype.toPrettyString(0, True))
+            self.assertEqual(Type._from_java(t._jtype).pretty(2), t._jtype.toPrettyString(2, False))
+
+        for t in required_structs:
+            kt = KeyTable.parallelize([], TStruct(['x'], [t]))
+            self.assertEqual(JavaBatch(kt._jkt).call('signature', Type._from_string).flush()[0],
+                             TStruct(['x'], [t]))
+
     def test_query(self):
         vds = hc.import_vcf('src/test/resources/sample.vcf').split_multi().sample_qc()
 
@@ -955,6 +997,32 @@ class ContextTests(unittest.TestCase):
 
         self.assertEqual(b, b2)
 
+        hadoop_copy_tree('src/test/resources/sample.vds', '/tmp/sample.copy.vds', parallelism=4)
+        self.assertEqual(hc.read('/tmp/sample.copy.vds').count(), hc.read('src/test/resources/sample.vds').count())
+
+    def test_profile(self):
+        with hc.profile() as p:
+            vds = hc.import_vcf('src/test/resources/sample.vcf')
+            vds.count()
+
+        names = [c.name for c in p.calls]
+        self.assertEqual(names, ['HailContext.import_vcf', 'VariantDataset.count'])
+        self.assertTrue(len(p.calls[1].job_ids) > 0)
+        self.assertTrue(all(c.duration >= 0 for c in p.calls))
+
+        # jobs are credited to the call that started them, even when their events arrive late
+        with hc.profile() as p2:
+            vds.count()
+            hc.eval_expr('1 + 1')
+            vds.count_variants()
+        self.assertEqual([len(c.job_ids) > 0 for c in p2.calls], [True, False, True])
+        self.assertFalse(set(p2.calls[0].job_ids) & set(p2.calls[2].job_ids))
+        self.assertFalse(set(p.calls[1].job_ids) & set(p2.calls[0].job_ids))
+
+        p.export_chrome_trace('/tmp/profile_trace.json')
+        with open('/tmp/profile_trace.json') as f:
+            self.assertTrue(len(json.load(f)['traceEvents']) >= 2)
+
     def test_pedigree(self):
 
         ped = Pedigree.read('src/test/resources/sample.fam')
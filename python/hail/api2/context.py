@@ -5,7 +5,7 @@ from pyspark import SparkContext
 import hail
 from hail.expr.types import Type
 from hail.history import *
-from hail.genetics import GenomeReference
+from hail.genetics import GenomeReference, Interval
 from hail.stats.distributions import UniformDist, TruncatedBetaDist, BetaDist
 from hail.typecheck import *
 from hail.utils.java import *
@@ -38,6 +38,9 @@ class HailContext(HistoryMixin):
     def version(self):
         return self._hc1.version
 
+    def profile(self):
+        return self._hc1.profile()
+
     @handle_py4j
     @typecheck_method(regex=strlike,
                       path=oneof(strlike, listof(strlike)),
@@ -51,9 +54,14 @@ class HailContext(HistoryMixin):
                       tolerance=numeric,
                       sample_file=nullable(strlike),
                       min_partitions=nullable(integral),
-                      reference_genome=nullable(GenomeReference))
-    def import_bgen(self, path, tolerance=0.2, sample_file=None, min_partitions=None, reference_genome=None):
-        return self._hc1.import_bgen(path, tolerance, sample_file, min_partitions, reference_genome).to_hail2()
+                      reference_genome=nullable(GenomeReference),
+                      samples=nullable(listof(strlike)),
+                      intervals=nullable(oneof(Interval, listof(Interval))),
+                      dosage_only=bool)
+    def import_bgen(self, path, tolerance=0.2, sample_file=None, min_partitions=None, reference_genome=None,
+                    samples=None, intervals=None, dosage_only=False):
+        return self._hc1.import_bgen(path, tolerance, sample_file, min_partitions, reference_genome,
+                                     samples=samples, intervals=intervals, dosage_only=dosage_only).to_hail2()
 
     @handle_py4j
     @record_method
@@ -78,11 +86,14 @@ class HailContext(HistoryMixin):
                       missing=strlike,
                       types=dictof(strlike, Type),
                       quote=nullable(char),
-                      reference_genome=nullable(GenomeReference))
+                      reference_genome=nullable(GenomeReference),
+                      impute_sample=nullable(int))
     def import_table(self, paths, key=[], min_partitions=None, impute=False, no_header=False,
-                     comment=None, delimiter="\t", missing="NA", types={}, quote=None, reference_genome=None):
+                     comment=None, delimiter="\t", missing="NA", types={}, quote=None, reference_genome=None,
+                     impute_sample=None):
         return self._hc1.import_table(paths, key, min_partitions, impute, no_header, comment,
-                                      delimiter, missing, types, quote, reference_genome).to_hail2()
+                                      delimiter, missing, types, quote, reference_genome,
+                                      impute_sample).to_hail2()
 
     @handle_py4j
     @record_method
@@ -117,11 +128,12 @@ class HailContext(HistoryMixin):
                       min_partitions=nullable(integral),
                       drop_samples=bool,
                       call_fields=oneof(strlike, listof(strlike)),
-                      reference_genome=nullable(GenomeReference))
+                      reference_genome=nullable(GenomeReference),
+                      intervals=nullable(oneof(Interval, listof(Interval))))
     def import_vcf(self, path, force=False, force_bgz=False, header_file=None, min_partitions=None,
-                   drop_samples=False, call_fields=[], reference_genome=None):
+                   drop_samples=False, call_fields=[], reference_genome=None, intervals=None):
         return self._hc1.import_vcf(path, force, force_bgz, header_file, min_partitions,
-                                   drop_samples, call_fields, reference_genome).to_hail2()
+                                   drop_samples, call_fields, reference_genome, intervals=intervals).to_hail2()
 
 
     @handle_py4j
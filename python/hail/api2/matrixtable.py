@@ -1,7 +1,7 @@
 from __future__ import print_function  # Python 2 and 3 print compatibility
 
 from hail.expr.expression import *
-from hail.utils.java import handle_py4j
+from hail.utils.java import handle_py4j, JavaBatch
 from hail.api2 import Table
 
 
@@ -134,6 +134,17 @@ class MatrixTable(object):
         self._reserved = {'v', 's'}
         self._fields = {}
 
+        (self._global_schema, self._colkey_schema, self._sa_schema,
+         self._rowkey_schema, self._va_schema, self._genotype_schema) = (
+            JavaBatch(jvds)
+                .call('globalSignature', Type._from_string)
+                .call('sSignature', Type._from_string)
+                .call('saSignature', Type._from_string)
+                .call('vSignature', Type._from_string)
+                .call('vaSignature', Type._from_string)
+                .call('genotypeSignature', Type._from_string)
+                .flush())
+
         assert isinstance(self.global_schema, TStruct), self.col_schema
         assert isinstance(self.col_schema, TStruct), self.col_schema
         assert isinstance(self.row_schema, TStruct), self.row_schema
@@ -648,6 +659,11 @@ class MatrixTable(object):
     def write(self, output, overwrite=False):
         self._jvds.write(output, overwrite)
 
+    @handle_py4j
+    @typecheck_method(output=strlike)
+    def append_cols(self, output):
+        self._jvds.appendSamples(output)
+
     @handle_py4j
     def rows_table(self):
         kt = Table(self._hc, self._jvds.variantsKT())
@@ -228,6 +228,11 @@ class Table(TableTemplate):
 
     def __init__(self, hc, jkt):
         super(Table, self).__init__(hc, jkt)
+        self._schema, self._global_schema = (
+            JavaBatch(jkt)
+                .call('signature', Type._from_string)
+                .call('globalSignature', Type._from_string)
+                .flush())
         self._global_indices = Indices(axes=set(), source=self)
         self._row_axis = 'row'
         self._row_indices = Indices(axes={self._row_axis}, source=self)
@@ -1,4 +1,5 @@
 import abc
+import unicodedata
 
 from hail.history import *
 from hail.typecheck import *
@@ -54,6 +55,7 @@ class Type(HistoryMixin):
 
     def __init__(self, jtype):
         self._jtype = jtype
+        self._cached_jstr = None
         self.required = jtype.required()
         super(Type, self).__init__()
 
@@ -64,16 +66,16 @@ class Type(HistoryMixin):
         return self._jtype.toString()
 
     def __str__(self):
-        return self._jtype.toPrettyString(0, True)
+        return self._jstr
 
     def __eq__(self, other):
-        return isinstance(other, Type) and self._jtype.equals(other._jtype)
+        return isinstance(other, Type) and self._jstr == other._jstr
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
-        return self._jtype.hashCode()
+        return hash(self._jstr)
 
     def pretty(self, indent=0):
         """Returns a prettily formatted string representation of the type.
@@ -83,32 +85,56 @@ class Type(HistoryMixin):
         :rtype: str
         """
 
-        return self._jtype.toPrettyString(indent, False)
+        return self._jstr
+
+    @property
+    def _jtype(self):
+        if self._cached_jtype is None:
+            self._cached_jtype = Env.hail().expr.Parser.parseType(self._jstr)
+        return self._cached_jtype
+
+    @_jtype.setter
+    def _jtype(self, jtype):
+        self._cached_jtype = jtype
+
+    @property
+    def _jstr(self):
+        """Canonical (compact) string representation of the type, as printed by the JVM."""
+        if self._cached_jstr is None:
+            self._cached_jstr = self._jtype.toPrettyString(0, True)
+        return self._cached_jstr
 
     @classmethod
     def _from_java(cls, jtype):
-        # FIXME string matching is pretty hacky
-        class_name = jtype.getClass().getCanonicalName()
-
-        if class_name in _intern_classes:
-            type, required = _intern_classes[class_name]
-            return type(required)
-        elif class_name == 'is.hail.expr.TArray':
-            return TArray._from_java(jtype)
-        elif class_name == 'is.hail.expr.TSet':
-            return TSet._from_java(jtype)
-        elif class_name == 'is.hail.expr.TDict':
-            return TDict._from_java(jtype)
-        elif class_name == 'is.hail.expr.TStruct':
-            return TStruct._from_java(jtype)
-        elif class_name == 'is.hail.expr.TVariant':
-            return TVariant._from_java(jtype)
-        elif class_name == 'is.hail.expr.TLocus':
-            return TLocus._from_java(jtype)
-        elif class_name == 'is.hail.expr.TInterval':
-            return TInterval._from_java(jtype)
-        else:
-            raise TypeError("unknown type class: '%s'" % class_name)
+        t = Type._from_string(jtype.toPrettyString(0, True))
+        if t._cached_jtype is None:
+            t._jtype = jtype
+        return t
+
+    @classmethod
+    def _from_string(cls, s):
+        """Build a type from its JVM string representation, without calling back into the JVM
+        for nested fields. The JVM type of each node is only materialized if needed.
+
+        Parsed types are interned by string, so fetching the same schema again is free.
+        """
+        t = _type_cache.get(s)
+        if t is None:
+            t = _TypeParser(s).parse()
+            _type_cache[s] = t
+            _type_cache.setdefault(t._jstr, t)
+        return t
+
+    @classmethod
+    def _from_parsed(cls, jstr, required, **attrs):
+        t = cls.__new__(cls)
+        for k, v in attrs.items():
+            setattr(t, k, v)
+        t._cached_jstr = jstr
+        t._cached_jtype = None
+        t.required = required
+        super(Type, t).__init__()
+        return t
 
     @abc.abstractmethod
     def _typecheck(self, annotation):
@@ -366,15 +392,6 @@ class TArray(Type):
         self.element_type = element_type
         super(TArray, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        t = TArray.__new__(cls)
-        t.element_type = Type._from_java(jtype.elementType())
-        t._jtype = jtype
-        t.required = jtype.required()
-        super(Type, t).__init__()
-        return t
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             lst = Env.jutils().iterableToArrayList(annotation)
@@ -402,6 +419,9 @@ class TArray(Type):
     def _repr(self):
         return "TArray({})".format(repr(self.element_type))
 
+    def pretty(self, indent=0):
+        return u"{}Array[{}]".format("!" if self.required else "", self.element_type.pretty(indent))
+
 
 class TSet(Type):
     """
@@ -428,15 +448,6 @@ class TSet(Type):
         self.element_type = element_type
         super(TSet, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        t = TSet.__new__(cls)
-        t.element_type = Type._from_java(jtype.elementType())
-        t._jtype = jtype
-        t.required = jtype.required()
-        super(Type, t).__init__()
-        return t
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             lst = Env.jutils().iterableToArrayList(annotation)
@@ -465,6 +476,9 @@ class TSet(Type):
     def _repr(self):
         return "TSet({})".format(repr(self.element_type))
 
+    def pretty(self, indent=0):
+        return u"{}Set[{}]".format("!" if self.required else "", self.element_type.pretty(indent))
+
 
 class TDict(Type):
     """
@@ -493,16 +507,6 @@ class TDict(Type):
         self.value_type = value_type
         super(TDict, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        t = TDict.__new__(cls)
-        t.key_type = Type._from_java(jtype.keyType())
-        t.value_type = Type._from_java(jtype.valueType())
-        t._jtype = jtype
-        t.required = jtype.required()
-        super(Type, t).__init__()
-        return t
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             lst = Env.jutils().iterableToArrayList(annotation)
@@ -535,6 +539,10 @@ class TDict(Type):
     def _repr(self):
         return "TDict({}, {})".format(repr(self.key_type), repr(self.value_type))
 
+    def pretty(self, indent=0):
+        return u"{}Dict[{}, {}]".format("!" if self.required else "",
+                                       self.key_type.pretty(indent), self.value_type.pretty(indent))
+
 class Field(object):
     """
     Helper class for :class:`.TStruct`.
@@ -600,20 +608,6 @@ class TStruct(Type):
         jtype = scala_object(Env.hail().expr, 'TStruct').apply(jindexed_seq(jfields), required)
         return TStruct._from_java(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        struct = TStruct.__new__(cls)
-        struct._init_from_java(jtype)
-        struct._jtype = jtype
-        struct.required = jtype.required()
-        super(Type, struct).__init__()
-        return struct
-
-    def _init_from_java(self, jtype):
-
-        jfields = Env.jutils().iterableToArrayList(jtype.fields())
-        self.fields = [Field(f.name(), Type._from_java(f.typ())) for f in jfields]
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             d = dict()
@@ -651,6 +645,15 @@ class TStruct(Type):
         types = [fd.typ for fd in self.fields]
         return "TStruct({}, {})".format(repr(list(names)), repr(list(types)))
 
+    def pretty(self, indent=0):
+        req = "!" if self.required else ""
+        if not self.fields:
+            return req + "Empty"
+        fields = u",\n".join(u"{}{}: {}".format(" " * (indent + 4), _pretty_identifier(f.name),
+                                                  f.typ.pretty(indent + 4))
+                             for f in self.fields)
+        return u"{}Struct{{\n{}\n{}}}".format(req, fields, " " * indent)
+
     def _merge(self, other):
         return TStruct._from_java(self._jtype.merge(other._jtype)._1())
 
@@ -683,15 +686,6 @@ class TVariant(Type):
         jtype = scala_object(Env.hail().expr, 'TVariant').apply(self._rg._jrep, required)
         super(TVariant, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        v = TVariant.__new__(cls)
-        v._jtype = jtype
-        v._rg = genetics.GenomeReference._from_java(jtype.gr())
-        v.required = jtype.required()
-        super(Type, v).__init__()
-        return v
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             return genetics.Variant._from_java(annotation, self._rg)
@@ -824,15 +818,6 @@ class TLocus(Type):
         jtype = scala_object(Env.hail().expr, 'TLocus').apply(self._rg._jrep, required)
         super(TLocus, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        l = TLocus.__new__(cls)
-        l._jtype = jtype
-        l._rg = genetics.GenomeReference._from_java(jtype.gr())
-        l.required = jtype.required()
-        super(Type, l).__init__()
-        return l
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             return genetics.Locus._from_java(annotation, self._rg)
@@ -886,15 +871,6 @@ class TInterval(Type):
         jtype = scala_object(Env.hail().expr, 'TInterval').apply(self._rg._jrep, required)
         super(TInterval, self).__init__(jtype)
 
-    @classmethod
-    def _from_java(cls, jtype):
-        i = TInterval.__new__(cls)
-        i._jtype = jtype
-        i._rg = genetics.GenomeReference._from_java(jtype.gr())
-        i.required = jtype.required()
-        super(Type, i).__init__()
-        return i
-
     def _convert_to_py(self, annotation):
         if annotation is not None:
             return genetics.Interval._from_java(annotation, self._rg)
@@ -926,22 +902,203 @@ class TInterval(Type):
         """
         return self._rg
 
-_intern_classes = {'is.hail.expr.TInt32Optional$': (TInt32, False),
-                   'is.hail.expr.TInt32Required$': (TInt32, True),
-                   'is.hail.expr.TInt64Optional$': (TInt64, False),
-                   'is.hail.expr.TInt64Required$': (TInt64, True),
-                   'is.hail.expr.TFloat32Optional$': (TFloat32, False),
-                   'is.hail.expr.TFloat32Required$': (TFloat32, True),
-                   'is.hail.expr.TFloat64Optional$': (TFloat64, False),
-                   'is.hail.expr.TFloat64Required$': (TFloat64, True),
-                   'is.hail.expr.TBooleanOptional$': (TBoolean, False),
-                   'is.hail.expr.TBooleanRequired$': (TBoolean, True),
-                   'is.hail.expr.TStringOptional$': (TString, False),
-                   'is.hail.expr.TStringRequired$': (TString, True),
-                   'is.hail.expr.TAltAlleleOptional$': (TAltAllele, False),
-                   'is.hail.expr.TAltAlleleRequired$': (TAltAllele, True),
-                   'is.hail.expr.TCallOptional$': (TCall, False),
-                   'is.hail.expr.TCallRequired$': (TCall, True)}
+_intern_types = {'Int32': TInt32,
+                 'Int64': TInt64,
+                 'Float32': TFloat32,
+                 'Float64': TFloat64,
+                 'Boolean': TBoolean,
+                 'String': TString,
+                 'AltAllele': TAltAllele,
+                 'Call': TCall}
+
+_type_cache = {}
+
+_reference_genomes = {}
+
+
+def _reference_genome(name):
+    if name not in _reference_genomes:
+        _reference_genomes[name] = genetics.GenomeReference._from_java(
+            Env.hail().variant.GenomeReference.getReference(name))
+    return _reference_genomes[name]
+
+
+_escapes = {'\\': '\\', "'": "'", '"': '"', '`': '`', 'r': '\r', 'f': '\f', 't': '\t', 'n': '\n', 'b': '\b'}
+
+# Unicode categories of the characters Java's Character.isJavaIdentifierStart and
+# Character.isJavaIdentifierPart accept
+_java_identifier_start_categories = frozenset(['Lu', 'Ll', 'Lt', 'Lm', 'Lo', 'Nl', 'Sc', 'Pc'])
+_java_identifier_part_categories = _java_identifier_start_categories | frozenset(['Nd', 'Mn', 'Mc', 'Cf'])
+
+
+def _is_java_identifier_ignorable(c):
+    n = ord(c)
+    return 0 <= n <= 0x8 or 0xe <= n <= 0x1b or 0x7f <= n <= 0x9f
+
+
+def _is_java_identifier(name):
+    """Whether ``name`` matches ``\\p{javaJavaIdentifierStart}\\p{javaJavaIdentifierPart}*``, as in Scala's
+    ``prettyIdentifier``."""
+    if not name or unicodedata.category(name[0]) not in _java_identifier_start_categories:
+        return False
+    return all(unicodedata.category(c) in _java_identifier_part_categories or _is_java_identifier_ignorable(c)
+               for c in name[1:])
+
+
+_control_escapes = {0x8: u'\\b', 0xa: u'\\n', 0x9: u'\\t', 0xc: u'\\f', 0xd: u'\\r'}
+
+
+def _escape_backticked(name):
+    """Port of Scala's ``StringEscapeUtils.escapeString(str, backticked = true)``, which escapes
+    the UTF-16 code units of the string."""
+    data = bytearray(name.encode('utf-16-be'))
+    chars = []
+    for i in range(0, len(data), 2):
+        ch = (data[i] << 8) | data[i + 1]
+        if ch > 0x7f:
+            chars.append(u'\\u%04X' % ch)
+        elif ch < 32:
+            chars.append(_control_escapes.get(ch, u'\\u%04X' % ch))
+        elif ch == 0x60:
+            chars.append(u'\\`')
+        elif ch == 0x5c:
+            chars.append(u'\\\\')
+        else:
+            chars.append(unichr(ch))
+    return u''.join(chars)
+
+
+def _pretty_identifier(name):
+    """Port of Scala's ``prettyIdentifier``."""
+    if isinstance(name, str):
+        name = name.decode('utf-8')
+    if _is_java_identifier(name):
+        return name
+    return u'`' + _escape_backticked(name) + u'`'
+
+
+class _TypeParser(object):
+    """Recursive-descent parser for the compact string representation of JVM types, as printed
+    by ``Type.toPrettyString(0, true)``.
+
+    Each parsed node records the canonical compact form of its JVM string, so parsed types
+    compare equal to constructed ones.
+    """
+
+    _delimiters = ':,[]{}()'
+
+    def __init__(self, s):
+        self._s = s
+        self._i = 0
+
+    def parse(self):
+        t = self._type()
+        self._skip_whitespace()
+        if self._i != len(self._s):
+            self._fail('unexpected trailing characters')
+        return t
+
+    def _fail(self, msg):
+        raise TypeError("cannot parse type '%s' at position %d: %s" % (self._s, self._i, msg))
+
+    def _skip_whitespace(self):
+        while self._i < len(self._s) and self._s[self._i].isspace():
+            self._i += 1
+
+    def _expect(self, c):
+        self._skip_whitespace()
+        if self._s[self._i:self._i + 1] != c:
+            self._fail("expected '%s'" % c)
+        self._i += 1
+
+    def _identifier(self):
+        """Returns the identifier and its source text."""
+        self._skip_whitespace()
+        s = self._s
+        start = self._i
+        if s[start:start + 1] == '`':
+            chars = []
+            i = start + 1
+            while i < len(s) and s[i] != '`':
+                if s[i] == '\\':
+                    if s[i + 1] == 'u':
+                        chars.append(unichr(int(s[i + 2:i + 6], 16)))
+                        i += 6
+                    else:
+                        chars.append(_escapes[s[i + 1]])
+                        i += 2
+                else:
+                    chars.append(s[i])
+                    i += 1
+            if i >= len(s):
+                self._fail('unterminated backtick identifier')
+            self._i = i + 1
+            return ''.join(chars), s[start:self._i]
+        else:
+            while self._i < len(s) and not (s[self._i] in self._delimiters or s[self._i].isspace()):
+                self._i += 1
+            if self._i == start:
+                self._fail('expected identifier')
+            return s[start:self._i], s[start:self._i]
+
+    def _type(self):
+        self._skip_whitespace()
+        required = self._s[self._i:self._i + 1] == '!'
+        if required:
+            self._i += 1
+        req = '!' if required else ''
+        name, _ = self._identifier()
+
+        if name in _intern_types:
+            t = _intern_types[name](required)
+            if t._cached_jstr is None:
+                t._cached_jstr = req + name
+            return t
+        elif name == 'Empty':
+            return TStruct._from_parsed(req + 'Empty', required, fields=[])
+        elif name in ('Array', 'Set'):
+            self._expect('[')
+            element_type = self._type()
+            self._expect(']')
+            cls = TArray if name == 'Array' else TSet
+            return cls._from_parsed(u'{}{}[{}]'.format(req, name, element_type._jstr), required,
+                                    element_type=element_type)
+        elif name == 'Dict':
+            self._expect('[')
+            key_type = self._type()
+            self._expect(',')
+            value_type = self._type()
+            self._expect(']')
+            return TDict._from_parsed(u'{}Dict[{},{}]'.format(req, key_type._jstr, value_type._jstr), required,
+                                      key_type=key_type, value_type=value_type)
+        elif name == 'Struct':
+            self._expect('{')
+            fields = []
+            field_strs = []
+            self._skip_whitespace()
+            if self._s[self._i:self._i + 1] != '}':
+                while True:
+                    field_name, field_src = self._identifier()
+                    self._expect(':')
+                    typ = self._type()
+                    fields.append(Field(field_name, typ))
+                    field_strs.append(u'{}:{}'.format(field_src, typ._jstr))
+                    self._skip_whitespace()
+                    if self._s[self._i:self._i + 1] != ',':
+                        break
+                    self._i += 1
+            self._expect('}')
+            return TStruct._from_parsed(u'{}Struct{{{}}}'.format(req, u','.join(field_strs)), required,
+                                        fields=fields)
+        elif name in ('Variant', 'Locus', 'Interval'):
+            self._expect('(')
+            rg_name, rg_src = self._identifier()
+            self._expect(')')
+            cls = {'Variant': TVariant, 'Locus': TLocus, 'Interval': TInterval}[name]
+            return cls._from_parsed(u'{}{}({})'.format(req, name, rg_src), required, _rg=_reference_genome(rg_name))
+        else:
+            raise TypeError("unknown type: '%s'" % name)
+
 
 import pprint
 
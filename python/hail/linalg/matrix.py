@@ -20,6 +20,28 @@ class BlockMatrix(object):
             scala_object(Env.hail().distributedmatrix, 'BlockMatrix').random(
                 hc._jhc, rows, cols, block_size))
 
+    @staticmethod
+    @handle_py4j
+    @typecheck(path=strlike,
+               block_size=nullable(integral))
+    def import_npy(path, block_size=None):
+        """Import a two-dimensional NumPy array saved with ``numpy.save``, in C or Fortran order.
+
+        Elements are converted to float64. Each block is read from its own byte ranges of the file.
+
+        :param str path: .npy file to read.
+
+        :param block_size: Number of rows and columns in each block. Default: 1024.
+        :type block_size: int or None
+
+        :rtype: :py:class:`.BlockMatrix`
+        """
+        hc = Env.hc()
+        jbm_object = scala_object(Env.hail().distributedmatrix, 'BlockMatrix')
+        if block_size is None:
+            block_size = jbm_object.defaultBlockSize()
+        return BlockMatrix(hc, jbm_object.importNpy(hc._jhc, path, block_size))
+
     def __init__(self, hc, jbm):
         self.hc = hc
         self._jbm = jbm
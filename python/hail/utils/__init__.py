@@ -1,7 +1,8 @@
 from .summary import Summary
 from .misc import FunctionDocumentation, wrap_to_list, get_env_or_default
-from .hadoop_utils import hadoop_copy, hadoop_read, hadoop_write
+from .hadoop_utils import hadoop_copy, hadoop_copy_tree, hadoop_read, hadoop_write
 from .struct import Struct
+from .profile import Profile, ProfiledCall
 from .java import error, warn, info
 
 __all__ = ['Summary',
@@ -9,9 +10,12 @@ __all__ = ['Summary',
            'hadoop_read',
            'hadoop_write',
            'hadoop_copy',
+           'hadoop_copy_tree',
            'wrap_to_list',
            'get_env_or_default',
            'Struct',
+           'Profile',
+           'ProfiledCall',
            'error',
            'warn',
            'info']
\ No newline at end of file
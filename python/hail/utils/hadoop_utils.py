@@ -5,7 +5,7 @@ import io
 @handle_py4j
 @typecheck(path=strlike,
            buffer_size=integral)
-def hadoop_read(path, buffer_size=8192):
+def hadoop_read(path, buffer_size=1048576):
     """Open a readable file through the Hadoop filesystem API.
     Supports distributed file systems like hdfs, gs, and s3.
 
@@ -22,16 +22,12 @@ def hadoop_read(path, buffer_size=8192):
 
     The provided source file path must be a URI (uniform resource identifier).
 
-    .. caution::
-
-        These file handles are slower than standard Python file handles.
-        If you are reading a file larger than ~50M, it will be faster to
-        use :py:meth:`~hail.hadoop_copy` to copy the file locally, then read it
-        with standard Python I/O tools.
+    Data is transferred from the JVM in binary blocks of `buffer_size` bytes,
+    so large buffers keep the number of round trips low when streaming big files.
 
     :param str path: Source file URI.
 
-    :param int buffer_size: Size of internal buffer.
+    :param int buffer_size: Size of internal buffer, in bytes.
 
     :return: Iterable file reader.
     :rtype: `io.BufferedReader <https://docs.python.org/2/library/io.html#io.BufferedReader>`_
@@ -40,13 +36,13 @@ def hadoop_read(path, buffer_size=8192):
         raise TypeError("expected parameter 'path' to be type str, but found %s" % type(path))
     if not isinstance(buffer_size, int):
         raise TypeError("expected parameter 'buffer_size' to be type int, but found %s" % type(buffer_size))
-    return io.BufferedReader(HadoopReader(path), buffer_size=buffer_size)
+    return io.BufferedReader(HadoopReader(path, buffer_size), buffer_size=buffer_size)
 
 
 @handle_py4j
 @typecheck(path=strlike,
            buffer_size=integral)
-def hadoop_write(path, buffer_size=8192):
+def hadoop_write(path, buffer_size=1048576):
     """Open a writable file through the Hadoop filesystem API.
     Supports distributed file systems like hdfs, gs, and s3.
 
@@ -63,15 +59,12 @@ def hadoop_write(path, buffer_size=8192):
 
     The provided destination file path must be a URI (uniform resource identifier).
 
-    .. caution::
-
-        These file handles are slower than standard Python file handles. If you
-        are writing a large file (larger than ~50M), it will be faster to write
-        to a local file using standard Python I/O and use :py:meth:`~hail.hadoop_copy`
-        to move your file to a distributed file system.
+    Data is transferred to the JVM in binary blocks of `buffer_size` bytes.
 
     :param str path: Destination file URI.
 
+    :param int buffer_size: Size of internal buffer, in bytes.
+
     :return: File writer object.
     :rtype: `io.BufferedWriter <https://docs.python.org/2/library/io.html#io.BufferedWriter>`_
     """
@@ -79,7 +72,7 @@ def hadoop_write(path, buffer_size=8192):
         raise TypeError("expected parameter 'path' to be type str, but found %s" % type(path))
     if not isinstance(buffer_size, int):
         raise TypeError("expected parameter 'buffer_size' to be type int, but found %s" % type(buffer_size))
-    return io.BufferedWriter(HadoopWriter(path), buffer_size=buffer_size)
+    return io.BufferedWriter(HadoopWriter(path, buffer_size), buffer_size=buffer_size)
 
 
 @handle_py4j
@@ -104,9 +97,46 @@ def hadoop_copy(src, dest):
     Env.jutils().copyFile(src, dest, Env.hc()._jhc)
 
 
+@handle_py4j
+@typecheck(src=strlike,
+           dest=strlike,
+           parallelism=integral,
+           retries=integral,
+           verify=bool)
+def hadoop_copy_tree(src, dest, parallelism=16, retries=2, verify=True):
+    """Copy a directory tree through the Hadoop filesystem API, copying
+    many files at once. Supports distributed file systems like hdfs, gs, and s3.
+
+    **Examples**
+
+    >>> hadoop_copy_tree('hdfs:///data/dataset.vds', 'gs://my-bucket/dataset.vds', parallelism=64) # doctest: +SKIP
+
+    **Notes**
+
+    Every file under `src` is copied to the same relative path under `dest`.
+    Copies run on `parallelism` threads on the driver. If `src` is a single
+    file, it is copied to `dest`.
+
+    A failed file copy is retried up to `retries` times. If `verify` is true,
+    each copy is checked against its source file's size and, when both file
+    systems report comparable checksums, its checksum.
+
+    :param str src: Source file or directory URI.
+    :param str dest: Destination URI.
+    :param int parallelism: Number of files to copy concurrently.
+    :param int retries: Number of times to retry a failed file copy.
+    :param bool verify: Check each copied file against its source.
+    """
+    if parallelism < 1:
+        raise ValueError("'parallelism' must be positive, found {}".format(parallelism))
+    if retries < 0:
+        raise ValueError("'retries' must be non-negative, found {}".format(retries))
+    Env.jutils().copyTree(src, dest, Env.hc()._jhc, parallelism, retries + 1, verify)
+
+
 class HadoopReader(io.RawIOBase):
-    def __init__(self, path):
-        self._jfile = Env.jutils().readFile(path, Env.hc()._jhc)
+    def __init__(self, path, buffer_size):
+        self._jfile = Env.jutils().readFile(path, Env.hc()._jhc, buffer_size)
         super(HadoopReader, self).__init__()
 
     def close(self):
@@ -116,15 +146,15 @@ class HadoopReader(io.RawIOBase):
         return True
 
     def readinto(self, b):
-        b_from_java = self._jfile.read(len(b)).encode('iso-8859-1')
+        b_from_java = self._jfile.readBytes(len(b))
         n_read = len(b_from_java)
         b[:n_read] = b_from_java
         return n_read
 
 
 class HadoopWriter(io.RawIOBase):
-    def __init__(self, path):
-        self._jfile = Env.jutils().writeFile(path, Env.hc()._jhc)
+    def __init__(self, path, buffer_size):
+        self._jfile = Env.jutils().writeFile(path, Env.hc()._jhc, buffer_size)
         super(HadoopWriter, self).__init__()
 
     def writable(self):
@@ -137,6 +167,6 @@ class HadoopWriter(io.RawIOBase):
         self._jfile.flush()
 
     def write(self, b):
-        self._jfile.write(bytearray(b))
+        self._jfile.write(b if isinstance(b, bytearray) else bytearray(b))
         return len(b)
 
@@ -1,4 +1,5 @@
 import SocketServer
+import json
 import socket
 import sys
 from threading import Thread
@@ -19,6 +20,7 @@ class Env:
     _jutils = None
     _hc = None
     _counter = 0
+    _profile = None
 
     @staticmethod
     def _get_uid():
@@ -116,6 +118,39 @@ def jarray_to_list(a):
     return list(a) if a else None
 
 
+class JavaBatch(object):
+    """Queue of side-effect-free, zero-argument calls on a single JVM object.
+
+    Calls recorded with :meth:`call` are sent to the JVM together by :meth:`flush`,
+    which costs one py4j round trip regardless of the number of queued calls. Each
+    result comes back as the string form of the JVM value (``None`` if null), or the
+    compact pretty form for types, and is passed through the decoder given when the
+    call was queued.
+
+    :param jobj: JVM object to invoke methods on.
+    """
+
+    def __init__(self, jobj):
+        self._jobj = jobj
+        self._methods = []
+        self._decoders = []
+
+    def call(self, method, decoder=None):
+        self._methods.append(method)
+        self._decoders.append(decoder)
+        return self
+
+    def flush(self):
+        if not self._methods:
+            return []
+        results = json.loads(Env.jutils().batchInvoke(self._jobj, ','.join(self._methods)))
+        decoded = [d(r) if d is not None and r is not None else r
+                   for r, d in zip(results, self._decoders)]
+        self._methods = []
+        self._decoders = []
+        return decoded
+
+
 def plural(orig, n, alternate=None):
     if n == 1:
         return orig
@@ -143,8 +178,16 @@ def warn(msg):
 def info(msg):
     Log4jLogger.get().info(msg)
 
+def _profiled_name(func, args):
+    if args and hasattr(type(args[0]), func.__name__):
+        return '{}.{}'.format(type(args[0]).__name__, func.__name__)
+    return func.__name__
+
+
 @decorator
 def handle_py4j(func, *args, **kwargs):
+    profile = Env._profile
+    token = profile._enter(_profiled_name(func, args)) if profile is not None else None
     try:
         r = func(*args, **kwargs)
     except py4j.protocol.Py4JJavaError as e:
@@ -165,6 +208,9 @@ def handle_py4j(func, *args, **kwargs):
         raise FatalError('%s\n\nJava stack trace:\n%s\n'
                          'Hail version: %s\n'
                          'Error summary: %s' % (e.desc, e.stackTrace, Env.hc().version, e.desc))
+    finally:
+        if profile is not None:
+            profile._exit(token)
     return r
 
 
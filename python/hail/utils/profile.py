@@ -0,0 +1,169 @@
+import json
+import time
+import uuid
+
+from hail.utils.java import Env
+
+
+class ProfiledCall(object):
+    """Timing and cluster work of one Hail API call recorded by a :class:`.Profile`.
+
+    :ivar str name: Name of the method called.
+    :ivar float start: Start time, in seconds since the epoch.
+    :ivar float duration: Wall-clock duration, in seconds.
+    :ivar job_ids: IDs of the Spark jobs started by the call.
+    :vartype job_ids: list of int
+    :ivar stage_ids: IDs of the Spark stages of those jobs.
+    :vartype stage_ids: list of int
+    :ivar int shuffle_read_bytes: Bytes read from shuffles.
+    :ivar int shuffle_write_bytes: Bytes written to shuffles.
+    :ivar int input_records: Records read from input sources.
+    :ivar int output_records: Records written to output sources.
+    """
+
+    def __init__(self, name, start, duration, jobs):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.jobs = jobs
+        self.job_ids = [j['job_id'] for j in jobs]
+        self.stage_ids = [s for j in jobs for s in j['stage_ids']]
+        self.shuffle_read_bytes = sum(j['shuffle_read_bytes'] for j in jobs)
+        self.shuffle_write_bytes = sum(j['shuffle_write_bytes'] for j in jobs)
+        self.input_records = sum(j['input_records'] for j in jobs)
+        self.output_records = sum(j['output_records'] for j in jobs)
+
+    def __repr__(self):
+        return 'ProfiledCall(name={}, duration={:.3f}s, jobs={}, shuffle_write_bytes={})'.format(
+            self.name, self.duration, self.job_ids, self.shuffle_write_bytes)
+
+    def to_dict(self):
+        return {'name': self.name,
+                'start': self.start,
+                'duration': self.duration,
+                'job_ids': self.job_ids,
+                'stage_ids': self.stage_ids,
+                'shuffle_read_bytes': self.shuffle_read_bytes,
+                'shuffle_write_bytes': self.shuffle_write_bytes,
+                'input_records': self.input_records,
+                'output_records': self.output_records}
+
+
+class Profile(object):
+    """Driver-side profile of the Hail API calls made while it is active.
+
+    Use :meth:`.HailContext.profile` to create one. Only the outermost API call
+    is recorded when calls nest. The Spark jobs started during a call are
+    attributed to it, along with their stages, shuffle bytes and record counts.
+
+    Spark reports job and stage events asynchronously. Leaving the profiled
+    block waits up to ``drain_timeout`` seconds for the events of its jobs, so
+    metrics are complete once the block exits unless the wait times out.
+    """
+
+    drain_timeout = 10
+
+    def __init__(self):
+        self._jlistener = Env.jutils().profilingListener(Env.hc()._jhc)
+        self._id = uuid.uuid4().hex
+        self._records = []
+        self._n_calls = 0
+        self._depth = 0
+        self._previous = None
+        self._open = False
+        # jobs by call index, fetched from the listener when the profile is closed
+        self._closed_jobs = {}
+
+    def __enter__(self):
+        self._previous = Env._profile
+        Env._profile = self
+        self._jlistener.open(self._id)
+        self._open = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        Env._profile = self._previous
+        self._previous = None
+        self._jlistener.drain(int(self.drain_timeout * 1000))
+        self._closed_jobs.update(self._fetch_jobs())
+        self._jlistener.close(self._id)
+        self._open = False
+
+    def _fetch_jobs(self):
+        return {int(call): jobs for call, jobs in json.loads(self._jlistener.jobsJSON(self._id)).items()}
+
+    def _enter(self, name):
+        self._depth += 1
+        if self._depth > 1:
+            return None
+        call = self._n_calls
+        self._n_calls += 1
+        return name, time.time(), call, self._jlistener.startCall(self._id, call)
+
+    def _exit(self, token):
+        self._depth -= 1
+        if token is not None:
+            name, start, call, previous = token
+            self._jlistener.endCall(previous)
+            self._records.append((name, start, time.time() - start, call))
+
+    @property
+    def calls(self):
+        """Recorded calls, in the order they were made.
+
+        :rtype: list of :class:`.ProfiledCall`
+        """
+        jobs = dict(self._closed_jobs)
+        if self._open:
+            jobs.update(self._fetch_jobs())
+        return [ProfiledCall(name, start, duration, jobs.get(call, []))
+                for name, start, duration, call in self._records]
+
+    def slowest(self, n=10):
+        """The `n` calls with the longest duration.
+
+        :rtype: list of :class:`.ProfiledCall`
+        """
+        return sorted(self.calls, key=lambda c: c.duration, reverse=True)[:n]
+
+    def to_json(self):
+        """Recorded calls as a JSON string.
+
+        :rtype: str
+        """
+        return json.dumps([c.to_dict() for c in self.calls])
+
+    def export_json(self, path):
+        """Write the recorded calls as JSON to a local file.
+
+        :param str path: Output path.
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def export_chrome_trace(self, path):
+        """Write the recorded calls and their Spark jobs in Chrome trace event format to a
+        local file, for viewing in ``chrome://tracing``.
+
+        :param str path: Output path.
+        """
+        events = []
+        for c in self.calls:
+            events.append({'name': c.name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': int(c.start * 1e6), 'dur': int(c.duration * 1e6),
+                           'args': {k: v for k, v in c.to_dict().items() if k not in ('name', 'start', 'duration')}})
+            for j in c.jobs:
+                if j['completion_time'] is not None:
+                    events.append({'name': 'job {}'.format(j['job_id']), 'ph': 'X', 'pid': 0, 'tid': 1,
+                                   'ts': j['submission_time'] * 1000,
+                                   'dur': (j['completion_time'] - j['submission_time']) * 1000,
+                                   'args': {'call': c.name, 'stage_ids': j['stage_ids']}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def __str__(self):
+        lines = ['{:<40} {:>10} {:>6} {:>16} {:>14}'.format('call', 'seconds', 'jobs', 'shuffle bytes', 'input records')]
+        for c in self.calls:
+            lines.append('{:<40} {:>10.3f} {:>6} {:>16} {:>14}'.format(
+                c.name, c.duration, len(c.job_ids), c.shuffle_write_bytes, c.input_records))
+        return '\n'.join(lines)
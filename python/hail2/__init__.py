@@ -4,7 +4,7 @@ from hail.utils import Struct, hadoop_write, hadoop_read, hadoop_copy
 from hail.expr import Type, TInt32, TInt64, TFloat32, TFloat64, TString, TBoolean, TArray, TSet, TDict, TStruct, \
     TLocus, TVariant, TAltAllele, TCall, TInterval
 import hail.expr.functions as f
-from hail.utils import hadoop_read, hadoop_write, hadoop_copy
+from hail.utils import hadoop_read, hadoop_write, hadoop_copy, hadoop_copy_tree
 from hail.api2 import MatrixTable, Table, HailContext
 from hail.methods import trio_matrix, ld_matrix, linreg, sample_qc
 
@@ -39,6 +39,7 @@ __all__ = ['HailContext',
            'hadoop_read',
            'hadoop_write',
            'hadoop_copy',
+           'hadoop_copy_tree',
            'KinshipMatrix',
            'LDMatrix',
            'f',
@@ -6,12 +6,12 @@ import java.util.Properties
 import is.hail.annotations._
 import is.hail.expr.{EvalContext, Parser, TStruct, Type, _}
 import is.hail.io.{Decoder, LZ4InputBuffer}
-import is.hail.io.LoadMatrix
+import is.hail.io.{LoadMatrix, LoadNpy}
 import is.hail.io.bgen.BgenLoader
 import is.hail.io.gen.GenLoader
 import is.hail.io.plink.{FamFileConfig, PlinkLoader}
 import is.hail.io.vcf._
-import is.hail.keytable.KeyTable
+import is.hail.keytable.{ImportCache, KeyTable}
 import is.hail.rvd.OrderedRVD
 import is.hail.stats.{BaldingNicholsModel, Distribution, UniformDist}
 import is.hail.utils.{log, _}
@@ -205,8 +205,30 @@ class HailContext private(val sc: SparkContext,
   val branchingFactor: Int) {
   val hadoopConf: hadoop.conf.Configuration = sc.hadoopConfiguration
 
+  private var importCache: Option[ImportCache] = None
+
   def version: String = is.hail.HAIL_PRETTY_VERSION
 
+  /**
+    * Caches text tables imported by importTable(s), importIntervalList, importBED and importFam under
+    * `dir' in the native format, and reads them from there when the same files are imported again with
+    * the same arguments. The least recently used entries are evicted to keep the cache within `maxSize'
+    * bytes.
+    **/
+  def enableImportCache(dir: String, maxSize: Long) {
+    importCache = Some(new ImportCache(dir, maxSize))
+  }
+
+  def disableImportCache() {
+    importCache = None
+  }
+
+  def cachedImport(kind: String, files: Seq[String], args: Seq[Any])(f: => KeyTable): KeyTable =
+    importCache match {
+      case Some(cache) => cache.getOrImport(this, kind, files, args)(f)
+      case None => f
+    }
+
   def grep(regex: String, files: Seq[String], maxLines: Int = 100) {
     val regexp = regex.r
     sc.textFilesLines(hadoopConf.globAll(files))
@@ -228,8 +250,11 @@ class HailContext private(val sc: SparkContext,
     tolerance: Double = 0.2,
     nPartitions: Option[Int] = None,
     gr: GenomeReference = GenomeReference.defaultReference,
-    contigRecoding: Option[Map[String, String]] = None): GenericDataset = {
-    importBgens(List(file), sampleFile, tolerance, nPartitions, gr, contigRecoding)
+    contigRecoding: Option[Map[String, String]] = None,
+    samples: Option[IndexedSeq[String]] = None,
+    intervals: Option[IndexedSeq[Interval[Locus]]] = None,
+    dosageOnly: Boolean = false): GenericDataset = {
+    importBgens(List(file), sampleFile, tolerance, nPartitions, gr, contigRecoding, samples, intervals, dosageOnly)
   }
 
   def importBgens(files: Seq[String],
@@ -237,7 +262,10 @@ class HailContext private(val sc: SparkContext,
     tolerance: Double = 0.2,
     nPartitions: Option[Int] = None,
     gr: GenomeReference = GenomeReference.defaultReference,
-    contigRecoding: Option[Map[String, String]] = None): GenericDataset = {
+    contigRecoding: Option[Map[String, String]] = None,
+    samples: Option[IndexedSeq[String]] = None,
+    intervals: Option[IndexedSeq[Interval[Locus]]] = None,
+    dosageOnly: Boolean = false): GenericDataset = {
 
     val inputs = hadoopConf.globAll(files).flatMap { file =>
       if (!file.endsWith(".bgen"))
@@ -256,7 +284,8 @@ class HailContext private(val sc: SparkContext,
 
     contigRecoding.foreach(gr.validateContigRemap)
 
-    BgenLoader.load(this, inputs, sampleFile, tolerance, nPartitions, gr, contigRecoding.getOrElse(Map.empty[String, String]))
+    BgenLoader.load(this, inputs, sampleFile, tolerance, nPartitions, gr, contigRecoding.getOrElse(Map.empty[String, String]),
+      samples, intervals, dosageOnly)
   }
 
   def importGen(file: String,
@@ -336,8 +365,10 @@ class HailContext private(val sc: SparkContext,
     noHeader: Boolean,
     impute: Boolean,
     quote: java.lang.Character,
-    gr: GenomeReference): KeyTable = importTables(inputs.asScala, keyNames.asScala.toArray, if (nPartitions == null) None else Some(nPartitions),
-    types.asScala.toMap, Option(commentChar), separator, missing, noHeader, impute, quote, gr)
+    gr: GenomeReference,
+    imputeSample: java.lang.Integer): KeyTable = importTables(inputs.asScala, keyNames.asScala.toArray, if (nPartitions == null) None else Some(nPartitions),
+    types.asScala.toMap, Option(commentChar), separator, missing, noHeader, impute, quote, gr,
+    if (imputeSample == null) None else Some(imputeSample))
 
   def importTable(input: String,
     keyNames: Array[String] = Array.empty[String],
@@ -349,8 +380,10 @@ class HailContext private(val sc: SparkContext,
     noHeader: Boolean = false,
     impute: Boolean = false,
     quote: java.lang.Character = null,
-    gr: GenomeReference = GenomeReference.defaultReference): KeyTable = {
-    importTables(List(input), keyNames, nPartitions, types, commentChar, separator, missing, noHeader, impute, quote, gr)
+    gr: GenomeReference = GenomeReference.defaultReference,
+    imputeSample: Option[Int] = None): KeyTable = {
+    importTables(List(input), keyNames, nPartitions, types, commentChar, separator, missing, noHeader, impute, quote, gr,
+      imputeSample)
   }
 
   def importTables(inputs: Seq[String],
@@ -363,18 +396,23 @@ class HailContext private(val sc: SparkContext,
     noHeader: Boolean = false,
     impute: Boolean = false,
     quote: java.lang.Character = null,
-    gr: GenomeReference = GenomeReference.defaultReference): KeyTable = {
+    gr: GenomeReference = GenomeReference.defaultReference,
+    imputeSample: Option[Int] = None): KeyTable = {
     require(nPartitions.forall(_ > 0), "nPartitions argument must be positive")
 
     val files = hadoopConf.globAll(inputs)
     if (files.isEmpty)
       fatal(s"Arguments referred to no files: '${ files.mkString(",") }'")
 
-    val (struct, rdd) =
-      TextTableReader.read(sc)(files, types, commentChar, separator, missing,
-        noHeader, impute, nPartitions.getOrElse(sc.defaultMinPartitions), quote, gr)
+    cachedImport("import_table", files, Seq(keyNames.mkString(","), nPartitions,
+      types.toArray.sortBy(_._1).map { case (name, t) => s"$name:${ t.toPrettyString(compact = true) }" }.mkString(","),
+      commentChar, separator, missing, noHeader, impute, quote, gr.name, imputeSample)) {
+      val (struct, rdd) =
+        TextTableReader.read(sc)(files, types, commentChar, separator, missing,
+          noHeader, impute, nPartitions.getOrElse(sc.defaultMinPartitions), quote, gr, imputeSample)
 
-    KeyTable(this, rdd.map(_.value), struct, keyNames)
+      KeyTable(this, rdd.map(_.value), struct, keyNames)
+    }
   }
 
   def importPlink(bed: String, bim: String, fam: String,
@@ -469,8 +507,9 @@ class HailContext private(val sc: SparkContext,
     dropSamples: Boolean = false,
     callFields: Set[String] = Set.empty[String],
     gr: GenomeReference = GenomeReference.defaultReference,
-    contigRecoding: Option[Map[String, String]] = None): VariantSampleMatrix = {
-    importVCFs(List(file), force, forceBGZ, headerFile, nPartitions, dropSamples, callFields, gr, contigRecoding)
+    contigRecoding: Option[Map[String, String]] = None,
+    intervals: Option[IndexedSeq[Interval[Locus]]] = None): VariantSampleMatrix = {
+    importVCFs(List(file), force, forceBGZ, headerFile, nPartitions, dropSamples, callFields, gr, contigRecoding, intervals)
   }
 
   def importVCFs(files: Seq[String], force: Boolean = false,
@@ -480,11 +519,13 @@ class HailContext private(val sc: SparkContext,
     dropSamples: Boolean = false,
     callFields: Set[String] = Set.empty[String],
     gr: GenomeReference = GenomeReference.defaultReference,
-    contigRecoding: Option[Map[String, String]] = None): VariantSampleMatrix = {
+    contigRecoding: Option[Map[String, String]] = None,
+    intervals: Option[IndexedSeq[Interval[Locus]]] = None): VariantSampleMatrix = {
 
     contigRecoding.foreach(gr.validateContigRemap)
 
-    val inputs = LoadVCF.globAllVCFs(hadoopConf.globAll(files), hadoopConf, force || forceBGZ)
+    // tabix-indexed files are block compressed, whatever their extension
+    val inputs = LoadVCF.globAllVCFs(hadoopConf.globAll(files), hadoopConf, force || forceBGZ || intervals.isDefined)
 
     val codecs = sc.hadoopConfiguration.get("io.compression.codecs")
 
@@ -493,7 +534,8 @@ class HailContext private(val sc: SparkContext,
         codecs.replaceAllLiterally("org.apache.hadoop.io.compress.GzipCodec", "is.hail.io.compress.BGzipCodecGZ"))
 
     val reader = new HtsjdkRecordReader(callFields)
-    val vkds = LoadVCF(this, reader, headerFile, inputs, nPartitions, dropSamples, gr, contigRecoding.getOrElse(Map.empty[String, String]))
+    val vkds = LoadVCF(this, reader, headerFile, inputs, nPartitions, dropSamples, gr, contigRecoding.getOrElse(Map.empty[String, String]),
+      intervals = intervals)
 
     hadoopConf.set("io.compression.codecs", codecs)
 
@@ -519,6 +561,9 @@ class HailContext private(val sc: SparkContext,
     LoadMatrix(this, inputs, nPartitions, dropSamples, cellType = cellType, missingValue = missingVal)
   }
 
+  def importNpy(file: String, nPartitions: Option[Int] = None): VariantSampleMatrix =
+    LoadNpy(this, file, nPartitions)
+
   def indexBgen(file: String) {
     indexBgen(List(file))
   }
@@ -539,13 +584,20 @@ class HailContext private(val sc: SparkContext,
     if (inputs.isEmpty)
       fatal(s"arguments refer to no files: '${ files.mkString(",") }'")
 
-    val conf = new SerializableHadoopConfiguration(hadoopConf)
+    val (indexed, toIndex) = inputs.partition(BgenLoader.isIndexed(hadoopConf, _))
+    if (indexed.nonEmpty)
+      info(s"Skipping ${ plural(indexed.length, "BGEN file") } with an up-to-date index")
+
+    if (toIndex.nonEmpty) {
+      val conf = new SerializableHadoopConfiguration(hadoopConf)
 
-    sc.parallelize(inputs, numSlices = inputs.length).foreach { in =>
-      BgenLoader.index(conf.value, in)
+      // largest files first, so they do not start last and hold up the job
+      sc.parallelize(toIndex.sortBy(f => -hadoopConf.getFileSize(f)), numSlices = toIndex.length).foreach { in =>
+        BgenLoader.index(conf.value, in)
+      }
     }
 
-    info(s"Number of BGEN files indexed: ${ inputs.length }")
+    info(s"Number of BGEN files indexed: ${ toIndex.length }")
   }
 
   def baldingNicholsModel(populations: Int,
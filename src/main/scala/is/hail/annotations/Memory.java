@@ -65,6 +65,21 @@ public final class Memory {
         unsafe.copyMemory(src, Unsafe.ARRAY_DOUBLE_BASE_OFFSET + srcOff * 8, dst, Unsafe.ARRAY_BYTE_BASE_OFFSET + dstOff, n * 8);
     }
 
+    // srcOff is in ints, n is in ints
+    public static void memcpy(byte[] dst, long dstOff, int[] src, long srcOff, long n) {
+        unsafe.copyMemory(src, Unsafe.ARRAY_INT_BASE_OFFSET + srcOff * 4, dst, Unsafe.ARRAY_BYTE_BASE_OFFSET + dstOff, n * 4);
+    }
+
+    // srcOff is in longs, n is in longs
+    public static void memcpy(byte[] dst, long dstOff, long[] src, long srcOff, long n) {
+        unsafe.copyMemory(src, Unsafe.ARRAY_LONG_BASE_OFFSET + srcOff * 8, dst, Unsafe.ARRAY_BYTE_BASE_OFFSET + dstOff, n * 8);
+    }
+
+    // srcOff is in floats, n is in floats
+    public static void memcpy(byte[] dst, long dstOff, float[] src, long srcOff, long n) {
+        unsafe.copyMemory(src, Unsafe.ARRAY_FLOAT_BASE_OFFSET + srcOff * 4, dst, Unsafe.ARRAY_BYTE_BASE_OFFSET + dstOff, n * 4);
+    }
+
     // dstOff is in doubles, n is in doubles
     public static void memcpy(double[] dst, long dstOff, byte[] src, long srcOff, long n) {
         unsafe.copyMemory(src, Unsafe.ARRAY_BYTE_BASE_OFFSET + srcOff, dst, Unsafe.ARRAY_DOUBLE_BASE_OFFSET + dstOff * 8, n * 8);
@@ -128,6 +128,35 @@ final class MemoryBuffer(private var mem: Array[Byte], private var end: Long = 0
     Memory.memcpy(mem, off, bytes, bytesOff, n)
   }
 
+  // stores n elements of `a', starting at element aOff, as consecutive values from off
+  def storeInts(off: Long, a: Array[Int], aOff: Int, n: Int) {
+    assert(size <= capacity)
+    assert(off >= 0 && off + 4L * n <= size)
+    assert(aOff + n <= a.length)
+    Memory.memcpy(mem, off, a, aOff, n)
+  }
+
+  def storeLongs(off: Long, a: Array[Long], aOff: Int, n: Int) {
+    assert(size <= capacity)
+    assert(off >= 0 && off + 8L * n <= size)
+    assert(aOff + n <= a.length)
+    Memory.memcpy(mem, off, a, aOff, n)
+  }
+
+  def storeFloats(off: Long, a: Array[Float], aOff: Int, n: Int) {
+    assert(size <= capacity)
+    assert(off >= 0 && off + 4L * n <= size)
+    assert(aOff + n <= a.length)
+    Memory.memcpy(mem, off, a, aOff, n)
+  }
+
+  def storeDoubles(off: Long, a: Array[Double], aOff: Int, n: Int) {
+    assert(size <= capacity)
+    assert(off >= 0 && off + 8L * n <= size)
+    assert(aOff + n <= a.length)
+    Memory.memcpy(mem, off, a, aOff, n)
+  }
+
   def ensure(n: Long) {
     val required = size + n
     if (capacity < required) {
@@ -647,6 +676,46 @@ class RegionValueBuilder(var region: MemoryBuffer) {
     advance()
   }
 
+  /**
+    * Adds an array of the first `length' elements of `values', an Array[Int], Array[Long],
+    * Array[Float] or Array[Double] matching the element type, copying them into the region at once.
+    * Element i is missing if missing(i).
+    **/
+  def addPrimitiveArray(values: Any, missing: Array[Boolean], length: Int) {
+    startArray(length)
+    val t = typestk.top.asInstanceOf[TArray]
+    val aoff = offsetstk.top
+    val eoff = elementsOffsetstk.top
+
+    values match {
+      case a: Array[Int] =>
+        assert(t.elementType.isInstanceOf[TInt32])
+        region.storeInts(eoff, a, 0, length)
+      case a: Array[Long] =>
+        assert(t.elementType.isInstanceOf[TInt64])
+        region.storeLongs(eoff, a, 0, length)
+      case a: Array[Float] =>
+        assert(t.elementType.isInstanceOf[TFloat32])
+        region.storeFloats(eoff, a, 0, length)
+      case a: Array[Double] =>
+        assert(t.elementType.isInstanceOf[TFloat64])
+        region.storeDoubles(eoff, a, 0, length)
+    }
+
+    var i = 0
+    while (i < length) {
+      if (missing(i)) {
+        if (t.elementType.required)
+          fatal(s"cannot set missing field for required type ${ t.elementType }")
+        t.setElementMissing(region, aoff, i)
+      }
+      i += 1
+    }
+
+    indexstk(0) = length
+    endArray()
+  }
+
   def setFieldIndex(newI: Int) {
     assert(typestk.top.isInstanceOf[TStruct])
     indexstk(0) = newI
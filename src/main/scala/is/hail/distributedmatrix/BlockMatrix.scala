@@ -5,6 +5,7 @@ import java.io._
 import breeze.linalg.{DenseMatrix => BDM, _}
 import is.hail._
 import is.hail.annotations.Memory
+import is.hail.io.LoadNpy
 import is.hail.utils._
 import is.hail.utils.richUtils.RichDenseMatrixDouble
 import org.apache.commons.lang3.StringUtils
@@ -106,6 +107,13 @@ object BlockMatrix {
     new BlockMatrix(blocks, blockSize, rows, cols)
   }
 
+  /**
+    * Reads the two-dimensional NumPy array in the .npy file at {@code uri}, each block from its own
+    * byte ranges of the file.
+    **/
+  def importNpy(hc: HailContext, uri: String, blockSize: Int = defaultBlockSize): M =
+    LoadNpy.blockMatrix(hc, uri, blockSize)
+
   private[distributedmatrix] def assertCompatibleLocalMatrix(lm: BDM[Double]) {
     assert(lm.offset == 0, s"${ lm.offset }")
     assert(lm.majorStride == (if (lm.isTranspose) lm.cols else lm.rows), s"${ lm.majorStride } ${ lm.isTranspose } ${ lm.rows } ${ lm.cols }}")
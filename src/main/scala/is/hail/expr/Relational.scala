@@ -6,7 +6,7 @@ import is.hail.keytable.KTLocalValue
 import is.hail.methods.Aggregators
 import is.hail.sparkextras._
 import is.hail.rvd.{OrderedRVD, OrderedRVPartitioner, OrderedRVType, RVD}
-import is.hail.variant.{VSMFileMetadata, VSMLocalValue, VSMMetadata}
+import is.hail.variant.{ColumnGroup, ColumnGroups, VSMFileMetadata, VSMLocalValue, VSMMetadata}
 import org.apache.spark.rdd.RDD
 import org.apache.spark.sql.Row
 import is.hail.utils._
@@ -400,11 +400,20 @@ case class MatrixRead(
       if (dropVariants)
         OrderedRVD.empty(hc.sc, typ.orderedRVType)
       else {
+        val groups =
+          if (dropSamples)
+            Array.empty[ColumnGroup]
+          else
+            ColumnGroups.read(hc.hadoopConf, path, metadata.sSignature, metadata.saSignature, nPartitions)
+
         var rdd = OrderedRVD(
           typ.orderedRVType,
           OrderedRVPartitioner(hc.sc,
             hc.hadoopConf.readFile(path + "/partitioner.json.gz")(JsonMethods.parse(_))),
-          hc.readRows(path, typ.rowType, nPartitions))
+          if (groups.nonEmpty)
+            ColumnGroups.stitch(hc, path, typ, nPartitions, localValue.nSamples - groups.map(_.nSamples).sum, groups)
+          else
+            hc.readRows(path, typ.rowType, nPartitions))
         if (dropSamples) {
           val localRowType = typ.rowType
           rdd = rdd.mapPartitionsPreservesPartitioning(typ.orderedRVType) { it =>
@@ -0,0 +1,29 @@
+package is.hail.io
+
+import htsjdk.samtools.seekablestream.SeekableStream
+import is.hail.utils._
+import org.apache.hadoop
+import org.apache.hadoop.conf.Configuration
+
+// raw (undecompressed) seekable view of a Hadoop file, for htsjdk readers that seek by file offset
+class HadoopSeekableStream(hConf: Configuration, path: String) extends SeekableStream {
+  private val fileLength = hConf.getFileSize(path)
+
+  private val is = hConf.fileSystem(path).open(new hadoop.fs.Path(path))
+
+  def length(): Long = fileLength
+
+  def position(): Long = is.getPos
+
+  def seek(pos: Long): Unit = is.seek(pos)
+
+  def read(): Int = is.read()
+
+  override def read(buffer: Array[Byte], offset: Int, length: Int): Int = is.read(buffer, offset, length)
+
+  def eof(): Boolean = is.getPos >= fileLength
+
+  def getSource: String = path
+
+  def close(): Unit = is.close()
+}
@@ -113,6 +113,12 @@ class IndexBTree(indexFileName: String, hConf: Configuration) {
     }
   }
 
+  // element `i' of the indexed array
+  def apply(i: Long): Long = {
+    fs.seek(getOffset(maxDepth) + 8 * i)
+    fs.readLong()
+  }
+
   def queryIndex(query: Long): Option[Long] = {
     require( query >= 0 )
 
@@ -47,110 +47,6 @@ object LoadMatrix {
     newoff
   }
 
-  def setInt(string: String, off: Int, rvb: RegionValueBuilder, sep: Char, missingValue: String, file: String, rowID: String, colNum: Int): Int = {
-    var newoff = off
-    var v = 0
-    var isNegative = false
-    if (string(off) == sep) {
-      fatal(s"Error parsing matrix. Invalid Int32 at column: $colNum, row: $rowID in file: $file")
-    }
-    if (string(off) == '-' || string(off) == '+') {
-      isNegative = string(off) == '-'
-      newoff += 1
-    }
-    while (newoff < string.length && string(newoff) >= '0' && string(newoff) <= '9') {
-      v *= 10
-      v += string(newoff) - '0'
-      newoff += 1
-    }
-    if (newoff == off) {
-      while (newoff - off < missingValue.length && missingValue(newoff - off) == string(newoff)) {
-        newoff += 1
-      }
-      if (newoff - off == missingValue.length && (string.length == newoff || string(newoff) == sep)) {
-        rvb.setMissing()
-        newoff
-      } else {
-        fatal(s"Error parsing matrix. Invalid Int32 at column: $colNum, row: $rowID in file: $file")
-      }
-    } else if (string.length == newoff || string(newoff) == sep) {
-      rvb.addInt(if (isNegative) -v else v)
-      newoff
-    } else {
-      fatal(s"Error parsing matrix. Invalid Int32 at column: $colNum, row: $rowID in file: $file")
-    }
-  }
-
-  def setLong(string: String, off: Int, rvb: RegionValueBuilder, sep: Char, missingValue: String, file: String, rowID: String, colNum: Int): Int = {
-    var newoff = off
-    var v = 0L
-    var isNegative = false
-    if (string(off) == sep) {
-      fatal(s"Error parsing matrix. Invalid Int64 at column: $colNum, row: $rowID in file: $file")
-    }
-    if (string(off) == '-' || string(off) == '+') {
-      isNegative = string(off) == '-'
-      newoff += 1
-    }
-    while (newoff < string.length && string(newoff) >= '0' && string(newoff) <= '9') {
-      v *= 10
-      v += string(newoff) - '0'
-      newoff += 1
-    }
-    if (newoff == off) {
-      while (newoff - off < missingValue.length && missingValue(newoff - off) == string(newoff)) {
-        newoff += 1
-      }
-      if (newoff - off == missingValue.length && (string.length == newoff || string(newoff) == sep)) {
-        rvb.setMissing()
-        newoff
-      } else {
-        fatal(s"Error parsing matrix. Invalid Int64 at column: $colNum, row: $rowID in file: $file")
-      }
-    } else if (string.length == newoff || string(newoff) == sep) {
-      rvb.addLong(if (isNegative) -v else v)
-      newoff
-    } else {
-      fatal(s"Error parsing matrix. Invalid Int64 at column: $colNum, row: $rowID in file: $file")
-    }
-  }
-
-  def setFloat(string: String, off: Int, rvb: RegionValueBuilder, sep: Char, missingValue: String, file: String, rowID: String, colNum: Int): Int = {
-    var newoff = string.indexOf(sep, off)
-    if (newoff == -1) {
-      newoff = string.length
-    }
-    val v = string.substring(off, newoff)
-    if (v == missingValue) {
-      rvb.setMissing()
-    } else {
-      try {
-        rvb.addFloat(v.toFloat)
-      } catch {
-        case _: NumberFormatException => fatal(s"Error parsing matrix: $v is not a Float32. column: $colNum, row: $rowID in file: $file")
-      }
-    }
-    newoff
-  }
-
-  def setDouble(string: String, off: Int, rvb: RegionValueBuilder, sep: Char, missingValue: String, file: String, rowID: String, colNum: Int): Int = {
-    var newoff = string.indexOf(sep, off)
-    if (newoff == -1) {
-      newoff = string.length
-    }
-    val v = string.substring(off, newoff)
-    if (v == missingValue) {
-      rvb.setMissing()
-    } else {
-      try {
-        rvb.addDouble(v.toDouble)
-      } catch {
-        case _: NumberFormatException => fatal(s"Error parsing matrix: $v is not a Float64! column: $colNum, row: $rowID in file: $file")
-      }
-    }
-    newoff
-  }
-
   def apply(hc: HailContext,
     files: Array[String],
     nPartitions: Option[Int] = None,
@@ -160,18 +56,11 @@ object LoadMatrix {
     missingValue: String = "NA",
     hasRowIDName: Boolean = false): VariantSampleMatrix = {
 
-    val cellParser: (String, Int, RegionValueBuilder, Char, String, String, String, Int) => Int = cellType match {
-      case _: TInt32 => setInt
-      case _: TInt64 => setLong
-      case _: TFloat32 => setFloat
-      case _: TFloat64 => setDouble
-      case _: TString => setString
-      case _ =>
+    if (!NumericCellParser.isNumeric(cellType) && !cellType.isInstanceOf[TString])
       fatal(
         s"""expected cell type Int32, Int64, Float32, Float64, or String but got:
            |    ${ cellType.toPrettyString() }
          """.stripMargin)
-    }
 
     val sc = hc.sc
     val hConf = hc.hadoopConf
@@ -256,6 +145,13 @@ object LoadMatrix {
         val rvb = new RegionValueBuilder(region)
         val rv = RegionValue(region)
 
+        // numeric cells are parsed into a primitive array and copied into the region at once
+        val numericParser =
+          if (NumericCellParser.isNumeric(cellType) && nSamples > 0)
+            NumericCellParser(cellType, nSamples, sep(0), missingValue)
+          else
+            null
+
         if (firstPartitions(i))
           it.next()
 
@@ -275,31 +171,36 @@ object LoadMatrix {
           rvb.startStruct()
           rvb.endStruct()
 
-          rvb.startArray(nSamples)
-          if (nSamples > 0) {
-            var off = rowKey.length() + 1
-            var ii = 0
-            while (ii < nSamples) {
-              if (off > line.length) {
+          if (numericParser != null) {
+            numericParser.parse(line, rowKey.length() + 1, rowKey, fileByPartition(i))
+            numericParser.add(rvb)
+          } else {
+            rvb.startArray(nSamples)
+            if (nSamples > 0) {
+              var off = rowKey.length() + 1
+              var ii = 0
+              while (ii < nSamples) {
+                if (off > line.length) {
+                  fatal(
+                    s"""Incorrect number of elements in line:
+                       |    expected $nSamples elements in row $rowKey but only $ii elements found.
+                       |    in file ${ fileByPartition(i) }""".stripMargin
+                  )
+                }
+                off = setString(line, off, rvb, sep(0), missingValue, fileByPartition(i), rowKey, ii)
+                ii += 1
+                off += 1
+              }
+              if (off < line.length) {
                 fatal(
                   s"""Incorrect number of elements in line:
-                     |    expected $nSamples elements in row $rowKey but only $ii elements found.
+                     |    expected $nSamples elements in row but more data found.
                      |    in file ${ fileByPartition(i) }""".stripMargin
                 )
               }
-              off = cellParser(line, off, rvb, sep(0), missingValue, fileByPartition(i), rowKey, ii)
-              ii += 1
-              off += 1
-            }
-            if (off < line.length) {
-              fatal(
-                s"""Incorrect number of elements in line:
-                   |    expected $nSamples elements in row but more data found.
-                   |    in file ${ fileByPartition(i) }""".stripMargin
-              )
             }
+            rvb.endArray()
           }
-          rvb.endArray()
           rvb.endStruct()
           rv.setOffset(rvb.end())
           rv
@@ -0,0 +1,297 @@
+package is.hail.io
+
+import java.nio.{ByteBuffer, ByteOrder}
+import java.nio.charset.StandardCharsets
+
+import breeze.linalg.{DenseMatrix => BDM}
+import is.hail.HailContext
+import is.hail.annotations._
+import is.hail.distributedmatrix.{BlockMatrix, GridPartitioner, IntPartition}
+import is.hail.expr._
+import is.hail.rvd.{OrderedRVD, OrderedRVPartitioner}
+import is.hail.utils._
+import is.hail.variant._
+import org.apache.hadoop
+import org.apache.spark.rdd.RDD
+import org.apache.spark.sql.Row
+import org.apache.spark.{Partition, TaskContext}
+
+/**
+  * Header of a two-dimensional NumPy .npy file: the element type and byte order, whether the
+  * elements are stored column by column (Fortran order) rather than row by row, the shape, and the
+  * offset of the first element.
+  **/
+case class NpyHeader(cellType: Type, elementSize: Int, littleEndian: Boolean, fortranOrder: Boolean,
+  nRows: Long, nCols: Long, dataOffset: Long) {
+  def byteOrder: ByteOrder = if (littleEndian) ByteOrder.LITTLE_ENDIAN else ByteOrder.BIG_ENDIAN
+
+  // offset of element (i, j)
+  def offset(i: Long, j: Long): Long =
+    if (fortranOrder)
+      dataOffset + (j * nRows + i) * elementSize
+    else
+      dataOffset + (i * nCols + j) * elementSize
+
+  // reads the n elements from `offset' as doubles into data[dataOff, dataOff + n)
+  def readDoubles(in: hadoop.fs.FSDataInputStream, offset: Long, buf: Array[Byte], data: Array[Double], dataOff: Int, n: Int) {
+    in.readFully(offset, buf, 0, n * elementSize)
+    val bb = ByteBuffer.wrap(buf, 0, n * elementSize).order(byteOrder)
+    cellType match {
+      case _: TFloat64 =>
+        bb.asDoubleBuffer().get(data, dataOff, n)
+      case _: TFloat32 =>
+        var k = 0
+        while (k < n) {
+          data(dataOff + k) = bb.getFloat(4 * k)
+          k += 1
+        }
+      case _: TInt32 =>
+        var k = 0
+        while (k < n) {
+          data(dataOff + k) = bb.getInt(4 * k)
+          k += 1
+        }
+      case _: TInt64 =>
+        var k = 0
+        while (k < n) {
+          data(dataOff + k) = bb.getLong(8 * k)
+          k += 1
+        }
+    }
+  }
+}
+
+case class NpyRowsPartition(index: Int, start: Long, end: Long) extends Partition
+
+object LoadNpy {
+  val magic: Array[Byte] = Array(0x93.toByte) ++ "NUMPY".getBytes(StandardCharsets.US_ASCII)
+
+  private val descrRegex = """'descr'\s*:\s*'([<>=|])([fi])(\d+)'""".r
+  private val fortranOrderRegex = """'fortran_order'\s*:\s*(True|False)""".r
+  private val shapeRegex = """'shape'\s*:\s*\(([^)]*)\)""".r
+
+  def readHeader(hConf: hadoop.conf.Configuration, path: String): NpyHeader = {
+    val in = hConf.fileSystem(path).open(new hadoop.fs.Path(path))
+    val (headerOffset, header) = try {
+      val prefix = new Array[Byte](8)
+      in.readFully(0, prefix)
+      if (!prefix.take(6).sameElements(magic))
+        fatal(s"`$path' is not a NumPy .npy file")
+
+      val major = prefix(6).toInt
+      val (lengthSize, charset) = major match {
+        case 1 => (2, StandardCharsets.ISO_8859_1)
+        case 2 => (4, StandardCharsets.ISO_8859_1)
+        case 3 => (4, StandardCharsets.UTF_8)
+        case _ => fatal(s"`$path': unsupported .npy format version $major")
+      }
+
+      val lengthBytes = new Array[Byte](lengthSize)
+      in.readFully(8, lengthBytes)
+      val bb = ByteBuffer.wrap(lengthBytes).order(ByteOrder.LITTLE_ENDIAN)
+      val headerLength = if (lengthSize == 2) bb.getShort() & 0xffff else bb.getInt()
+
+      val headerBytes = new Array[Byte](headerLength)
+      in.readFully(8 + lengthSize, headerBytes)
+      (8L + lengthSize + headerLength, new String(headerBytes, charset))
+    } finally {
+      in.close()
+    }
+
+    val (byteOrder, kind, size) = descrRegex.findFirstMatchIn(header) match {
+      case Some(m) => (m.group(1), m.group(2), m.group(3).toInt)
+      case None => fatal(
+        s"""`$path': expected a float32, float64, int32 or int64 array
+           |  header: $header""".stripMargin)
+    }
+
+    val cellType: Type = (kind, size) match {
+      case ("f", 8) => TFloat64()
+      case ("f", 4) => TFloat32()
+      case ("i", 4) => TInt32()
+      case ("i", 8) => TInt64()
+      case _ => fatal(s"`$path': expected a float32, float64, int32 or int64 array, found dtype `$kind$size'")
+    }
+
+    val fortranOrder = fortranOrderRegex.findFirstMatchIn(header) match {
+      case Some(m) => m.group(1) == "True"
+      case None => fatal(s"`$path': invalid .npy header: $header")
+    }
+
+    val shape = shapeRegex.findFirstMatchIn(header) match {
+      case Some(m) => m.group(1).split(",").map(_.trim).filter(_.nonEmpty).map(_.toLong)
+      case None => fatal(s"`$path': invalid .npy header: $header")
+    }
+    if (shape.length != 2)
+      fatal(s"`$path': expected a two-dimensional array, found shape (${ shape.mkString(", ") })")
+
+    val littleEndian = byteOrder match {
+      case "<" => true
+      case ">" => false
+      case _ => ByteOrder.nativeOrder() == ByteOrder.LITTLE_ENDIAN
+    }
+
+    val h = NpyHeader(cellType, size, littleEndian, fortranOrder, shape(0), shape(1), headerOffset)
+    val expectedLength = h.dataOffset + h.nRows * h.nCols * size
+    if (hConf.fileStatus(path).getLen < expectedLength)
+      fatal(s"`$path' is truncated: expected at least $expectedLength bytes for shape (${ h.nRows }, ${ h.nCols })")
+    h
+  }
+
+  /**
+    * The matrix in the .npy file `path' as a dataset with a row per matrix row and a sample per
+    * matrix column. Rows are keyed by their Int64 index, samples by their Int32 index. Each
+    * partition reads its own byte range of the file.
+    **/
+  def apply(hc: HailContext, path: String, nPartitions: Option[Int] = None): VariantSampleMatrix = {
+    val sc = hc.sc
+    val h = readHeader(hc.hadoopConf, path)
+    if (h.fortranOrder)
+      fatal(s"`$path' is stored in Fortran order; save it in C order with numpy.ascontiguousarray to import it as a dataset")
+    if (h.nCols > Int.MaxValue)
+      fatal(s"`$path': too many columns: ${ h.nCols }")
+
+    val nCols = h.nCols.toInt
+    val cellType = h.cellType
+
+    // each partition reads a row at a time into one buffer
+    val rowBytesLong = h.nCols * h.elementSize
+    if (rowBytesLong > Int.MaxValue)
+      fatal(s"`$path': rows of ${ h.nCols } columns take $rowBytesLong bytes, more than the ${ Int.MaxValue } a row can take")
+    val rowBytes = rowBytesLong.toInt
+
+    val matrixType = MatrixType(VSMMetadata(
+      sSignature = TInt32(),
+      vSignature = TInt64(),
+      genotypeSignature = cellType))
+
+    // partitions count their rows with an Int
+    val minPartitions = (h.nRows + Int.MaxValue - 1) / Int.MaxValue
+    val n = math.max(minPartitions, math.max(1L, math.min(nPartitions.getOrElse(sc.defaultMinPartitions).toLong, h.nRows))).toInt
+    val partitions = Array.tabulate[Partition](n)(i => NpyRowsPartition(i, i * h.nRows / n, (i + 1) * h.nRows / n))
+
+    val sHadoopConfBc = sc.broadcast(new SerializableHadoopConfiguration(hc.hadoopConf))
+    val localRowType = matrixType.rowType
+
+    val rdd = new RDD[RegionValue](sc, Nil) {
+      def getPartitions: Array[Partition] = partitions
+
+      def compute(split: Partition, context: TaskContext): Iterator[RegionValue] = {
+        val p = split.asInstanceOf[NpyRowsPartition]
+        val hConf = sHadoopConfBc.value.value
+        val in = hConf.fileSystem(path).open(new hadoop.fs.Path(path))
+        context.addTaskCompletionListener(_ => in.close())
+
+        val buf = new Array[Byte](rowBytes)
+        val bb = ByteBuffer.wrap(buf).order(h.byteOrder)
+        val missing = new Array[Boolean](nCols)
+        val values: Any = cellType match {
+          case _: TFloat64 => new Array[Double](nCols)
+          case _: TFloat32 => new Array[Float](nCols)
+          case _: TInt32 => new Array[Int](nCols)
+          case _: TInt64 => new Array[Long](nCols)
+        }
+
+        val region = MemoryBuffer()
+        val rvb = new RegionValueBuilder(region)
+        val rv = RegionValue(region)
+
+        in.seek(h.offset(p.start, 0))
+        Iterator.range(0, (p.end - p.start).toInt).map { k =>
+          val row = p.start + k
+          in.readFully(buf)
+          values match {
+            case a: Array[Double] => bb.asDoubleBuffer().get(a)
+            case a: Array[Float] => bb.asFloatBuffer().get(a)
+            case a: Array[Int] => bb.asIntBuffer().get(a)
+            case a: Array[Long] => bb.asLongBuffer().get(a)
+          }
+
+          region.clear()
+          rvb.start(localRowType)
+          rvb.startStruct()
+          rvb.addLong(row)
+          rvb.addLong(row)
+          rvb.startStruct()
+          rvb.endStruct()
+          rvb.addPrimitiveArray(values, missing, nCols)
+          rvb.endStruct()
+          rv.setOffset(rvb.end())
+          rv
+        }
+      }
+    }
+
+    // rows are read in index order, so each partition's last index bounds it
+    val typ = matrixType.orderedRVType
+    val partitioner = new OrderedRVPartitioner(n, typ.partitionKey, typ.kType,
+      UnsafeIndexedSeq(TArray(typ.pkType), partitions.init.map(p => Row(p.asInstanceOf[NpyRowsPartition].end - 1): Annotation).toIndexedSeq))
+
+    val sampleIds: IndexedSeq[Annotation] = Array.tabulate[Annotation](nCols)(j => j)
+    new VariantSampleMatrix(hc,
+      matrixType.metadata,
+      VSMLocalValue(Annotation.empty,
+        sampleIds,
+        Annotation.emptyIndexedSeq(nCols)),
+      OrderedRVD(typ, partitioner, rdd))
+  }
+
+  /**
+    * The matrix in the .npy file `path' as a block matrix of Float64 with blocks of `blockSize'.
+    * Each block is read directly from its byte ranges of the file.
+    **/
+  def blockMatrix(hc: HailContext, path: String, blockSize: Int = BlockMatrix.defaultBlockSize): BlockMatrix = {
+    val sc = hc.sc
+    val h = readHeader(hc.hadoopConf, path)
+    val gp = GridPartitioner(blockSize, h.nRows, h.nCols)
+
+    val sHadoopConfBc = sc.broadcast(new SerializableHadoopConfiguration(hc.hadoopConf))
+
+    val blocks = new RDD[((Int, Int), BDM[Double])](sc, Nil) {
+      override val partitioner = Some(gp)
+
+      def getPartitions: Array[Partition] = Array.tabulate(gp.numPartitions)(i => IntPartition(i))
+
+      def compute(split: Partition, context: TaskContext): Iterator[((Int, Int), BDM[Double])] = {
+        val (i, j) = gp.blockCoordinates(split.index)
+        val (blockNRows, blockNCols) = gp.blockDims(split.index)
+        val iOffset = i.toLong * blockSize
+        val jOffset = j.toLong * blockSize
+
+        val data = new Array[Double](blockNRows * blockNCols)
+        val hConf = sHadoopConfBc.value.value
+        val in = hConf.fileSystem(path).open(new hadoop.fs.Path(path))
+        try {
+          if (h.fortranOrder) {
+            // each block column is contiguous in the file and in the column-major block
+            val buf = new Array[Byte](blockNRows * h.elementSize)
+            var c = 0
+            while (c < blockNCols) {
+              h.readDoubles(in, h.offset(iOffset, jOffset + c), buf, data, c * blockNRows, blockNRows)
+              c += 1
+            }
+          } else {
+            val buf = new Array[Byte](blockNCols * h.elementSize)
+            val row = new Array[Double](blockNCols)
+            var r = 0
+            while (r < blockNRows) {
+              h.readDoubles(in, h.offset(iOffset + r, jOffset), buf, row, 0, blockNCols)
+              var c = 0
+              while (c < blockNCols) {
+                data(c * blockNRows + r) = row(c)
+                c += 1
+              }
+              r += 1
+            }
+          }
+        } finally {
+          in.close()
+        }
+
+        Iterator(((i, j), new BDM[Double](blockNRows, blockNCols, data)))
+      }
+    }
+
+    new BlockMatrix(blocks, blockSize, h.nRows, h.nCols)
+  }
+}
@@ -0,0 +1,282 @@
+package is.hail.io
+
+import is.hail.annotations.RegionValueBuilder
+import is.hail.expr._
+import is.hail.utils._
+
+object NumericCellParser {
+  def apply(cellType: Type, nCells: Int, sep: Char, missingValue: String): NumericCellParser = cellType match {
+    case _: TInt32 => new Int32CellParser(nCells, sep, missingValue)
+    case _: TInt64 => new Int64CellParser(nCells, sep, missingValue)
+    case _: TFloat32 => new Float32CellParser(nCells, sep, missingValue)
+    case _: TFloat64 => new Float64CellParser(nCells, sep, missingValue)
+  }
+
+  def isNumeric(cellType: Type): Boolean = cellType match {
+    case _: TInt32 | _: TInt64 | _: TFloat32 | _: TFloat64 => true
+    case _ => false
+  }
+
+  // powers of ten that are exact as doubles and floats
+  val doublePowersOfTen: Array[Double] = Array.tabulate(23)(i => s"1e$i".toDouble)
+  val floatPowersOfTen: Array[Float] = Array.tabulate(11)(i => s"1e$i".toFloat)
+
+  // the most digits a long can accumulate without overflow
+  val maxDigits: Int = 18
+
+  /**
+    * Decimal mantissa and exponent of line[start, end) in the form [+-]digits[.digits][(e|E)[+-]digits],
+    * or false if it is not of that form or has more than maxDigits significant digits. Numbers
+    * outside the fast paths of the parsers below, and forms like "NaN" or "Infinity", are left to
+    * the JDK.
+    **/
+  final class Decimal {
+    var negative: Boolean = false
+    var mantissa: Long = 0L
+    var nDigits: Int = 0
+    var exponent: Int = 0
+
+    def parse(line: String, start: Int, end: Int): Boolean = {
+      var p = start
+      negative = false
+      mantissa = 0L
+      nDigits = 0
+      exponent = 0
+
+      if (p < end && (line.charAt(p) == '-' || line.charAt(p) == '+')) {
+        negative = line.charAt(p) == '-'
+        p += 1
+      }
+
+      var sawDigit = false
+      var d = 0
+      while (p < end && { d = line.charAt(p) - '0'; d >= 0 && d <= 9 }) {
+        if (mantissa != 0 || d != 0) {
+          if (nDigits == maxDigits)
+            return false
+          mantissa = mantissa * 10 + d
+          nDigits += 1
+        }
+        sawDigit = true
+        p += 1
+      }
+
+      if (p < end && line.charAt(p) == '.') {
+        p += 1
+        while (p < end && { d = line.charAt(p) - '0'; d >= 0 && d <= 9 }) {
+          if (mantissa != 0 || d != 0) {
+            if (nDigits == maxDigits)
+              return false
+            mantissa = mantissa * 10 + d
+            nDigits += 1
+          }
+          exponent -= 1
+          sawDigit = true
+          p += 1
+        }
+      }
+
+      if (!sawDigit)
+        return false
+
+      if (p < end && (line.charAt(p) == 'e' || line.charAt(p) == 'E')) {
+        p += 1
+        var negativeExponent = false
+        if (p < end && (line.charAt(p) == '-' || line.charAt(p) == '+')) {
+          negativeExponent = line.charAt(p) == '-'
+          p += 1
+        }
+        if (p == end)
+          return false
+        var e = 0
+        while (p < end && { d = line.charAt(p) - '0'; d >= 0 && d <= 9 }) {
+          // anything this large is outside the fast paths anyway
+          if (e < 100000)
+            e = e * 10 + d
+          p += 1
+        }
+        exponent += (if (negativeExponent) -e else e)
+      }
+
+      p == end
+    }
+  }
+}
+
+/**
+  * Parses the cells of a line of a numeric matrix into a primitive array, which is then added to a
+  * region value in one copy.
+  **/
+abstract class NumericCellParser(val nCells: Int, sep: Char, missingValue: String) {
+  val missing: Array[Boolean] = new Array[Boolean](nCells)
+
+  def values: Any
+
+  // parses line[start, end) into cell i, returns false if it is not a number of the cell type
+  def parseCell(line: String, start: Int, end: Int, i: Int): Boolean
+
+  def invalidMessage(cell: String, colNum: Int, rowID: String, file: String): String
+
+  def isMissing(line: String, start: Int, end: Int): Boolean =
+    end - start == missingValue.length && line.regionMatches(start, missingValue, 0, missingValue.length)
+
+  // parses the cells of `line' following position `off'
+  def parse(line: String, off: Int, rowID: String, file: String) {
+    var start = off
+    var i = 0
+    while (i < nCells) {
+      if (start > line.length)
+        fatal(
+          s"""Incorrect number of elements in line:
+             |    expected $nCells elements in row $rowID but only $i elements found.
+             |    in file $file""".stripMargin)
+
+      var end = line.indexOf(sep, start)
+      if (end == -1)
+        end = line.length
+
+      if (isMissing(line, start, end))
+        missing(i) = true
+      else {
+        missing(i) = false
+        if (!parseCell(line, start, end, i))
+          fatal(invalidMessage(line.substring(start, end), i, rowID, file))
+      }
+
+      start = end + 1
+      i += 1
+    }
+
+    if (start < line.length)
+      fatal(
+        s"""Incorrect number of elements in line:
+           |    expected $nCells elements in row but more data found.
+           |    in file $file""".stripMargin)
+  }
+
+  def add(rvb: RegionValueBuilder) {
+    rvb.addPrimitiveArray(values, missing, nCells)
+  }
+}
+
+class Int32CellParser(nCells: Int, sep: Char, missingValue: String) extends NumericCellParser(nCells, sep, missingValue) {
+  val values: Array[Int] = new Array[Int](nCells)
+
+  def parseCell(line: String, start: Int, end: Int, i: Int): Boolean = {
+    var p = start
+    var negative = false
+    if (p < end && (line.charAt(p) == '-' || line.charAt(p) == '+')) {
+      negative = line.charAt(p) == '-'
+      p += 1
+    }
+    if (p == end)
+      return false
+
+    var v = 0
+    while (p < end) {
+      val d = line.charAt(p) - '0'
+      if (d < 0 || d > 9)
+        return false
+      v = v * 10 + d
+      p += 1
+    }
+    values(i) = if (negative) -v else v
+    true
+  }
+
+  def invalidMessage(cell: String, colNum: Int, rowID: String, file: String): String =
+    s"Error parsing matrix. Invalid Int32 at column: $colNum, row: $rowID in file: $file"
+}
+
+class Int64CellParser(nCells: Int, sep: Char, missingValue: String) extends NumericCellParser(nCells, sep, missingValue) {
+  val values: Array[Long] = new Array[Long](nCells)
+
+  def parseCell(line: String, start: Int, end: Int, i: Int): Boolean = {
+    var p = start
+    var negative = false
+    if (p < end && (line.charAt(p) == '-' || line.charAt(p) == '+')) {
+      negative = line.charAt(p) == '-'
+      p += 1
+    }
+    if (p == end)
+      return false
+
+    var v = 0L
+    while (p < end) {
+      val d = line.charAt(p) - '0'
+      if (d < 0 || d > 9)
+        return false
+      v = v * 10 + d
+      p += 1
+    }
+    values(i) = if (negative) -v else v
+    true
+  }
+
+  def invalidMessage(cell: String, colNum: Int, rowID: String, file: String): String =
+    s"Error parsing matrix. Invalid Int64 at column: $colNum, row: $rowID in file: $file"
+}
+
+// a mantissa of at most 7 digits and a power of ten up to 1e10 are exact as floats, so one
+// multiplication or division rounds correctly
+class Float32CellParser(nCells: Int, sep: Char, missingValue: String) extends NumericCellParser(nCells, sep, missingValue) {
+  val values: Array[Float] = new Array[Float](nCells)
+
+  private val decimal = new NumericCellParser.Decimal
+
+  def parseCell(line: String, start: Int, end: Int, i: Int): Boolean = {
+    if (decimal.parse(line, start, end) && decimal.nDigits <= 7
+      && decimal.exponent >= -10 && decimal.exponent <= 10) {
+      val m = decimal.mantissa.toFloat
+      val f =
+        if (decimal.exponent >= 0)
+          m * NumericCellParser.floatPowersOfTen(decimal.exponent)
+        else
+          m / NumericCellParser.floatPowersOfTen(-decimal.exponent)
+      values(i) = if (decimal.negative) -f else f
+      true
+    } else {
+      try {
+        values(i) = line.substring(start, end).toFloat
+        true
+      } catch {
+        case _: NumberFormatException => false
+      }
+    }
+  }
+
+  def invalidMessage(cell: String, colNum: Int, rowID: String, file: String): String =
+    s"Error parsing matrix: $cell is not a Float32. column: $colNum, row: $rowID in file: $file"
+}
+
+// a mantissa of at most 15 digits and a power of ten up to 1e22 are exact as doubles, so one
+// multiplication or division rounds correctly
+class Float64CellParser(nCells: Int, sep: Char, missingValue: String) extends NumericCellParser(nCells, sep, missingValue) {
+  val values: Array[Double] = new Array[Double](nCells)
+
+  private val decimal = new NumericCellParser.Decimal
+
+  def parseCell(line: String, start: Int, end: Int, i: Int): Boolean = {
+    if (decimal.parse(line, start, end) && decimal.nDigits <= 15
+      && decimal.exponent >= -22 && decimal.exponent <= 22) {
+      val m = decimal.mantissa.toDouble
+      val d =
+        if (decimal.exponent >= 0)
+          m * NumericCellParser.doublePowersOfTen(decimal.exponent)
+        else
+          m / NumericCellParser.doublePowersOfTen(-decimal.exponent)
+      values(i) = if (decimal.negative) -d else d
+      true
+    } else {
+      try {
+        values(i) = line.substring(start, end).toDouble
+        true
+      } catch {
+        case _: NumberFormatException => false
+      }
+    }
+  }
+
+  def invalidMessage(cell: String, colNum: Int, rowID: String, file: String): String =
+    s"Error parsing matrix: $cell is not a Float64! column: $colNum, row: $rowID in file: $file"
+}
@@ -52,13 +52,7 @@ class BgenBlockReaderV11(job: Configuration, split: FileSplit) extends BgenBlock
       val ref = bfis.readLengthAndString(4)
       val alt = bfis.readLengthAndString(4)
 
-      val recodedChr = chr match {
-        case "23" => "X"
-        case "24" => "Y"
-        case "25" => "X"
-        case "26" => "MT"
-        case x => x
-      }
+      val recodedChr = BgenLoader.recodeChromosome(chr)
 
       val variant = Variant(recodedChr, position, ref, alt)
 
@@ -103,13 +97,7 @@ class BgenBlockReaderV12(job: Configuration, split: FileSplit) extends BgenBlock
         altIndex += 1
       }
 
-      val recodedChr = chr match {
-        case "23" => "X"
-        case "24" => "Y"
-        case "25" => "X"
-        case "26" => "MT"
-        case x => x
-      }
+      val recodedChr = BgenLoader.recodeChromosome(chr)
 
       val variant = Variant(recodedChr, position, ref, altAlleles)
 
@@ -2,13 +2,17 @@ package is.hail.io.bgen
 
 import is.hail.HailContext
 import is.hail.annotations._
-import is.hail.expr.{MatrixType, TArray, TCall, TFloat64, TString, TStruct, TVariant}
+import is.hail.expr.{MatrixType, TArray, TCall, TFloat32, TFloat64, TString, TStruct, TVariant}
 import is.hail.io.vcf.LoadVCF
 import is.hail.io.{HadoopFSDataBinaryReader, IndexBTree}
 import is.hail.rvd.OrderedRVD
 import is.hail.utils._
 import is.hail.variant._
+import org.apache.hadoop.conf.Configuration
+import org.apache.hadoop.fs.Path
 import org.apache.hadoop.io.LongWritable
+import org.apache.hadoop.mapred.FileSplit
+import org.apache.spark.SparkContext
 import org.apache.spark.rdd.RDD
 
 import scala.io.Source
@@ -18,34 +22,45 @@ case class BgenHeader(compressed: Boolean, nSamples: Int, nVariants: Int,
 
 case class BgenResult[T <: BgenRecord](file: String, nSamples: Int, nVariants: Int, rdd: RDD[(LongWritable, T)])
 
+// the variants of `file' whose data blocks lie in byte offsets [start, end)
+case class BgenRange(file: String, start: Long, end: Long)
+
 object BgenLoader {
 
   def load(hc: HailContext, files: Array[String], sampleFile: Option[String] = None,
     tolerance: Double, nPartitions: Option[Int] = None, gr: GenomeReference = GenomeReference.defaultReference,
-    contigRecoding: Map[String, String] = Map.empty[String, String]): GenericDataset = {
+    contigRecoding: Map[String, String] = Map.empty[String, String],
+    samples: Option[IndexedSeq[String]] = None,
+    intervals: Option[Seq[Interval[Locus]]] = None,
+    dosageOnly: Boolean = false): GenericDataset = {
     require(files.nonEmpty)
-    val sampleIds = sampleFile.map(file => BgenLoader.readSampleFile(hc.hadoopConf, file))
+    val fileSampleIds = sampleFile.map(file => BgenLoader.readSampleFile(hc.hadoopConf, file))
       .getOrElse(BgenLoader.readSamples(hc.hadoopConf, files.head))
 
-    LoadVCF.warnDuplicates(sampleIds)
+    LoadVCF.warnDuplicates(fileSampleIds)
 
-    val nSamples = sampleIds.length
+    val nSamples = fileSampleIds.length
 
     hc.hadoopConf.setDouble("tolerance", tolerance)
 
     val sc = hc.sc
-    val results = files.map { file =>
-      val bState = readState(sc.hadoopConfiguration, file)
-
-      bState.version match {
-        case 1 =>
-          BgenResult(file, bState.nSamples, bState.nVariants,
-            sc.hadoopFile(file, classOf[BgenInputFormatV11], classOf[LongWritable], classOf[BgenRecordV11], nPartitions.getOrElse(sc.defaultMinPartitions)))
-        case 2 =>
-          BgenResult(file, bState.nSamples, bState.nVariants,
-            sc.hadoopFile(file, classOf[BgenInputFormatV12], classOf[LongWritable], classOf[BgenRecordV12], nPartitions.getOrElse(sc.defaultMinPartitions)))
-        case x => fatal(s"Hail does not support BGEN v1.$x.")
-      }
+    val results: Array[BgenResult[_ <: BgenRecord]] = intervals match {
+      case Some(ivs) =>
+        readIntervals(hc, files, ivs, gr, contigRecoding, nPartitions.getOrElse(sc.defaultMinPartitions))
+      case None =>
+        files.map { file =>
+          val bState = readState(sc.hadoopConfiguration, file)
+
+          bState.version match {
+            case 1 =>
+              BgenResult(file, bState.nSamples, bState.nVariants,
+                sc.hadoopFile(file, classOf[BgenInputFormatV11], classOf[LongWritable], classOf[BgenRecordV11], nPartitions.getOrElse(sc.defaultMinPartitions)))
+            case 2 =>
+              BgenResult(file, bState.nSamples, bState.nVariants,
+                sc.hadoopFile(file, classOf[BgenInputFormatV12], classOf[LongWritable], classOf[BgenRecordV12], nPartitions.getOrElse(sc.defaultMinPartitions)))
+            case x => fatal(s"Hail does not support BGEN v1.$x.")
+          }
+        }
     }
 
     val unequalSamples = results.filter(_.nSamples != nSamples).map(x => (x.file, x.nSamples))
@@ -55,7 +70,7 @@ object BgenLoader {
            |  ${ unequalSamples.map(x => s"""(${ x._2 } ${ x._1 }""").mkString("\n  ") }""".stripMargin)
 
     val noVariants = results.filter(_.nVariants == 0).map(_.file)
-    if (noVariants.length > 0)
+    if (noVariants.length > 0 && intervals.isEmpty)
       fatal(
         s"""The following BGEN files did not contain at least 1 variant:
            |  ${ noVariants.mkString("\n  ") })""".stripMargin)
@@ -66,6 +81,24 @@ object BgenLoader {
     info(s"Number of samples in BGEN files: $nSamples")
     info(s"Number of variants across all BGEN files: $nVariants")
 
+    val sampleIndices: Array[Int] = samples.map { keep =>
+      val keepSet = keep.toSet
+      val unknown = keepSet -- fileSampleIds
+      if (unknown.nonEmpty)
+        fatal(
+          s"""${ plural(unknown.size, "sample is", "samples are") } not in the BGEN files:
+             |  ${ unknown.take(10).mkString("\n  ") }""".stripMargin)
+      fileSampleIds.indices.filter(i => keepSet.contains(fileSampleIds(i))).toArray
+    }.orNull
+
+    val sampleIds =
+      if (sampleIndices == null)
+        fileSampleIds
+      else {
+        info(s"Decoding ${ plural(sampleIndices.length, "sample") } of $nSamples")
+        sampleIndices.map(fileSampleIds)
+      }
+
     val signature = TStruct("rsid" -> TString(), "varid" -> TString())
 
     val metadata = VSMMetadata(
@@ -73,7 +106,11 @@ object BgenLoader {
       saSignature = TStruct.empty(),
       TVariant(gr),
       vaSignature = signature,
-      genotypeSignature = TStruct("GT" -> TCall(), "GP" -> TArray(TFloat64())),
+      genotypeSignature =
+        if (dosageOnly)
+          TStruct("dosage" -> TFloat32())
+        else
+          TStruct("GT" -> TCall(), "GP" -> TArray(TFloat64())),
       globalSignature = TStruct.empty())
 
     val matrixType = MatrixType(metadata)
@@ -118,6 +155,8 @@ object BgenLoader {
         rvb.addAnnotation(rowType.fieldType(0), vRecoded.locus) // locus/pk
         rvb.addAnnotation(rowType.fieldType(1), vRecoded)
         rvb.addAnnotation(rowType.fieldType(2), va)
+        record.setSampleIndices(sampleIndices)
+        record.setDosageOnly(dosageOnly)
         record.getValue(rvb) // gs
         rvb.endStruct()
 
@@ -129,38 +168,332 @@ object BgenLoader {
     new VariantSampleMatrix(hc, metadata,
       VSMLocalValue(globalAnnotation = Annotation.empty,
         sampleIds = sampleIds,
-        sampleAnnotations = Array.fill(nSamples)(Annotation.empty)),
+        sampleAnnotations = Array.fill(sampleIds.length)(Annotation.empty)),
       OrderedRVD(matrixType.orderedRVType, rdd2, Some(fastKeys), None))
   }
 
-  def index(hConf: org.apache.hadoop.conf.Configuration, file: String) {
+  def recodeChromosome(chr: String): String = chr match {
+    case "23" => "X"
+    case "24" => "Y"
+    case "25" => "X"
+    case "26" => "MT"
+    case x => x
+  }
+
+  // locus of the variant whose data block starts at the current position of `reader'
+  def readLocus(reader: HadoopFSDataBinaryReader, version: Int, contigRecoding: Map[String, String]): Locus = {
+    if (version == 1)
+      reader.readInt() // nRows for v1.1 only
+    reader.readLengthAndString(2) // snpid
+    reader.readLengthAndString(2) // rsid
+    val chr = recodeChromosome(reader.readLengthAndString(2))
+    val pos = reader.readInt()
+    Locus(contigRecoding.getOrElse(chr, chr), pos)
+  }
+
+  // `intervals' as sorted, disjoint [start, end) locus ranges
+  def mergeIntervals(intervals: Seq[Interval[Locus]], gr: GenomeReference): Array[(Locus, Locus)] = {
+    val ord = gr.locusOrdering
+    val sorted = intervals
+      .filter(i => ord.lt(i.start, i.end))
+      .sortWith((i1, i2) => ord.lt(i1.start, i2.start))
+
+    val ab = new ArrayBuilder[(Locus, Locus)]()
+    sorted.foreach { i =>
+      if (ab.length > 0 && ord.lteq(i.start, ab(ab.length - 1)._2)) {
+        val (start, end) = ab(ab.length - 1)
+        ab(ab.length - 1) = (start, ord.max(end, i.end))
+      } else
+        ab += ((i.start, i.end))
+    }
+    ab.result()
+  }
+
+  /**
+    * Variant indices [i, j) of `file' in each of the merged `ranges', found by binary search over the
+    * data block offsets in the .idx file. Assumes the variants of the file are sorted by locus.
+    **/
+  def variantRanges(hConf: org.apache.hadoop.conf.Configuration, file: String, btree: IndexBTree,
+    ranges: Array[(Locus, Locus)], gr: GenomeReference, contigRecoding: Map[String, String]): Array[(Int, Int)] = {
+    val bState = readState(hConf, file)
+    val ord = gr.locusOrdering
+
+    hConf.readFile(file) { is =>
+      val reader = new HadoopFSDataBinaryReader(is)
+
+      def locus(k: Int): Locus = {
+        reader.seek(btree(k))
+        readLocus(reader, bState.version, contigRecoding)
+      }
+
+      // index of the first variant at or after `l'
+      def lowerBound(l: Locus): Int = {
+        var lo = 0
+        var hi = bState.nVariants
+        while (lo < hi) {
+          val mid = (lo + hi) >>> 1
+          if (ord.lt(locus(mid), l))
+            lo = mid + 1
+          else
+            hi = mid
+        }
+        lo
+      }
+
+      ranges.map { case (start, end) => (lowerBound(start), lowerBound(end)) }
+        .filter { case (i, j) => i < j }
+    }
+  }
+
+  // records of the variants in `ranges', read with seeks instead of scanning the files
+  def readRanges[T <: BgenRecord](sc: SparkContext, ranges: Array[BgenRange],
+    newReader: (Configuration, FileSplit) => BgenBlockReader[T]): RDD[(LongWritable, T)] = {
+    val confBc = sc.broadcast(new SerializableHadoopConfiguration(sc.hadoopConfiguration))
+
+    sc.parallelize(ranges, math.max(1, ranges.length)).mapPartitions { it =>
+      it.flatMap { r =>
+        val reader = newReader(confBc.value.value,
+          new FileSplit(new Path(r.file), r.start, r.end - r.start, Array.empty[String]))
+        val key = reader.createKey()
+        val value = reader.createValue()
+
+        new Iterator[(LongWritable, T)] {
+          private var fetched = false
+          private var more = false
+
+          def hasNext: Boolean = {
+            if (!fetched) {
+              more = reader.next(key, value)
+              fetched = true
+              if (!more)
+                reader.close()
+            }
+            more
+          }
+
+          def next(): (LongWritable, T) = {
+            assert(hasNext)
+            fetched = false
+            (key, value)
+          }
+        }
+      }
+    }
+  }
+
+  def readIntervals(hc: HailContext, files: Array[String], intervals: Seq[Interval[Locus]],
+    gr: GenomeReference, contigRecoding: Map[String, String], nPartitions: Int): Array[BgenResult[_ <: BgenRecord]] = {
+    val hConf = hc.hadoopConf
+    val merged = mergeIntervals(intervals, gr)
+
+    val fileRanges = files.map { file =>
+      val btree = new IndexBTree(file + ".idx", hConf)
+      try {
+        (file, variantRanges(hConf, file, btree, merged, gr, contigRecoding))
+      } finally {
+        btree.close()
+      }
+    }
+
+    val nSelected = fileRanges.map(_._2.map { case (i, j) => j - i }.sum).sum
+    info(s"reading ${ plural(nSelected, "variant") } in ${ plural(merged.length, "interval") } from ${ plural(files.length, "file") }")
+
+    // split ranges so the number of partitions is about `nPartitions'
+    val maxVariants = math.max(1, (nSelected + nPartitions - 1) / math.max(1, nPartitions))
+
+    fileRanges.map { case (file, ranges) =>
+      val bState = readState(hConf, file)
+      val btree = new IndexBTree(file + ".idx", hConf)
+      val parts = try {
+        ranges.flatMap { case (i, j) =>
+          val bounds = ((i until j by maxVariants) :+ j).map(btree(_))
+          bounds.zip(bounds.tail).map { case (start, end) => BgenRange(file, start, end) }
+        }
+      } finally {
+        btree.close()
+      }
+      val nVariants = ranges.map { case (i, j) => j - i }.sum
+
+      bState.version match {
+        case 1 =>
+          BgenResult(file, bState.nSamples, nVariants,
+            readRanges(hc.sc, parts, (conf, split) => new BgenBlockReaderV11(conf, split)))
+        case 2 =>
+          BgenResult(file, bState.nSamples, nVariants,
+            readRanges(hc.sc, parts, (conf, split) => new BgenBlockReaderV12(conf, split)))
+        case x => fatal(s"Hail does not support BGEN v1.$x.")
+      }
+    }
+  }
+
+  // variants between checkpoints of an index being built
+  val indexCheckpointInterval: Int = 250000
+
+  val partialIndexMagicNumber: Int = 0x42494432 // "BID2"
+
+  /**
+    * Directory of the progress of an index being built: a header stamped with the length and
+    * modification time of the file, and one segment per checkpoint, named `<start>-<end>', holding
+    * the offsets of the data blocks of variants [start, end). Each checkpoint only writes the offsets
+    * found since the last one; the last offset is where indexing resumes.
+    **/
+  def partialIndexPath(file: String): String = file + ".idx.partial"
+
+  // is the .idx of `file' complete and newer than `file'
+  def isIndexed(hConf: org.apache.hadoop.conf.Configuration, file: String): Boolean = {
     val indexFile = file + ".idx"
+    hConf.exists(indexFile) && !hConf.exists(partialIndexPath(file)) &&
+      hConf.fileStatus(indexFile).getModificationTime >= hConf.fileStatus(file).getModificationTime
+  }
+
+  /**
+    * Offsets of the data blocks of the first variants of `file', saved by an interrupted run of
+    * [[index]], if they were taken from the current version of the file.
+    **/
+  def readPartialIndex(hConf: org.apache.hadoop.conf.Configuration, file: String): Option[Array[Long]] = {
+    val path = partialIndexPath(file)
+    if (!hConf.exists(path + "/header"))
+      return None
+
+    val status = hConf.fileStatus(file)
+    try {
+      val current = hConf.readDataFile(path + "/header") { in =>
+        in.readInt() == partialIndexMagicNumber &&
+          in.readLong() == status.getLen &&
+          in.readLong() == status.getModificationTime
+      }
+      if (!current)
+        return None
+
+      val segments = hConf.glob(path + "/[0-9]*-[0-9]*")
+        .map { fs =>
+          val Array(start, end) = fs.getPath.getName.split("-").map(_.toInt)
+          (start, end, fs.getPath.toString)
+        }
+        .sortBy(_._1)
+
+      // segments are written in order, so they run contiguously from variant 0
+      val ab = new ArrayBuilder[Long]()
+      segments.foreach { case (start, end, segment) =>
+        if (start != ab.length)
+          fatal(s"missing offsets of variants ${ ab.length } to $start")
+        hConf.readDataFile(segment) { in =>
+          var i = start
+          while (i < end) {
+            ab += in.readLong()
+            i += 1
+          }
+        }
+      }
+      Some(ab.result())
+    } catch {
+      case e: Exception =>
+        warn(s"ignoring unreadable partial BGEN index `$path': ${ e.getMessage }")
+        None
+    }
+  }
+
+  // starts the progress of an index of `file', discarding any earlier one
+  def startPartialIndex(hConf: org.apache.hadoop.conf.Configuration, file: String) {
+    val path = partialIndexPath(file)
+    val status = hConf.fileStatus(file)
+    hConf.delete(path, recursive = true)
+    hConf.mkDir(path)
+    hConf.writeDataFile(path + "/.header") { out =>
+      out.writeInt(partialIndexMagicNumber)
+      out.writeLong(status.getLen)
+      out.writeLong(status.getModificationTime)
+    }
+    hConf.renameOverwrite(path + "/.header", path + "/header")
+  }
+
+  // saves the offsets of variants [start, end) as a segment; renamed into place once written
+  def appendPartialIndex(hConf: org.apache.hadoop.conf.Configuration, file: String, offsets: Array[Long],
+    start: Int, end: Int) {
+    val path = partialIndexPath(file)
+    val segment = s"$path/$start-$end"
+    hConf.writeDataFile(s"$path/.$start-$end") { out =>
+      var i = start
+      while (i < end) {
+        out.writeLong(offsets(i))
+        i += 1
+      }
+    }
+    hConf.renameOverwrite(s"$path/.$start-$end", segment)
+  }
+
+  /**
+    * Writes the .idx of `file'. Each variant block has to be found from the length of the one before
+    * it, so the walk is serial; it only reads the lengths in each block header and seeks past the
+    * rest. Progress is saved to the .idx.partial directory every `checkpointInterval' variants and
+    * picked up again by the next call if the run is interrupted.
+    **/
+  def index(hConf: org.apache.hadoop.conf.Configuration, file: String,
+    checkpointInterval: Int = indexCheckpointInterval) {
+    val dataBlockStarts = findDataBlocks(hConf, file, checkpointInterval)
+    IndexBTree.write(dataBlockStarts, file + ".idx", hConf)
+    hConf.delete(partialIndexPath(file), recursive = true)
+  }
+
+  /**
+    * Offsets of the data blocks of `file', resuming from its .idx.partial directory and checkpointing
+    * to it every `checkpointInterval' variants. If `until' is given, the walk stops after that many
+    * variants, as an interrupted run would, and only the offsets found are meaningful.
+    **/
+  def findDataBlocks(hConf: org.apache.hadoop.conf.Configuration, file: String, checkpointInterval: Int,
+    until: Option[Int] = None): Array[Long] = {
+    require(checkpointInterval > 0)
 
     val bState = readState(hConf, file)
+    val nVariants = until.fold(bState.nVariants)(math.min(_, bState.nVariants))
 
     val dataBlockStarts = new Array[Long](bState.nVariants + 1)
-    var position: Long = bState.dataStart
+    dataBlockStarts(0) = bState.dataStart
+    var nKnown = 1
+
+    // offsets [0, nCheckpointed) are saved in .idx.partial; a fresh run has yet to save dataStart
+    var nCheckpointed = 0
+
+    readPartialIndex(hConf, file) match {
+      case Some(offsets) if offsets.length > 0 && offsets.length <= dataBlockStarts.length =>
+        System.arraycopy(offsets, 0, dataBlockStarts, 0, offsets.length)
+        nKnown = offsets.length
+        nCheckpointed = nKnown
+        info(s"resuming index of `$file' at variant ${ nKnown - 1 } of ${ bState.nVariants }")
+      case _ =>
+        // marks the index as incomplete until the .idx is written
+        startPartialIndex(hConf, file)
+    }
 
-    dataBlockStarts(0) = position
+    var position: Long = dataBlockStarts(nKnown - 1)
 
     hConf.readFile(file) { is =>
       val reader = new HadoopFSDataBinaryReader(is)
-      reader.seek(0)
 
-      for (i <- 1 to bState.nVariants) {
+      def skipLengthAndString(lengthBytes: Int) {
+        val length = if (lengthBytes == 2) reader.readShort() else reader.readInt()
+        reader.seek(reader.getPosition + length)
+      }
+
+      var i = nKnown
+      while (i <= nVariants) {
         reader.seek(position)
 
         if (bState.version == 1)
           reader.readInt() // nRows for v1.1 only
 
-        val snpid = reader.readLengthAndString(2)
-        val rsid = reader.readLengthAndString(2)
-        val chr = reader.readLengthAndString(2)
-        val pos = reader.readInt()
+        skipLengthAndString(2) // snpid
+        skipLengthAndString(2) // rsid
+        skipLengthAndString(2) // chr
+        reader.readInt() // pos
 
         val nAlleles = if (bState.version == 2) reader.readShort() else 2
-        assert(nAlleles >= 2, s"Number of alleles must be greater than or equal to 2. Found $nAlleles alleles for variant '$snpid'")
-        (0 until nAlleles).foreach { i => reader.readLengthAndString(4) }
+        assert(nAlleles >= 2, s"Number of alleles must be greater than or equal to 2. Found $nAlleles alleles for variant at offset $position")
+        var j = 0
+        while (j < nAlleles) {
+          skipLengthAndString(4)
+          j += 1
+        }
 
         position = bState.version match {
           case 1 =>
@@ -173,11 +506,16 @@ object BgenLoader {
         }
 
         dataBlockStarts(i) = position
+        i += 1
+
+        if (i % checkpointInterval == 0 && i <= bState.nVariants) {
+          appendPartialIndex(hConf, file, dataBlockStarts, nCheckpointed, i)
+          nCheckpointed = i
+        }
       }
     }
 
-    IndexBTree.write(dataBlockStarts, indexFile, hConf)
-
+    dataBlockStarts
   }
 
   def readSamples(hConf: org.apache.hadoop.conf.Configuration, file: String): Array[String] = {
@@ -14,6 +14,23 @@ abstract class BgenRecord extends KeySerializedValueRecord[Variant] {
 
   def getAnnotation: Annotation = ann
 
+  // indices of the samples to decode, in order, or null for all samples
+  var sampleIndices: Array[Int] = _
+
+  def setSampleIndices(sampleIndices: Array[Int]) {
+    this.sampleIndices = sampleIndices
+  }
+
+  def nDecodedSamples(nSamples: Int): Int =
+    if (sampleIndices == null) nSamples else sampleIndices.length
+
+  // decode each genotype to Struct{dosage: Float32} instead of Struct{GT: Call, GP: Array[Float64]}
+  var dosageOnly: Boolean = false
+
+  def setDosageOnly(dosageOnly: Boolean) {
+    this.dosageOnly = dosageOnly
+  }
+
   override def getValue(rvb: RegionValueBuilder): Unit
 }
 
@@ -33,16 +50,21 @@ class BgenRecordV11(compressed: Boolean,
 
     val t = new Array[Int](3)
 
-    byteReader.seek(0)
-
-    rvb.startArray(nSamples)
-    var i = 0
-    while (i < nSamples) {
+    val n = nDecodedSamples(nSamples)
+    rvb.startArray(n)
+    var k = 0
+    while (k < n) {
+      val i = if (sampleIndices == null) k else sampleIndices(k)
+      byteReader.seek(6 * i)
       val d0 = byteReader.readShort()
       val d1 = byteReader.readShort()
       val d2 = byteReader.readShort()
       val dsum = d0 + d1 + d2
-      if (dsum >= lowerTol && dsum <= upperTol) {
+      if (dsum >= lowerTol && dsum <= upperTol && dosageOnly) {
+        rvb.startStruct()
+        rvb.addFloat((d1 + 2 * d2).toFloat / dsum)
+        rvb.endStruct()
+      } else if (dsum >= lowerTol && dsum <= upperTol) {
         t(0) = d0
         t(1) = d1
         t(2) = d2
@@ -61,7 +83,7 @@ class BgenRecordV11(compressed: Boolean,
         rvb.endStruct()
       } else
         rvb.setMissing()
-      i += 1
+      k += 1
     }
     rvb.endArray()
   }
@@ -121,13 +143,16 @@ class BgenRecordV12(compressed: Boolean, nSamples: Int, tolerance: Double) exten
     if (minPloidy != 2 || maxPloidy != 2)
       fatal(s"Hail only supports diploid genotypes. Found min ploidy equals `$minPloidy' and max ploidy equals `$maxPloidy'.")
 
-    var i = 0
-    while (i < nSamples) {
-      val ploidy = reader.read()
+    // only the ploidy and missingness of the decoded samples are read
+    val n = nDecodedSamples(nSamples)
+    var k = 0
+    while (k < n) {
+      val i = if (sampleIndices == null) k else sampleIndices(k)
+      val ploidy = a(8 + i)
       assert((ploidy & 0x3f) == 2, s"Ploidy value must equal to 2. Found $ploidy.")
-      i += 1
+      k += 1
     }
-    assert(i == nSamples, s"Number of ploidy values `$i' does not equal the number of samples `$nSamples'.")
+    reader.seek(8 + nSamples)
 
     val phase = reader.read()
     assert(phase == 0 || phase == 1, s"Value for phase must be 0 or 1. Found $phase.")
@@ -143,14 +168,44 @@ class BgenRecordV12(compressed: Boolean, nSamples: Int, tolerance: Double) exten
     val nExpectedBytesProbs = (nSamples * (nGenotypes - 1) * nBitsPerProb + 7) / 8
     assert(reader.length == nExpectedBytesProbs + nSamples + 10, s"Number of uncompressed bytes `${ reader.length }' does not match the expected size `$nExpectedBytesProbs'.")
 
-    rvb.startArray(nSamples) // gs
-    if (nBitsPerProb == 8 && nAlleles == 2) {
+    rvb.startArray(n) // gs
+    if (dosageOnly) {
+      // dosage is only defined for bi-allelic variants
+      val totalProb = ((1L << nBitsPerProb) - 1).toFloat
+      val pa = new BGen12ProbabilityArray(a, nSamples, nGenotypes, nBitsPerProb)
+
+      k = 0
+      while (k < n) {
+        val i = if (sampleIndices == null) k else sampleIndices(k)
+        val sampleMissing = (a(8 + i) & 0x80) != 0
+        if (sampleMissing || nAlleles != 2)
+          rvb.setMissing()
+        else {
+          var p0 = 0f
+          var p1 = 0f
+          if (nBitsPerProb == 8) {
+            val off = nSamples + 10 + 2 * i
+            p0 = a(off) & 0xff
+            p1 = a(off + 1) & 0xff
+          } else {
+            p0 = pa(i, 0).toDouble.toFloat
+            p1 = pa(i, 1).toDouble.toFloat
+          }
+
+          rvb.startStruct() // g
+          rvb.addFloat((p1 + 2 * (totalProb - p0 - p1)) / totalProb)
+          rvb.endStruct() // g
+        }
+        k += 1
+      }
+    } else if (nBitsPerProb == 8 && nAlleles == 2) {
       val totalProb = 255
 
       val sampleProbs = new Array[Int](3)
 
-      i = 0
-      while (i < nSamples) {
+      k = 0
+      while (k < n) {
+        val i = if (sampleIndices == null) k else sampleIndices(k)
         val sampleMissing = (a(8 + i) & 0x80) != 0
         if (sampleMissing)
           rvb.setMissing()
@@ -180,7 +235,7 @@ class BgenRecordV12(compressed: Boolean, nSamples: Int, tolerance: Double) exten
 
           rvb.endStruct() // g
         }
-        i += 1
+        k += 1
       }
     } else {
       // general case
@@ -190,8 +245,9 @@ class BgenRecordV12(compressed: Boolean, nSamples: Int, tolerance: Double) exten
 
       val pa = new BGen12ProbabilityArray(a, nSamples, nGenotypes, nBitsPerProb)
 
-      i = 0
-      while (i < nSamples) {
+      k = 0
+      while (k < n) {
+        val i = if (sampleIndices == null) k else sampleIndices(k)
         val sampleMissing = (a(8 + i) & 0x80) != 0
         if (sampleMissing)
           rvb.setMissing()
@@ -222,7 +278,7 @@ class BgenRecordV12(compressed: Boolean, nSamples: Int, tolerance: Double) exten
           rvb.endArray()
           rvb.endStruct() // g
         }
-        i += 1
+        k += 1
       }
     }
     rvb.endArray()
@@ -0,0 +1,159 @@
+package is.hail.io.compress
+
+import java.io.InputStream
+import java.util.concurrent.{ArrayBlockingQueue, TimeUnit}
+import java.util.zip.{Inflater, ZipException}
+
+import is.hail.utils._
+import org.apache.hadoop
+
+case class BGzipBlock(offset: Long, data: Array[Byte])
+
+/**
+  * Reads and inflates the BGZF blocks of `file' from compressed offset `start' on a helper thread,
+  * keeping up to `capacity' decompressed blocks ready for the consumer. Empty blocks are skipped.
+  **/
+class BGzipBlockReader(hConf: hadoop.conf.Configuration, file: String, start: Long, fileLength: Long,
+  capacity: Int = BGzipBlockReader.defaultCapacity) extends Thread {
+  private val queue = new ArrayBlockingQueue[BGzipBlock](capacity)
+
+  @volatile private var closed = false
+  @volatile private var error: Throwable = _
+
+  setDaemon(true)
+  setName(s"bgzip-reader-$file")
+
+  override def run() {
+    val is = hConf.fileSystem(file).open(new hadoop.fs.Path(file))
+    try {
+      val inflater = new Inflater(true)
+      val buf = new Array[Byte](BGzipBlockReader.maxBlockSize)
+      var pos = start
+      is.seek(pos)
+      while (!closed && pos < fileLength) {
+        is.readFully(buf, 0, BGzipBlockReader.headerSize)
+        val bsize = BGzipBlockReader.blockSize(file, pos, buf, is)
+        val xlen = BGzipBlockReader.readUInt16(buf, 10)
+        // blockSize consumed the extra subfields; read the compressed data and trailer after them
+        is.readFully(buf, 12 + xlen, bsize - 12 - xlen)
+
+        val isize = BGzipBlockReader.readInt32(buf, bsize - 4)
+        if (isize > 0) {
+          val data = new Array[Byte](isize)
+          inflater.reset()
+          inflater.setInput(buf, 12 + xlen, bsize - xlen - 20)
+          var n = 0
+          while (n < isize) {
+            val r = inflater.inflate(data, n, isize - n)
+            if (r == 0 && (inflater.finished() || inflater.needsInput()))
+              fatal(s"$file: truncated BGZF block at offset $pos")
+            n += r
+          }
+          put(BGzipBlock(pos, data))
+        }
+        pos += bsize
+      }
+      inflater.end()
+    } catch {
+      case e: Throwable => error = e
+    } finally {
+      is.close()
+      put(BGzipBlockReader.end)
+    }
+  }
+
+  private def put(b: BGzipBlock) {
+    while (!closed && !queue.offer(b, 100, TimeUnit.MILLISECONDS)) {}
+  }
+
+  // the next decompressed block, or null at end of file
+  def next(): BGzipBlock = {
+    val b = queue.take()
+    if (b eq BGzipBlockReader.end) {
+      if (error != null)
+        throw error
+      null
+    } else
+      b
+  }
+
+  def close() {
+    closed = true
+    queue.clear()
+  }
+}
+
+object BGzipBlockReader {
+  val maxBlockSize: Int = 64 * 1024
+
+  val headerSize: Int = 12
+
+  val defaultCapacity: Int = 32
+
+  private val end = BGzipBlock(-1, null)
+
+  def readUInt16(buf: Array[Byte], off: Int): Int =
+    (buf(off) & 0xff) | ((buf(off + 1) & 0xff) << 8)
+
+  def readInt32(buf: Array[Byte], off: Int): Int =
+    (buf(off) & 0xff) | ((buf(off + 1) & 0xff) << 8) | ((buf(off + 2) & 0xff) << 16) | ((buf(off + 3) & 0xff) << 24)
+
+  /**
+    * Offset of the first block of `file' at or after `start', or `fileLength' if there is none. A block
+    * starts within maxBlockSize bytes of any offset, so the candidates are found in one read, and each
+    * is checked to be a complete, well-formed block header as in [[BGzipInputStream]].
+    **/
+  def firstBlock(hConf: hadoop.conf.Configuration, file: String, start: Long, fileLength: Long): Long = {
+    val n = math.min(2L * maxBlockSize, fileLength - start).toInt
+    val buf = new Array[Byte](n)
+    val is = hConf.fileSystem(file).open(new hadoop.fs.Path(file))
+    try {
+      is.seek(start)
+      is.readFully(buf)
+    } finally {
+      is.close()
+    }
+
+    var i = 0
+    while (i < n - 1) {
+      if ((buf(i) & 0xff) == 31 && (buf(i + 1) & 0xff) == 139) {
+        try {
+          new BGzipInputStream.BGzipHeader(buf, i, n)
+          return start + i
+        } catch {
+          case _: ZipException =>
+        }
+      }
+      i += 1
+    }
+    fileLength
+  }
+
+  /**
+    * Total size of the block at `pos' whose first 12 bytes are in `header', reading its extra
+    * subfields from `is', which is left positioned just after them.
+    **/
+  def blockSize(file: String, pos: Long, header: Array[Byte], is: InputStream): Int = {
+    if ((header(0) & 0xff) != 31 || (header(1) & 0xff) != 139 || (header(2) & 0xff) != 8 || (header(3) & 4) != 4)
+      fatal(s"$file: not a BGZF file: invalid block header at offset $pos")
+
+    val xlen = readUInt16(header, 10)
+    val extra = new Array[Byte](xlen)
+    var n = 0
+    while (n < xlen) {
+      val r = is.read(extra, n, xlen - n)
+      if (r < 0)
+        fatal(s"$file: truncated BGZF block header at offset $pos")
+      n += r
+    }
+
+    var i = 0
+    while (i + 4 <= xlen) {
+      val len = readUInt16(extra, i + 2)
+      if (extra(i) == 66 && extra(i + 1) == 67 && len == 2)
+        return readUInt16(extra, i + 4) + 1
+      i += 4 + len
+    }
+    fatal(s"$file: not a BGZF file: no block size in header at offset $pos")
+  }
+}
@@ -0,0 +1,132 @@
+package is.hail.io.compress
+
+import java.nio.charset.StandardCharsets
+
+import is.hail.utils._
+import org.apache.hadoop
+import org.apache.hadoop.io.compress.CompressionCodecFactory
+import org.apache.spark.rdd.RDD
+import org.apache.spark.{Partition, SparkContext, TaskContext}
+
+/**
+  * Lines of `file' that follow a newline in a block starting in compressed offsets [start, end), and the
+  * first line of the file if `start' is 0.
+  **/
+case class BGzipLinesPartition(index: Int, file: String, fileLength: Long, start: Long, end: Long) extends Partition
+
+/**
+  * Lines of BGZF files, split into ranges of compressed bytes of similar size. Each partition finds the
+  * first block starting in its range, so neither the driver nor the partitions scan the file ahead of
+  * reading it. As in Hadoop's line reader, a partition other than the first of its file skips the line
+  * it starts in, which belongs to the previous partition, and reads past `end' to finish its last line.
+  * Blocks are inflated on a helper thread ahead of the consumer.
+  **/
+class BGzipLinesRDD(@transient sc: SparkContext, files: Array[String], nPartitions: Int)
+  extends RDD[WithContext[String]](sc, Nil) {
+
+  private val confBc = sc.broadcast(new SerializableHadoopConfiguration(sc.hadoopConfiguration))
+
+  override def getPartitions: Array[Partition] = {
+    val hConf = sparkContext.hadoopConfiguration
+    val lengths = files.map(hConf.getFileSize(_))
+    val total = math.max(lengths.sum, 1L)
+
+    val ab = new ArrayBuilder[Partition]()
+    files.zip(lengths).foreach { case (file, length) =>
+      val n = math.max(1, math.round(nPartitions.toDouble * length / total).toInt)
+      var i = 0
+      while (i < n) {
+        ab += BGzipLinesPartition(ab.length, file, length, length * i / n, length * (i + 1) / n)
+        i += 1
+      }
+    }
+    ab.result()
+  }
+
+  override def compute(split: Partition, context: TaskContext): Iterator[WithContext[String]] = {
+    val p = split.asInstanceOf[BGzipLinesPartition]
+    val hConf = confBc.value.value
+    val start = if (p.start == 0) 0L else BGzipBlockReader.firstBlock(hConf, p.file, p.start, p.fileLength)
+    if (start >= p.end)
+      return Iterator.empty
+
+    val reader = new BGzipBlockReader(hConf, p.file, start, p.fileLength)
+    context.addTaskCompletionListener(_ => reader.close())
+    reader.start()
+
+    new Iterator[WithContext[String]] {
+      private var block: BGzipBlock = reader.next()
+      private var pos: Int = 0
+
+      private var buf = new Array[Byte](1024)
+      private var bufLength = 0
+      private var line: String = _
+
+      // whether the next line belongs to this partition: it follows a newline in a block before `end'
+      private var owned: Boolean = block != null
+
+      private def advance(): Boolean = {
+        block = reader.next()
+        pos = 0
+        block != null
+      }
+
+      // read up to and including the next newline, leaving the line without line terminator in `buf'
+      private def readLine() {
+        bufLength = 0
+        var done = false
+        while (!done && block != null && (pos < block.data.length || advance())) {
+          val data = block.data
+          var i = pos
+          while (i < data.length && data(i) != '\n')
+            i += 1
+          if (bufLength + i - pos > buf.length)
+            buf = java.util.Arrays.copyOf(buf, math.max(2 * buf.length, bufLength + i - pos))
+          System.arraycopy(data, pos, buf, bufLength, i - pos)
+          bufLength += i - pos
+          if (i < data.length) {
+            done = true
+            owned = block.offset < p.end
+            pos = i + 1
+          } else
+            pos = i
+        }
+      }
+
+      // the line the partition starts in belongs to the previous partition
+      if (p.start > 0 && owned) {
+        owned = false
+        readLine()
+      }
+
+      def hasNext: Boolean = {
+        if (line == null && owned) {
+          owned = false
+          if (block != null && pos == block.data.length)
+            advance()
+          if (block != null) {
+            readLine()
+            if (bufLength > 0 && buf(bufLength - 1) == '\r')
+              bufLength -= 1
+            line = new String(buf, 0, bufLength, StandardCharsets.UTF_8)
+          }
+        }
+        if (line == null)
+          reader.close()
+        line != null
+      }
+
+      def next(): WithContext[String] = {
+        assert(hasNext)
+        val l = line
+        line = null
+        WithContext(l, Context(l, p.file, None))
+      }
+    }
+  }
+}
+
+object BGzipLinesRDD {
+  def isBGzip(hConf: hadoop.conf.Configuration, file: String): Boolean =
+    new CompressionCodecFactory(hConf).getCodec(new hadoop.fs.Path(file)).isInstanceOf[BGzipCodec]
+}
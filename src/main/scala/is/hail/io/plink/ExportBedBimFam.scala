@@ -1,25 +1,40 @@
 package is.hail.io.plink
 
+import java.io.{OutputStream, OutputStreamWriter}
+import java.util.concurrent.{Callable, Executors, Future}
+
 import is.hail.sparkextras._
 import is.hail.expr._
 import is.hail.annotations._
+import is.hail.utils._
+import is.hail.utils.richUtils.RichHadoopConfiguration
 import is.hail.variant._
+import org.apache.commons.lang3.StringUtils
+import org.apache.hadoop
+import org.apache.spark.rdd.RDD
+
+// the .bed and .bim rows of a run of variants on one contig in one partition
+case class PlinkPart(partition: Int, run: Int, contig: String) {
+  def path(tmp: String, d: Int): String =
+    tmp + "/part-" + StringUtils.leftPad(partition.toString, d, "0") + "-" + run
+}
 
 object ExportBedBimFam {
 
   val gtMap = Array(3, 2, 0)
 
-  def bedRowTransformer(nSamples: Int, rowType: TStruct): Iterator[RegionValue] => Iterator[Array[Byte]] = { it =>
+  val bedHeader = Array[Byte](108, 27, 1)
+
+  val defaultParallelism: Int = RichHadoopConfiguration.defaultMergeParallelism
+
+  def bedRowEncoder(nSamples: Int, rowType: TStruct): RegionValue => Array[Byte] = {
     val hcv = HardCallView(rowType)
-    val rvb = new RegionValueBuilder()
-    val rv2 = RegionValue()
     val gtMap = Array(3, 2, 0)
     val nBytes = (nSamples + 3) / 4
     val a = new Array[Byte](nBytes)
 
-    it.map { rv =>
+    (rv: RegionValue) => {
       hcv.setRegion(rv)
-      rvb.set(rv.region)
 
       var b = 0
       var k = 0
@@ -41,12 +56,12 @@ object ExportBedBimFam {
     }
   }
 
-  def bimRowTransformer(rowType: TStruct): Iterator[RegionValue] => Iterator[String] = { it =>
+  def bimRowEncoder(rowType: TStruct): RegionValue => String = {
     val vIdx = rowType.fieldIdx("v")
     val tVariant = rowType.fieldType(vIdx).asInstanceOf[TVariant]
     val v = new RegionValueVariant(tVariant)
 
-    it.map { rv =>
+    (rv: RegionValue) => {
       val region = rv.region
       assert(rowType.isFieldDefined(rv, vIdx))
       v.setRegion(region, rowType.loadField(rv, vIdx))
@@ -59,4 +74,98 @@ object ExportBedBimFam {
       s"""${contig}\t$id\t0\t${start}\t${alt}\t${ref}"""
     }
   }
+
+  /**
+    * Writes the .bed and .bim rows of `rdd' to part files under `tmp' in one pass, starting a new pair of
+    * part files whenever the contig changes. Returns the parts in order. Each task attempt writes its
+    * files to paths of its own and renames them to the part paths once all are written, so retried or
+    * speculative attempts never leave a truncated part.
+    **/
+  def writeParts(rdd: RDD[RegionValue], rowType: TStruct, nSamples: Int, tmp: String): Array[PlinkPart] = {
+    val sc = rdd.sparkContext
+    val sHadoopConfBc = sc.broadcast(new SerializableHadoopConfiguration(sc.hadoopConfiguration))
+    val d = digitsNeeded(rdd.getNumPartitions)
+
+    rdd.mapPartitionsWithIndex { (i, it) =>
+      val hConf = sHadoopConfBc.value.value
+      val bedRow = bedRowEncoder(nSamples, rowType)
+      val bimRow = bimRowEncoder(rowType)
+
+      val parts = new ArrayBuilder[PlinkPart]()
+      val files = new ArrayBuilder[String]()
+      var contig: String = null
+      var bed: OutputStream = null
+      var bim: OutputStreamWriter = null
+
+      def close() {
+        if (bed != null) {
+          bed.close()
+          bim.close()
+        }
+      }
+
+      try {
+        it.foreach { rv =>
+          val line = bimRow(rv)
+          // the contig is the first field of the .bim row
+          val c = line.substring(0, line.indexOf('\t'))
+          if (c != contig) {
+            close()
+            contig = c
+            val part = PlinkPart(i, parts.length, c)
+            parts += part
+            val path = part.path(tmp, d)
+            files += path + ".bed"
+            files += path + ".bim"
+            bed = hConf.unsafeWriter(RichHadoopConfiguration.taskAttemptPath(path + ".bed"))
+            bim = new OutputStreamWriter(hConf.unsafeWriter(RichHadoopConfiguration.taskAttemptPath(path + ".bim")))
+          }
+          bed.write(bedRow(rv))
+          bim.write(line)
+          bim.write('\n')
+        }
+      } finally {
+        close()
+      }
+
+      files.result().foreach(f => hConf.commitTaskFile(RichHadoopConfiguration.taskAttemptPath(f), f))
+
+      parts.result().iterator
+    }.collect()
+  }
+
+  /**
+    * Concatenates the parts written by writeParts into the .bed and .bim files of each fileset, given by
+    * its root and its parts. The files are merged concurrently by a pool of parallelism threads.
+    **/
+  def mergeParts(hConf: hadoop.conf.Configuration, tmp: String, nPartitions: Int,
+    filesets: Array[(String, Array[PlinkPart])], parallelism: Int) {
+    val d = digitsNeeded(nPartitions)
+    val headerFile = tmp + "/header.bed"
+    hConf.writeDataFile(headerFile)(_.write(bedHeader))
+
+    val jobs: Array[(Array[String], String)] = filesets.flatMap { case (root, parts) =>
+      val paths = parts.map(_.path(tmp, d))
+      Array((headerFile +: paths.map(_ + ".bed"), root + ".bed"),
+        (paths.map(_ + ".bim"), root + ".bim"))
+    }
+
+    if (jobs.isEmpty)
+      return
+
+    // merges of a single fileset use the spare threads to copy parts at their offsets
+    val mergeParallelism = math.max(1, parallelism / jobs.length)
+
+    val pool = Executors.newFixedThreadPool(math.min(parallelism, jobs.length))
+    try {
+      val futures: Array[Future[Unit]] = jobs.map { case (srcs, dst) =>
+        pool.submit(new Callable[Unit] {
+          def call(): Unit = hConf.concatenateFiles(srcs, dst, mergeParallelism, deleteSource = false)
+        })
+      }
+      futures.foreach(_.get())
+    } finally {
+      pool.shutdownNow()
+    }
+  }
 }
@@ -0,0 +1,71 @@
+package is.hail.io.plink
+
+import java.nio.MappedByteBuffer
+import java.nio.channels.FileChannel
+import java.nio.file.{Paths, StandardOpenOption}
+
+import org.apache.hadoop
+import org.apache.hadoop.fs.LocalFileSystem
+import org.apache.hadoop.io.LongWritable
+import org.apache.spark.rdd.RDD
+import org.apache.spark.{Partition, SparkContext, TaskContext}
+
+// variants [start, end) of a .bed file
+case class MappedBedPartition(index: Int, start: Int, end: Int) extends Partition
+
+object MappedBedRDD {
+  // largest byte range mapped by one partition
+  val maxMappedBytes: Long = 1L << 30
+
+  // the absolute local path of `path' if it is on the local file system
+  def localFile(hConf: hadoop.conf.Configuration, path: String): Option[String] = {
+    val p = new hadoop.fs.Path(path)
+    p.getFileSystem(hConf) match {
+      case fs: LocalFileSystem => Some(fs.pathToFile(p).getAbsolutePath)
+      case _ => None
+    }
+  }
+}
+
+/**
+  * Variants of the local .bed file `file', read from a memory map of each partition's byte range
+  * instead of through a Hadoop record reader.
+  **/
+class MappedBedRDD(@transient sc: SparkContext, file: String, nSamples: Int, nVariants: Int,
+  nPartitions: Int, a2Reference: Boolean) extends RDD[(LongWritable, PlinkRecord)](sc, Nil) {
+  private val blockLength = (nSamples + 3) / 4
+
+  override def getPartitions: Array[Partition] = {
+    val maxVariants = math.max(1L, MappedBedRDD.maxMappedBytes / blockLength)
+    val n = math.max(nPartitions.toLong, (nVariants + maxVariants - 1) / maxVariants).toInt
+    Array.tabulate[Partition](n) { i =>
+      MappedBedPartition(i, (i.toLong * nVariants / n).toInt, ((i + 1).toLong * nVariants / n).toInt)
+    }
+  }
+
+  override def compute(split: Partition, context: TaskContext): Iterator[(LongWritable, PlinkRecord)] = {
+    val p = split.asInstanceOf[MappedBedPartition]
+
+    val buf: MappedByteBuffer = {
+      val channel = FileChannel.open(Paths.get(file), StandardOpenOption.READ)
+      try {
+        // 3 magic bytes precede the variant blocks
+        channel.map(FileChannel.MapMode.READ_ONLY, 3L + p.start.toLong * blockLength, (p.end - p.start).toLong * blockLength)
+      } finally {
+        channel.close()
+      }
+    }
+
+    val key = new LongWritable()
+    val record = new PlinkRecord(nSamples, a2Reference)
+    val block = new Array[Byte](blockLength)
+    record.setSerializedValue(block)
+
+    Iterator.range(p.start, p.end).map { i =>
+      buf.get(block)
+      record.setKey(i)
+      key.set(i)
+      (key, record)
+    }
+  }
+}
@@ -8,24 +8,45 @@ import org.apache.hadoop.mapred.FileSplit
 
 import scala.annotation.switch
 
+object PlinkRecord {
+  /**
+    * Call of genotype j of byte b at index 4 * b + j, for the four 2-bit genotypes packed into each
+    * byte of a .bed file, or -1 if it is missing.
+    **/
+  def callTable(a2Reference: Boolean): Array[Int] = Array.tabulate(1024) { k =>
+    val x = ((k >> 2) >> ((k & 3) << 1)) & 3
+    (x: @switch @unchecked) match {
+      case 0 => if (a2Reference) 2 else 0
+      case 1 => -1
+      case 2 => 1
+      case 3 => if (a2Reference) 0 else 2
+    }
+  }
+}
+
 class PlinkRecord(nSamples: Int, a2Reference: Boolean) extends KeySerializedValueRecord[Int] {
+  private val table = PlinkRecord.callTable(a2Reference)
+
   override def getValue(rvb: RegionValueBuilder) {
     require(input != null, "called getValue before serialized value was set")
 
-    val c = if (a2Reference) 0 else 3
     rvb.startArray(nSamples)
     var i = 0
     while (i < nSamples) {
-      rvb.startStruct() // g
-      val x = (input(i >> 2) >> ((i & 3) << 1)) & 3
-      (x: @switch @unchecked) match {
-        case 0 => rvb.addInt(if (a2Reference) 2 else 0)
-        case 1 => rvb.setMissing()
-        case 2 => rvb.addInt(1)
-        case 3 => rvb.addInt(if (a2Reference) 0 else 2)
+      val base = (input(i >> 2) & 0xff) << 2
+      val end = math.min(i + 4, nSamples)
+      var j = 0
+      while (i < end) {
+        val c = table(base + j)
+        rvb.startStruct() // g
+        if (c >= 0)
+          rvb.addInt(c)
+        else
+          rvb.setMissing()
+        rvb.endStruct() // g
+        i += 1
+        j += 1
       }
-      rvb.endStruct() // g
-      i += 1
     }
     rvb.endArray()
   }
@@ -11,6 +11,7 @@ import is.hail.variant._
 import org.apache.hadoop
 import org.apache.hadoop.conf.Configuration
 import org.apache.hadoop.io.LongWritable
+import org.apache.spark.rdd.RDD
 
 case class SampleInfo(sampleIds: Array[String], annotations: IndexedSeq[Annotation], signatures: TStruct)
 
@@ -125,8 +126,14 @@ object PlinkLoader {
     sc.hadoopConfiguration.setInt("nSamples", nSamples)
     sc.hadoopConfiguration.setBoolean("a2Reference", a2Reference)
 
-    val rdd = sc.hadoopFile(bedPath, classOf[PlinkInputFormat], classOf[LongWritable], classOf[PlinkRecord],
-      nPartitions.getOrElse(sc.defaultMinPartitions))
+    // local files are memory-mapped rather than read through a Hadoop input format
+    val rdd: RDD[(LongWritable, PlinkRecord)] = MappedBedRDD.localFile(sc.hadoopConfiguration, bedPath) match {
+      case Some(file) =>
+        new MappedBedRDD(sc, file, nSamples, variants.length, nPartitions.getOrElse(sc.defaultMinPartitions), a2Reference)
+      case None =>
+        sc.hadoopFile(bedPath, classOf[PlinkInputFormat], classOf[LongWritable], classOf[PlinkRecord],
+          nPartitions.getOrElse(sc.defaultMinPartitions))
+    }
 
     val metadata = VSMMetadata(
       saSignature = sampleAnnotationSignature,
@@ -1,11 +1,18 @@
 package is.hail.io.vcf
 
+import java.nio.charset.StandardCharsets
+
 import is.hail
 import is.hail.annotations.MemoryBuffer
 import is.hail.expr._
 import is.hail.io.{VCFAttributes, VCFFieldAttributes, VCFMetadata}
+import is.hail.io.compress.BGzipOutputStream
 import is.hail.utils._
+import is.hail.utils.richUtils.RichHadoopConfiguration
 import is.hail.variant.{Genotype, Variant, VariantSampleMatrix}
+import org.apache.commons.lang3.StringUtils
+import org.apache.hadoop
+import org.apache.spark.rdd.RDD
 
 import scala.io.Source
 
@@ -198,11 +205,84 @@ object ExportVCF {
   def getAttributes(k1: String, k2: String, k3: String, attributes: Option[VCFMetadata]): Option[String] =
     getAttributes(k1, k2, attributes).flatMap(_.get(k3))
 
+  /**
+    * Writes `header' and `lines' to the BGZF-compressed file `path' with its tabix index. Each partition
+    * writes its part and indexes it in the same pass; the parts are then concatenated and the partial
+    * indices shifted to the offsets of their parts. Each task attempt writes its part to a path of its
+    * own and renames it to the part path once complete, so retried or speculative attempts never leave
+    * a truncated part.
+    **/
+  def writeTabixed(lines: RDD[String], path: String, tmpDir: String, header: String) {
+    val sc = lines.sparkContext
+    val hConf = sc.hadoopConfiguration
+    hConf.delete(path, recursive = true) // overwriting by default
+
+    val tmp = hConf.getTemporaryFile(tmpDir)
+    val d = digitsNeeded(lines.getNumPartitions)
+    val sHadoopConfBc = sc.broadcast(new SerializableHadoopConfiguration(hConf))
+
+    val parts = lines.mapPartitionsWithIndex { (i, it) =>
+      val partPath = tmp + "/part-" + StringUtils.leftPad(i.toString, d, "0")
+      val attemptPath = RichHadoopConfiguration.taskAttemptPath(partPath)
+      val hConf = sHadoopConfBc.value.value
+      val os = hConf.fileSystem(attemptPath).create(new hadoop.fs.Path(attemptPath))
+      val out = new BGzipOutputStream(os)
+      val index = new TabixIndexBuilder()
+
+      // blocks are written when full, so the pending block starts at the current position
+      def virtualOffset(): Long = (os.getPos << 16) | out.numUncompressedBytes
+
+      try {
+        if (i == 0) {
+          out.write(header.getBytes(StandardCharsets.UTF_8))
+          out.write('\n')
+        }
+
+        it.foreach { line =>
+          val vStart = virtualOffset()
+          out.write(line.getBytes(StandardCharsets.UTF_8))
+          out.write('\n')
+
+          // CHROM, POS and REF are the first, second and fourth columns
+          val t1 = line.indexOf('\t')
+          val t2 = line.indexOf('\t', t1 + 1)
+          val t3 = line.indexOf('\t', t2 + 1)
+          val t4 = line.indexOf('\t', t3 + 1)
+          val start = line.substring(t1 + 1, t2).toInt - 1
+          index.add(line.substring(0, t1), start, start + t4 - t3 - 1, vStart, virtualOffset())
+        }
+      } finally {
+        out.close()
+      }
+
+      hConf.commitTaskFile(attemptPath, partPath)
+
+      Iterator((partPath, index))
+    }.collect()
+
+    val offsets = hConf.concatenateFiles(parts.map(_._1), path, RichHadoopConfiguration.defaultMergeParallelism)
+    hConf.delete(tmp, recursive = true)
+
+    val index = new TabixIndexBuilder()
+    parts.zip(offsets).foreach { case ((_, partIndex), offset) =>
+      partIndex.shift(offset)
+      index ++= partIndex
+    }
+    index.write(hConf, TabixVCF.indexPath(path))
+  }
+
   def apply(vsm: VariantSampleMatrix, path: String, append: Option[String] = None,
-    parallel: Boolean = false, metadata: Option[VCFMetadata] = None) {
+    parallel: Boolean = false, metadata: Option[VCFMetadata] = None, tabix: Boolean = false) {
     
     vsm.requireColKeyString("export_vcf")
     vsm.requireRowKeyVariant("export_vcf")
+
+    if (tabix) {
+      if (parallel)
+        fatal("export_vcf: cannot write a tabix index with parallel output")
+      if (!path.endsWith(".bgz") && !path.endsWith(".gz"))
+        fatal(s"export_vcf: cannot write a tabix index for uncompressed output `$path', use a .bgz extension")
+    }
     
     val tg = vsm.genotypeSignature match {
       case t: TStruct => t
@@ -346,7 +426,7 @@ object ExportVCF {
     val localRowType = vsm.rowType
     val tgs = localRowType.fields(3).typ.asInstanceOf[TArray]
     
-    vsm.rdd2.mapPartitions { it =>
+    val lines = vsm.rdd2.mapPartitions { it =>
       val sb = new StringBuilder
       var m: MemoryBuffer = null
       
@@ -433,6 +513,11 @@ object ExportVCF {
         
         sb.result()
       }
-    }.writeTable(path, vsm.hc.tmpDir, Some(header), parallelWrite = parallel)
+    }
+
+    if (tabix)
+      writeTabixed(lines, path, vsm.hc.tmpDir, header)
+    else
+      lines.writeTable(path, vsm.hc.tmpDir, Some(header), parallelWrite = parallel)
   }
 }
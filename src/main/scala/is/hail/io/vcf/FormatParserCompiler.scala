@@ -0,0 +1,55 @@
+package is.hail.io.vcf
+
+import is.hail.annotations.RegionValueBuilder
+import is.hail.asm4s._
+
+/**
+  * Generates a straight-line genotype parser for one FORMAT layout. The generated function does what
+  * FormatParser.parseSamples does, but the field order and the parse method for each field are fixed when
+  * the function is generated rather than dispatched on per field per sample.
+  **/
+object FormatParserCompiler {
+  def apply(fp: FormatParser): AsmFunction3[VCFLine, RegionValueBuilder, Int, Boolean] = {
+    val fb = FunctionBuilder.functionBuilder[VCFLine, RegionValueBuilder, Int, Boolean]
+    val l = fb.getArg[VCFLine](1)
+    val rvb = fb.getArg[RegionValueBuilder](2)
+    val nSamples = fb.getArg[Int](3)
+    val i = fb.newLocal[Int]
+    val end = fb.newLocal[Boolean]
+
+    def setFieldIndex(j: Int): Code[Unit] = rvb.invoke[Int, Unit]("setFieldIndex", j)
+
+    def setMissing(j: Int): Code[Unit] = Code(setFieldIndex(j), rvb.invoke[Unit]("setMissing"))
+
+    def parseAdd(k: Int): Code[Unit] =
+      Code(setFieldIndex(fp.formatFieldGIndex(k)), l.invoke[RegionValueBuilder, Unit](fp.parseAddMethod(k), rvb))
+
+    val parseOtherFields = toCodeFromIndexedSeq((1 until fp.formatFieldGIndex.length).map { k =>
+      end.mux(
+        setMissing(fp.formatFieldGIndex(k)),
+        Code(
+          l.invoke[Unit]("nextFormatField"),
+          parseAdd(k),
+          end := l.invoke[Boolean]("endField")))
+    })
+
+    val parseSample = Code(
+      rvb.invoke[Boolean, Unit]("startStruct", true), // g
+      toCodeFromIndexedSeq(fp.missingGIndices.toSeq.map(setMissing)),
+      parseAdd(0),
+      end := l.invoke[Boolean]("endField"),
+      parseOtherFields,
+      setFieldIndex(fp.gType.size), // for error checking
+      rvb.invoke[Unit]("endStruct")) // g
+
+    fb.emit(Code(
+      i := 0,
+      Code.whileLoop(i < nSamples,
+        (i > 0).mux(l.invoke[Unit]("nextField"), Code._empty[Unit]),
+        parseSample,
+        i := i + 1),
+      const(true)))
+
+    fb.result()()
+  }
+}
@@ -3,8 +3,10 @@ package is.hail.io.vcf
 import htsjdk.variant.vcf._
 import is.hail.HailContext
 import is.hail.annotations._
+import is.hail.asm4s.AsmFunction3
 import is.hail.expr.{TStruct, _}
 import is.hail.io.{VCFAttributes, VCFMetadata}
+import is.hail.io.compress.BGzipLinesRDD
 import is.hail.rvd.OrderedRVD
 import is.hail.utils._
 import is.hail.variant._
@@ -500,6 +502,9 @@ final class VCFLine(val line: String) {
 }
 
 object FormatParser {
+  // lines with the same FORMAT layout seen before the layout is compiled
+  val compileThreshold: Int = 64
+
   def apply(gType: TStruct, format: String): FormatParser = {
     val formatFields = format.split(":")
     val formatFieldsSet = formatFields.toSet
@@ -513,9 +518,25 @@ object FormatParser {
 }
 
 class FormatParser(
-  gType: TStruct,
-  formatFieldGIndex: Array[Int],
-  missingGIndices: Array[Int]) {
+  val gType: TStruct,
+  val formatFieldGIndex: Array[Int],
+  val missingGIndices: Array[Int]) {
+
+  private var nLines: Int = 0
+
+  private var compiled: AsmFunction3[VCFLine, RegionValueBuilder, Int, Boolean] = _
+
+  // name of the VCFLine method that parses and adds the FORMAT field at position i
+  def parseAddMethod(i: Int): String =
+    gType.fieldType(formatFieldGIndex(i)) match {
+      case TCall(_) => "parseAddCall"
+      case TInt32(_) => "parseAddFormatInt"
+      case TFloat64(_) => "parseAddFormatDouble"
+      case TString(_) => "parseAddFormatString"
+      case TArray(TInt32(_), _) => "parseAddFormatArrayInt"
+      case TArray(TFloat64(_), _) => "parseAddFormatArrayDouble"
+      case TArray(TString(_), _) => "parseAddFormatArrayString"
+    }
 
   def parseAddField(l: VCFLine, rvb: RegionValueBuilder, i: Int) {
     val j = formatFieldGIndex(i)
@@ -538,6 +559,30 @@ class FormatParser(
     }
   }
 
+  // parse the genotypes of `nSamples' samples, `l' pointing at the first; layouts seen often enough are compiled
+  def parseSamples(l: VCFLine, rvb: RegionValueBuilder, nSamples: Int) {
+    if (compiled == null) {
+      nLines += 1
+      if (nLines >= FormatParser.compileThreshold)
+        compiled = FormatParserCompiler(this)
+    }
+
+    if (compiled != null)
+      compiled(l, rvb, nSamples)
+    else
+      parseSamplesGeneric(l, rvb, nSamples)
+  }
+
+  def parseSamplesGeneric(l: VCFLine, rvb: RegionValueBuilder, nSamples: Int) {
+    var i = 0
+    while (i < nSamples) {
+      if (i > 0)
+        l.nextField()
+      parse(l, rvb)
+      i += 1
+    }
+  }
+
   def setFieldMissing(rvb: RegionValueBuilder, i: Int) {
     rvb.setFieldIndex(formatFieldGIndex(i))
     rvb.setMissing()
@@ -814,7 +859,8 @@ object LoadVCF {
     dropSamples: Boolean = false,
     gr: GenomeReference = GenomeReference.defaultReference,
     contigRecoding: Map[String, String] = Map.empty[String, String],
-    arrayElementsRequired: Boolean = true): VariantSampleMatrix = {
+    arrayElementsRequired: Boolean = true,
+    intervals: Option[Seq[Interval[Locus]]] = None): VariantSampleMatrix = {
     val sc = hc.sc
     val hConf = hc.hadoopConf
 
@@ -875,7 +921,15 @@ object LoadVCF {
 
     val headerLinesBc = sc.broadcast(headerLines1)
 
-    val lines = sc.textFilesLines(files, nPartitions.getOrElse(sc.defaultMinPartitions))
+    val lines = intervals match {
+      case Some(ivs) => TabixVCF.lines(sc, files, ivs, gr, contigRecoding)
+      case None =>
+        val n = nPartitions.getOrElse(sc.defaultMinPartitions)
+        if (files.forall(BGzipLinesRDD.isBGzip(hConf, _)))
+          sc.bgzipFilesLines(files, n)
+        else
+          sc.textFilesLines(files, n)
+    }
 
     val vsmMetadata = VSMMetadata(
       TString(),
@@ -915,15 +969,7 @@ object LoadVCF {
           val format = l.parseString()
           l.nextField()
 
-          val fp = c.getFormatParser(format)
-
-          fp.parse(l, rvb)
-          i = 1
-          while (i < localNSamples) {
-            l.nextField()
-            fp.parse(l, rvb)
-            i += 1
-          }
+          c.getFormatParser(format).parseSamples(l, rvb, localNSamples)
         }
         rvb.endArray()
       }(lines, rowType, contigRecoding),
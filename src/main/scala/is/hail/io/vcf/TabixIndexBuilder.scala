@@ -0,0 +1,169 @@
+package is.hail.io.vcf
+
+import java.io.OutputStream
+import java.nio.charset.StandardCharsets
+
+import is.hail.io.compress.BGzipOutputStream
+import is.hail.utils._
+import org.apache.hadoop
+
+import scala.collection.mutable
+
+// bins and linear index of one contig; chunks are pairs of BGZF virtual offsets
+class TabixContigIndex(val contig: String) extends Serializable {
+  val bins: mutable.Map[Int, mutable.ArrayBuffer[(Long, Long)]] = mutable.Map.empty
+
+  // virtual offset of the first record overlapping each 16 kb window, or -1
+  val linear: mutable.ArrayBuffer[Long] = mutable.ArrayBuffer.empty
+}
+
+/**
+  * Tabix index of a BGZF-compressed VCF, built from records added in file order. Builders of
+  * consecutive parts of a file are shifted to the offset of their part and merged on the driver.
+  **/
+class TabixIndexBuilder extends Serializable {
+  val contigs: mutable.ArrayBuffer[TabixContigIndex] = mutable.ArrayBuffer.empty
+
+  private def contigIndex(contig: String): TabixContigIndex = {
+    if (contigs.isEmpty || contigs.last.contig != contig) {
+      if (contigs.exists(_.contig == contig))
+        fatal(s"cannot build tabix index: records of contig `$contig' are not contiguous")
+      contigs += new TabixContigIndex(contig)
+    }
+    contigs.last
+  }
+
+  // a record spanning 0-based positions [start, end) between virtual offsets vStart and vEnd
+  def add(contig: String, start: Int, end: Int, vStart: Long, vEnd: Long) {
+    val ci = contigIndex(contig)
+
+    val chunks = ci.bins.getOrElseUpdate(TabixIndexBuilder.reg2bin(start, end), mutable.ArrayBuffer.empty)
+    if (chunks.nonEmpty && chunks.last._2 == vStart)
+      chunks(chunks.length - 1) = (chunks.last._1, vEnd)
+    else
+      chunks += ((vStart, vEnd))
+
+    var w = start >> TabixIndexBuilder.minShift
+    val lastW = math.max(start, end - 1) >> TabixIndexBuilder.minShift
+    while (ci.linear.length <= lastW)
+      ci.linear += -1L
+    while (w <= lastW) {
+      if (ci.linear(w) == -1L)
+        ci.linear(w) = vStart
+      w += 1
+    }
+  }
+
+  // moves every virtual offset forward by `offset' compressed bytes
+  def shift(offset: Long) {
+    val delta = offset << 16
+    contigs.foreach { ci =>
+      ci.bins.values.foreach { chunks =>
+        var i = 0
+        while (i < chunks.length) {
+          val (s, e) = chunks(i)
+          chunks(i) = (s + delta, e + delta)
+          i += 1
+        }
+      }
+      var i = 0
+      while (i < ci.linear.length) {
+        if (ci.linear(i) != -1L)
+          ci.linear(i) += delta
+        i += 1
+      }
+    }
+  }
+
+  // appends the records of `other', which follow those of this builder in the file
+  def ++=(other: TabixIndexBuilder) {
+    other.contigs.foreach { oci =>
+      val ci = contigIndex(oci.contig)
+      oci.bins.foreach { case (bin, chunks) =>
+        ci.bins.getOrElseUpdate(bin, mutable.ArrayBuffer.empty) ++= chunks
+      }
+      while (ci.linear.length < oci.linear.length)
+        ci.linear += -1L
+      var i = 0
+      while (i < oci.linear.length) {
+        if (ci.linear(i) == -1L)
+          ci.linear(i) = oci.linear(i)
+        i += 1
+      }
+    }
+  }
+
+  def write(hConf: hadoop.conf.Configuration, path: String) {
+    val out = new BGzipOutputStream(hConf.unsafeWriter(path))
+    try {
+      out.write("TBI\u0001".getBytes(StandardCharsets.US_ASCII))
+      TabixIndexBuilder.writeInt(out, contigs.length)
+      TabixIndexBuilder.writeInt(out, 2) // format: VCF
+      TabixIndexBuilder.writeInt(out, 1) // sequence column
+      TabixIndexBuilder.writeInt(out, 2) // start column
+      TabixIndexBuilder.writeInt(out, 0) // end column: none, computed from REF
+      TabixIndexBuilder.writeInt(out, '#') // meta character
+      TabixIndexBuilder.writeInt(out, 0) // lines to skip
+
+      val names = contigs.map(_.contig + "\u0000").mkString.getBytes(StandardCharsets.UTF_8)
+      TabixIndexBuilder.writeInt(out, names.length)
+      out.write(names)
+
+      contigs.foreach { ci =>
+        TabixIndexBuilder.writeInt(out, ci.bins.size)
+        ci.bins.toArray.sortBy(_._1).foreach { case (bin, chunks) =>
+          TabixIndexBuilder.writeInt(out, bin)
+          TabixIndexBuilder.writeInt(out, chunks.length)
+          chunks.foreach { case (s, e) =>
+            TabixIndexBuilder.writeLong(out, s)
+            TabixIndexBuilder.writeLong(out, e)
+          }
+        }
+
+        // windows without records point at the last record before them
+        TabixIndexBuilder.writeInt(out, ci.linear.length)
+        var last = 0L
+        ci.linear.foreach { o =>
+          if (o != -1L)
+            last = o
+          TabixIndexBuilder.writeLong(out, last)
+        }
+      }
+    } finally {
+      out.close()
+    }
+  }
+}
+
+object TabixIndexBuilder {
+  val minShift: Int = 14
+
+  // the smallest bin of the tabix (and BAM) binning scheme containing 0-based [start, end)
+  def reg2bin(start: Int, end: Int): Int = {
+    val e = math.max(start, end - 1)
+    if (start >> 14 == e >> 14)
+      ((1 << 15) - 1) / 7 + (start >> 14)
+    else if (start >> 17 == e >> 17)
+      ((1 << 12) - 1) / 7 + (start >> 17)
+    else if (start >> 20 == e >> 20)
+      ((1 << 9) - 1) / 7 + (start >> 20)
+    else if (start >> 23 == e >> 23)
+      ((1 << 6) - 1) / 7 + (start >> 23)
+    else if (start >> 26 == e >> 26)
+      ((1 << 3) - 1) / 7 + (start >> 26)
+    else
+      0
+  }
+
+  def writeInt(out: OutputStream, i: Int) {
+    out.write(i & 0xff)
+    out.write((i >> 8) & 0xff)
+    out.write((i >> 16) & 0xff)
+    out.write((i >> 24) & 0xff)
+  }
+
+  def writeLong(out: OutputStream, l: Long) {
+    writeInt(out, l.toInt)
+    writeInt(out, (l >> 32).toInt)
+  }
+}
@@ -0,0 +1,152 @@
+package is.hail.io.vcf
+
+import htsjdk.samtools.util.BlockCompressedInputStream
+import htsjdk.tribble.index.tabix.TabixIndex
+import is.hail.io.HadoopSeekableStream
+import is.hail.utils._
+import is.hail.variant.{GenomeReference, Locus}
+import org.apache.hadoop
+import org.apache.spark.{SparkContext, TaskContext}
+import org.apache.spark.rdd.RDD
+
+import scala.collection.JavaConverters._
+
+// contig range [start, end) in 1-based VCF positions, with the BGZF virtual-offset chunks that may contain it
+case class TabixPartition(file: String, contig: String, start: Int, end: Int, chunks: Array[(Long, Long)])
+
+object TabixVCF {
+  def indexPath(file: String): String = file + ".tbi"
+
+  def readIndex(hConf: hadoop.conf.Configuration, file: String): TabixIndex = {
+    val tbi = indexPath(file)
+    if (!hConf.exists(tbi))
+      fatal(
+        s"""cannot import intervals of `$file': no tabix index found at `$tbi'
+           |  Create one with `tabix -p vcf $file'. CSI indices are not supported.""".stripMargin)
+
+    hConf.readFile(tbi) { is =>
+      new TabixIndex(new BlockCompressedInputStream(is))
+    }
+  }
+
+  // merged [start, end) ranges of `intervals' on each contig, in reference order
+  def contigRanges(intervals: Seq[Interval[Locus]], gr: GenomeReference): Array[(String, Int, Int)] = {
+    val ranges = intervals.flatMap { i =>
+      val Locus(startContig, startPos) = i.start
+      val Locus(endContig, endPos) = i.end
+      if (startContig == endContig)
+        Seq((startContig, startPos, endPos))
+      else {
+        val middle = (gr.contigsIndex(startContig) + 1 until gr.contigsIndex(endContig)).map { ci =>
+          val contig = gr.contigs(ci)
+          (contig, 1, gr.contigLength(contig) + 1)
+        }
+        ((startContig, startPos, gr.contigLength(startContig) + 1) +: middle) :+ ((endContig, 1, endPos))
+      }
+    }
+      .filter { case (_, start, end) => start < end }
+      .sortBy { case (contig, start, _) => (gr.contigsIndex(contig), start) }
+
+    val ab = new ArrayBuilder[(String, Int, Int)]()
+    ranges.foreach { case r@(contig, start, end) =>
+      if (ab.length > 0) {
+        val (lastContig, lastStart, lastEnd) = ab(ab.length - 1)
+        if (lastContig == contig && start <= lastEnd)
+          ab(ab.length - 1) = (contig, lastStart, math.max(lastEnd, end))
+        else
+          ab += r
+      } else
+        ab += r
+    }
+    ab.result()
+  }
+
+  def partitions(hConf: hadoop.conf.Configuration, files: Array[String], intervals: Seq[Interval[Locus]],
+    gr: GenomeReference, contigRecoding: Map[String, String]): Array[TabixPartition] = {
+    val ranges = contigRanges(intervals, gr)
+    val fileContig = contigRecoding.map(_.swap)
+
+    files.flatMap { file =>
+      val index = readIndex(hConf, file)
+      val indexed = index.getSequenceNames.asScala.toSet
+
+      ranges.flatMap { case (contig, start, end) =>
+        val c = fileContig.getOrElse(contig, contig)
+        if (indexed.contains(c)) {
+          // tabix queries are 1-based and inclusive of end
+          val chunks = index.getBlocks(c, start, end - 1).asScala
+            .map(b => (b.getStartPosition, b.getEndPosition))
+            .toArray
+          if (chunks.nonEmpty)
+            Some(TabixPartition(file, c, start, end, chunks))
+          else
+            None
+        } else
+          None
+      }
+    }
+  }
+
+  def readPartition(hConf: hadoop.conf.Configuration, p: TabixPartition): Iterator[WithContext[String]] = {
+    val is = new BlockCompressedInputStream(new HadoopSeekableStream(hConf, p.file))
+    // the iterator may not be consumed to the end, by a take or a failed task
+    TaskContext.get().addTaskCompletionListener(_ => is.close())
+
+    val it = p.chunks.iterator.flatMap { case (chunkStart, chunkEnd) =>
+      is.seek(chunkStart)
+      new Iterator[String] {
+        var line: String = _
+
+        def hasNext: Boolean = {
+          if (line == null && is.getFilePointer < chunkEnd)
+            line = is.readLine()
+          line != null
+        }
+
+        def next(): String = {
+          assert(hasNext)
+          val l = line
+          line = null
+          l
+        }
+      }
+    }
+
+    new Iterator[String] {
+      def hasNext: Boolean = {
+        val r = it.hasNext
+        if (!r)
+          is.close()
+        r
+      }
+
+      def next(): String = it.next()
+    }.filter(line => inRange(line, p.contig, p.start, p.end))
+      .map(line => WithContext(line, Context(line, p.file, None)))
+  }
+
+  // does the record on `line' start in [start, end) of `contig'
+  def inRange(line: String, contig: String, start: Int, end: Int): Boolean = {
+    if (!line.startsWith(contig) || line.length <= contig.length || line(contig.length) != '\t')
+      return false
+
+    var i = contig.length + 1
+    var pos = 0
+    while (i < line.length && line(i) != '\t') {
+      pos = pos * 10 + (line(i) - '0')
+      i += 1
+    }
+    pos >= start && pos < end
+  }
+
+  def lines(sc: SparkContext, files: Array[String], intervals: Seq[Interval[Locus]],
+    gr: GenomeReference, contigRecoding: Map[String, String]): RDD[WithContext[String]] = {
+    val hConf = sc.hadoopConfiguration
+    val parts = partitions(hConf, files, intervals, gr, contigRecoding)
+    info(s"reading ${ plural(parts.length, "indexed interval") } from ${ plural(files.length, "file") }")
+
+    val confBc = sc.broadcast(new SerializableHadoopConfiguration(hConf))
+    sc.parallelize(parts, math.max(1, parts.length))
+      .mapPartitions(_.flatMap(p => readPartition(confBc.value.value, p)))
+  }
+}
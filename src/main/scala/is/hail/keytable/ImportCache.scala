@@ -0,0 +1,100 @@
+package is.hail.keytable
+
+import java.nio.charset.StandardCharsets
+import java.security.MessageDigest
+
+import is.hail.HailContext
+import is.hail.utils._
+import org.apache.hadoop
+
+/**
+  * Key tables imported from text files, written in the native format under `dir' and keyed by a
+  * fingerprint of the input files (path, size and modification time) and the import arguments. A later
+  * import with the same fingerprint reads the cached table instead of parsing the files again. Entries
+  * are evicted, least recently used first, to keep the cache within `maxSize' bytes.
+  **/
+class ImportCache(val dir: String, val maxSize: Long) {
+  require(maxSize > 0)
+
+  def entryPath(key: String): String = dir + "/" + key + ".kt"
+
+  def fingerprint(hc: HailContext, kind: String, files: Seq[String], args: Seq[Any]): String = {
+    val sb = new StringBuilder()
+    sb.append(kind)
+    files.foreach { file =>
+      val status = hc.hadoopConf.fileStatus(file)
+      sb.append(s"\n${ status.getPath }\t${ status.getLen }\t${ status.getModificationTime }")
+    }
+    args.foreach { a =>
+      sb += '\n'
+      sb.append(a)
+    }
+
+    MessageDigest.getInstance("SHA-1")
+      .digest(sb.result().getBytes(StandardCharsets.UTF_8))
+      .map(b => "%02x".format(b & 0xff))
+      .mkString
+  }
+
+  def getOrImport(hc: HailContext, kind: String, files: Seq[String], args: Seq[Any])(f: => KeyTable): KeyTable = {
+    val hConf = hc.hadoopConf
+    // let the import report missing files
+    if (!files.forall(hConf.exists))
+      return f
+
+    val key = fingerprint(hc, kind, files, args)
+    val path = entryPath(key)
+
+    if (hConf.exists(path)) {
+      info(s"$kind: reading cached import of ${ plural(files.length, "file") } from `$path'")
+      touch(hc, path)
+      return KeyTable.read(hc, path)
+    }
+
+    val kt = f
+
+    // written under a temporary name and renamed, so a failed write is never read as an entry
+    val tmpPath = dir + "/." + key + "-" + System.nanoTime() + ".kt"
+    kt.write(tmpPath, overwrite = true)
+    if (!hConf.fileSystem(path).rename(new hadoop.fs.Path(tmpPath), new hadoop.fs.Path(path))) {
+      hConf.delete(tmpPath, recursive = true)
+      warn(s"$kind: could not add import to cache at `$path'")
+      return kt
+    }
+    info(s"$kind: cached import of ${ plural(files.length, "file") } at `$path'")
+
+    evict(hc, path)
+    KeyTable.read(hc, path)
+  }
+
+  // entries are ordered by modification time, which each hit updates
+  private def touch(hc: HailContext, path: String) {
+    try {
+      hc.hadoopConf.fileSystem(path).setTimes(new hadoop.fs.Path(path), System.currentTimeMillis(), -1)
+    } catch {
+      case e: Exception =>
+        warn(s"could not update access time of import cache entry `$path': ${ e.getMessage }")
+    }
+  }
+
+  // deletes the least recently used entries, other than `keep', until the cache fits in maxSize
+  def evict(hc: HailContext, keep: String) {
+    val fs = hc.hadoopConf.fileSystem(dir)
+    val keepPath = fs.makeQualified(new hadoop.fs.Path(keep))
+
+    val entries = hc.hadoopConf.glob(dir + "/*.kt")
+      .filter(!_.getPath.getName.startsWith("."))
+      .map(status => (status, fs.getContentSummary(status.getPath).getLength))
+      .sortBy { case (status, _) => -status.getModificationTime }
+
+    var total = 0L
+    entries.foreach { case (status, size) =>
+      total += size
+      if (total > maxSize && status.getPath != keepPath) {
+        info(s"evicting import cache entry `${ status.getPath }' (${ formatSpace(size) })")
+        fs.delete(status.getPath, true)
+        total -= size
+      }
+    }
+  }
+}
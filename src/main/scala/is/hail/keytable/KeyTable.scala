@@ -8,6 +8,7 @@ import is.hail.io.plink.{FamFileConfig, PlinkLoader}
 import is.hail.io.{CassandraConnector, SolrConnector, exportTypes}
 import is.hail.methods.{Aggregators, Filter}
 import is.hail.rvd.RVD
+import is.hail.sparkextras.SpillingAggregator
 import is.hail.utils._
 import is.hail.variant.{GenomeReference, VSMLocalValue}
 import org.apache.commons.lang3.StringUtils
@@ -115,29 +116,34 @@ object KeyTable {
 
   def importIntervalList(hc: HailContext, filename: String,
     gr: GenomeReference = GenomeReference.defaultReference): KeyTable = {
-    IntervalList.read(hc, filename, gr)
+    hc.cachedImport("import_interval_list", Seq(filename), Seq(gr.name)) {
+      IntervalList.read(hc, filename, gr)
+    }
   }
 
   def importBED(hc: HailContext, filename: String,
     gr: GenomeReference = GenomeReference.defaultReference): KeyTable = {
-    BedAnnotator.apply(hc, filename, gr)
+    hc.cachedImport("import_bed", Seq(filename), Seq(gr.name)) {
+      BedAnnotator.apply(hc, filename, gr)
+    }
   }
 
   def importFam(hc: HailContext, path: String, isQuantitative: Boolean = false,
     delimiter: String = "\\t",
     missingValue: String = "NA"): KeyTable = {
+    hc.cachedImport("import_fam", Seq(path), Seq(isQuantitative, delimiter, missingValue)) {
+      val ffConfig = FamFileConfig(isQuantitative, delimiter, missingValue)
 
-    val ffConfig = FamFileConfig(isQuantitative, delimiter, missingValue)
-
-    val (data, typ) = PlinkLoader.parseFam(path, ffConfig, hc.hadoopConf)
+      val (data, typ) = PlinkLoader.parseFam(path, ffConfig, hc.hadoopConf)
 
-    val rows = data.map { case (id, values) => Row.fromSeq(Array(id) ++ values.asInstanceOf[Row].toSeq) }.toArray
-    val rdd = hc.sc.parallelize(rows)
+      val rows = data.map { case (id, values) => Row.fromSeq(Array(id) ++ values.asInstanceOf[Row].toSeq) }.toArray
+      val rdd = hc.sc.parallelize(rows)
 
-    val newFields = List("ID" -> TString()) ++ typ.asInstanceOf[TStruct].fields.map(f => (f.name, f.typ))
-    val struct = TStruct(newFields: _*)
+      val newFields = List("ID" -> TString()) ++ typ.asInstanceOf[TStruct].fields.map(f => (f.name, f.typ))
+      val struct = TStruct(newFields: _*)
 
-    KeyTable(hc, rdd, struct, Array("ID"))
+      KeyTable(hc, rdd, struct, Array("ID"))
+    }
   }
 
   def apply(hc: HailContext, rdd: RDD[Row], signature: TStruct, key: Array[String] = Array.empty,
@@ -576,7 +582,14 @@ class KeyTable(val hc: HailContext,
 
   def rename(newColumns: java.util.ArrayList[String]): KeyTable = rename(newColumns.asScala.toArray)
 
-  def join(other: KeyTable, joinType: String): KeyTable = {
+  def join(other: KeyTable, joinType: String): KeyTable =
+    join(other, joinType, KeyTableIndex.broadcastMaxRows)
+
+  /**
+    * Left and inner joins with a right table of at most `broadcastMaxRows' rows are done map-side
+    * against a broadcast index of the right table. Other joins are sort-merge joins.
+    **/
+  def join(other: KeyTable, joinType: String, broadcastMaxRows: Long): KeyTable = {
     if (key.length != other.key.length || !(keyFields.map(_.typ) sameElements other.keyFields.map(_.typ)))
       fatal(
         s"""Both key tables must have the same number of keys and the types of keys must be identical. Order matters.
@@ -629,16 +642,27 @@ class KeyTable(val hc: HailContext,
       Row.fromSeq(result)
     }
 
-    val rddLeft = keyedRDD()
-    val rddRight = other.keyedRDD()
-
-    val joinedRDD = joinType match {
-      case "left" => rddLeft.leftOuterJoin(rddRight).map { case (k, (l, r)) => merger(k, l, r.orNull) }
-      case "right" => rddLeft.rightOuterJoin(rddRight).map { case (k, (l, r)) => merger(k, l.orNull, r) }
-      case "inner" => rddLeft.join(rddRight).map { case (k, (l, r)) => merger(k, l, r) }
-      case "outer" => rddLeft.fullOuterJoin(rddRight).map { case (k, (l, r)) => merger(k, l.orNull, r.orNull) }
-      case _ => fatal("Invalid join type specified. Choose one of `left', `right', `inner', `outer'")
-    }
+    if (!Set("left", "right", "inner", "outer").contains(joinType))
+      fatal("Invalid join type specified. Choose one of `left', `right', `inner', `outer'")
+
+    val joinedRDD =
+      if ((joinType == "left" || joinType == "inner") && KeyTableIndex.isSmall(other, broadcastMaxRows)) {
+        val indexBc = hc.sc.broadcast(KeyTableIndex(other))
+        val keepUnmatched = joinType == "left"
+        keyedRDD().mapPartitions { it =>
+          val index = indexBc.value
+          it.flatMap { case (k, v) =>
+            val matches = index.get(k)
+            if (matches.isEmpty) {
+              if (keepUnmatched) Iterator.single(merger(k, v, null)) else Iterator.empty
+            } else
+              matches.iterator.map(r => merger(k, v, r))
+          }
+        }
+      } else {
+        val keyOrd = keySignature.ordering(missingGreatest = true).asInstanceOf[Ordering[Row]]
+        SortMergeJoin(keyedRDD(), other.keyedRDD(), keyOrd, joinType, merger)
+      }
 
     copy(rdd = joinedRDD, signature = newSignature, key = key)
   }
@@ -736,7 +760,7 @@ class KeyTable(val hc: HailContext,
         ec.setAllFromRow(r)
     })
 
-    val newRDD = rdd.mapPartitions {
+    val keyedRDD = rdd.mapPartitions {
       it =>
         it.map {
           r =>
@@ -744,7 +768,11 @@ class KeyTable(val hc: HailContext,
             val key = Row.fromSeq(keyF())
             (key, r)
         }
-    }.aggregateByKey(zVals, nPartitions.getOrElse(this.nPartitions))(seqOp, combOp)
+    }
+
+    val keyOrd = keySignature.ordering(missingGreatest = true).asInstanceOf[Ordering[Row]]
+    val newRDD = SpillingAggregator.aggregateByKey(keyedRDD, zVals, nPartitions.getOrElse(this.nPartitions), keyOrd)(
+      seqOp, combOp)
       .map {
         case (k, agg) =>
           resultOp(agg)
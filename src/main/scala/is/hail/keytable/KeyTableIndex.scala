@@ -0,0 +1,119 @@
+package is.hail.keytable
+
+import is.hail.annotations._
+import is.hail.expr.TStruct
+import is.hail.utils._
+import org.apache.spark.sql.Row
+import org.apache.spark.util.SizeEstimator
+
+import scala.collection.mutable
+
+/**
+  * Rows of a small key table for map-side joins: the values are region values in a single region,
+  * looked up by key, so the index is one compact object to broadcast.
+  **/
+class KeyTableIndex(val valueSignature: TStruct, region: MemoryBuffer, index: Map[Row, Array[Long]]) extends Serializable {
+  def nKeys: Int = index.size
+
+  // values of the rows with key `k', in table order
+  def get(k: Row): IndexedSeq[Row] = index.get(k) match {
+    case Some(offsets) => offsets.map(off => new UnsafeRow(valueSignature, region, off): Row)
+    case None => IndexedSeq.empty
+  }
+
+  def getFirst(k: Row): Row = index.get(k) match {
+    case Some(offsets) => new UnsafeRow(valueSignature, region, offsets(0))
+    case None => null
+  }
+}
+
+object KeyTableIndex {
+  // key tables with at most this many rows are joined by broadcasting an index of them
+  val broadcastMaxRows: Long = 1000000L
+
+  // ... and whose rows are estimated to take at most this many bytes
+  val broadcastMaxBytes: Long = 256L * 1024 * 1024
+
+  // the number of rows of each partition whose size is estimated
+  val nSampledRows: Int = 100
+
+  // the number of rows of the partition, counting at most `max', the number of rows sampled from its
+  // start and their estimated size in bytes
+  def countAndSample(rowType: TStruct, max: Long)(it: Iterator[RegionValue]): (Long, Int, Long) = {
+    val sample = new ArrayBuilder[Annotation]()
+    var n = 0L
+    while (n < max && it.hasNext) {
+      val rv = it.next()
+      if (n < nSampledRows)
+        sample += Annotation.copy(rowType, new UnsafeRow(rowType, rv))
+      n += 1
+    }
+    val sampled = sample.result()
+    (n, sampled.length, if (sampled.isEmpty) 0L else SizeEstimator.estimate(sampled))
+  }
+
+  /**
+    * Whether `kt' is small enough to broadcast: at most `maxRows' rows of an estimated `maxBytes' bytes.
+    * As in RDD.take, partitions are scanned in growing batches, each task counting at most one row past
+    * the limit, and the scan stops once either limit is passed, so a large table is not read in full.
+    * The size is extrapolated from the rows sampled at the start of each partition scanned.
+    **/
+  def isSmall(kt: KeyTable, maxRows: Long, maxBytes: Long = broadcastMaxBytes): Boolean = {
+    if (maxRows <= 0)
+      return false
+
+    val rdd = kt.rvd.rdd
+    val sc = rdd.sparkContext
+    val nPartitions = rdd.getNumPartitions
+    val localRowType = kt.signature
+
+    var partScanned = 0
+    var nRows = 0L
+    var nSampled = 0L
+    var sampledBytes = 0L
+    var numPartsToTry = 1L
+
+    def estimatedBytes: Long =
+      if (nSampled == 0) 0L else (sampledBytes.toDouble / nSampled * nRows).toLong
+
+    while (nRows <= maxRows && estimatedBytes <= maxBytes && partScanned < nPartitions) {
+      if (partScanned > 0) {
+        // as in RichRDD.head: quadruple if no rows were found, otherwise interpolate the number of
+        // partitions needed to pass maxRows, overestimated by 50% and capped
+        if (nRows == 0)
+          numPartsToTry = partScanned * 4
+        else {
+          numPartsToTry = math.max((1.5 * (maxRows + 1) * partScanned / nRows).toLong - partScanned, 1)
+          numPartsToTry = math.min(numPartsToTry, partScanned * 4)
+        }
+      }
+
+      val p = partScanned.until(math.min(partScanned + numPartsToTry, nPartitions).toInt)
+      val results = sc.runJob(rdd, countAndSample(localRowType, maxRows - nRows + 1) _, p)
+      results.foreach { case (n, nSample, bytes) =>
+        nRows += n
+        nSampled += nSample
+        sampledBytes += bytes
+      }
+
+      partScanned += p.size
+    }
+
+    nRows <= maxRows && estimatedBytes <= maxBytes
+  }
+
+  def apply(kt: KeyTable): KeyTableIndex = {
+    val valueSignature = kt.valueSignature
+
+    val region = MemoryBuffer()
+    val rvb = new RegionValueBuilder(region)
+    val index = mutable.Map.empty[Row, ArrayBuilder[Long]]
+    kt.keyedRDD().collect().foreach { case (k, v) =>
+      rvb.start(valueSignature)
+      rvb.addAnnotation(valueSignature, v)
+      index.getOrElseUpdate(k, new ArrayBuilder[Long]()) += rvb.end()
+    }
+
+    new KeyTableIndex(valueSignature, region, index.map { case (k, ab) => (k, ab.result()) }.toMap)
+  }
+}
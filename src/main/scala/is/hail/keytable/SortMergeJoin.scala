@@ -0,0 +1,259 @@
+package is.hail.keytable
+
+import is.hail.sparkextras.BinarySearch
+import is.hail.utils._
+import org.apache.spark.{Partitioner, TaskContext}
+import org.apache.spark.rdd.RDD
+import org.apache.spark.sql.Row
+
+import scala.collection.mutable
+import scala.reflect.ClassTag
+
+/**
+  * A key frequent enough to be split over partitions `firstPartition' until
+  * `firstPartition + nPartitions'. Rows of the split side (the left if `splitLeft') are dealt out
+  * over those partitions; rows of the other side are replicated to each of them.
+  **/
+case class HeavyKey(firstPartition: Int, nPartitions: Int, splitLeft: Boolean)
+
+// the target partition is computed before the shuffle and carried with the key
+class JoinPartitioner(val numPartitions: Int) extends Partitioner {
+  def getPartition(key: Any): Int = key.asInstanceOf[(Int, Row)]._1
+}
+
+/**
+  * Sort-merge join of keyed rows. Both sides are shuffled into the same range partitions, chosen from
+  * a sample of their keys, sorted by key within each partition and merged. Keys estimated from the
+  * sample to hold more rows than a partition should get their own partitions: the side with more
+  * rows of the key is split across them and the other side is replicated, so no single task joins
+  * all rows of a hot key.
+  **/
+object SortMergeJoin {
+  // keys sampled from each input partition if all are sampled; fewer sampled partitions give more each
+  val samplesPerPartition: Int = 200
+
+  // fraction of the input partitions sampled, and the fewest sampled unless there are fewer
+  val sampledPartitionFraction: Double = 0.1
+  val minSampledPartitions: Int = 16
+
+  // most partitions a single key is split across
+  val maxSplit: Int = 1024
+
+  // reservoir sample of the keys of a partition, with the number of rows in the partition
+  def sampleKeys(it: Iterator[(Row, Row)], n: Int, seed: Int): (Long, Array[Row]) = {
+    val rng = new java.util.Random(seed)
+    val sample = new Array[Row](n)
+    var count = 0L
+    it.foreach { case (k, _) =>
+      if (count < n)
+        sample(count.toInt) = k
+      else {
+        val j = (rng.nextDouble() * (count + 1)).toLong
+        if (j < n)
+          sample(j.toInt) = k
+      }
+      count += 1
+    }
+    (count, sample.take(math.min(count, n.toLong).toInt))
+  }
+
+  /**
+    * Sampled keys of `rdd' with the number of rows each stands for. The inputs of a join are not
+    * persisted, so sampling computes them once more; to bound that, only a random subset of the
+    * partitions is sampled, more keys are taken from each and their weights are scaled to stand for
+    * the whole input.
+    **/
+  def weightedSample(rdd: RDD[(Row, Row)]): Array[(Row, Double)] = {
+    val nParts = rdd.getNumPartitions
+    if (nParts == 0)
+      return Array.empty
+
+    val nSampled = math.min(nParts, math.max(minSampledPartitions, math.ceil(nParts * sampledPartitionFraction).toInt))
+    val partitions = new scala.util.Random(nParts).shuffle((0 until nParts).toIndexedSeq).take(nSampled).sorted
+    val n = math.min(10 * samplesPerPartition, samplesPerPartition * nParts / nSampled)
+    val scale = nParts.toDouble / nSampled
+
+    rdd.sparkContext.runJob(rdd,
+      (context: TaskContext, it: Iterator[(Row, Row)]) => sampleKeys(it, n, context.partitionId()),
+      partitions)
+      .flatMap { case (count, sample) =>
+        val w = if (sample.isEmpty) 0.0 else scale * count / sample.length
+        sample.map(k => (k, w))
+      }
+  }
+
+  def apply(left: RDD[(Row, Row)], right: RDD[(Row, Row)], ord: Ordering[Row], joinType: String,
+    merger: (Row, Row, Row) => Row): RDD[Row] = {
+    val sc = left.sparkContext
+    val nRange = math.max(1, math.max(left.getNumPartitions, right.getNumPartitions))
+
+    val leftSample = weightedSample(left)
+    val rightSample = weightedSample(right)
+
+    val leftCounts = mutable.Map.empty[Row, Double]
+    leftSample.foreach { case (k, w) => leftCounts(k) = leftCounts.getOrElse(k, 0.0) + w }
+    val rightCounts = mutable.Map.empty[Row, Double]
+    rightSample.foreach { case (k, w) => rightCounts(k) = rightCounts.getOrElse(k, 0.0) + w }
+
+    val total = leftCounts.values.sum + rightCounts.values.sum
+    val target = math.max(1.0, total / nRange)
+
+    // a key splits its larger side, which the sample shows is non-empty, into partitions of about `target' rows
+    val heavyKeys = (leftCounts.keySet ++ rightCounts.keySet).toArray
+      .flatMap { k =>
+        val l = leftCounts.getOrElse(k, 0.0)
+        val r = rightCounts.getOrElse(k, 0.0)
+        val nSplit = math.min(maxSplit, math.ceil(math.max(l, r) / target).toInt)
+        if (l + r > target && nSplit >= 2)
+          Some((k, nSplit, l >= r))
+        else
+          None
+      }
+      .sortBy(_._1)(ord)
+
+    // range bounds at quantiles of the remaining keys
+    val keys = (leftSample ++ rightSample)
+      .filter { case (k, _) => !heavyKeys.exists { case (hk, _, _) => ord.equiv(hk, k) } }
+      .sortBy(_._1)(ord)
+    val keysWeight = keys.map(_._2).sum
+    val boundsBuilder = new ArrayBuilder[Row]()
+    var acc = 0.0
+    keys.foreach { case (k, w) =>
+      acc += w
+      if (boundsBuilder.length < nRange - 1 && acc >= (boundsBuilder.length + 1) * keysWeight / nRange
+        && (boundsBuilder.length == 0 || ord.gt(k, boundsBuilder(boundsBuilder.length - 1))))
+        boundsBuilder += k
+    }
+    val bounds = boundsBuilder.result()
+    val nRangePartitions = bounds.length + 1
+
+    val heavy = mutable.Map.empty[Row, HeavyKey]
+    var nPartitions = nRangePartitions
+    heavyKeys.foreach { case (k, nSplit, splitLeft) =>
+      heavy(k) = HeavyKey(nPartitions, nSplit, splitLeft)
+      nPartitions += nSplit
+    }
+    if (heavy.nonEmpty)
+      info(s"join: splitting ${ plural(heavy.size, "frequent key") } across ${ nPartitions - nRangePartitions } partitions")
+
+    val boundsBc = sc.broadcast(bounds)
+    val heavyBc = sc.broadcast(heavy.toMap)
+
+    def assign(rdd: RDD[(Row, Row)], isLeft: Boolean): RDD[((Int, Row), Row)] =
+      rdd.mapPartitionsWithIndex { (i, it) =>
+        val bounds = boundsBc.value
+        val heavy = heavyBc.value
+        // rows of split keys are dealt out in turn, so recomputing a partition assigns them the same way
+        var dealt = i.toLong
+
+        it.flatMap { case (k, v) =>
+          heavy.get(k) match {
+            case Some(h) =>
+              if (h.splitLeft == isLeft) {
+                dealt += 1
+                Iterator.single(((h.firstPartition + (dealt % h.nPartitions).toInt, k), v))
+              } else
+                Iterator.range(h.firstPartition, h.firstPartition + h.nPartitions).map(p => ((p, k), v))
+            case None =>
+              val p = BinarySearch.binarySearch(bounds.length + 1,
+                j => if (j == bounds.length) -1 else ord.compare(k, bounds(j)))
+              Iterator.single(((p, k), v))
+          }
+        }
+      }
+
+    implicit val keyOrd: Ordering[(Int, Row)] = new Ordering[(Int, Row)] {
+      def compare(x: (Int, Row), y: (Int, Row)): Int = ord.compare(x._2, y._2)
+    }
+
+    val partitioner = new JoinPartitioner(nPartitions)
+    val sortedLeft = assign(left, isLeft = true).repartitionAndSortWithinPartitions(partitioner)
+    val sortedRight = assign(right, isLeft = false).repartitionAndSortWithinPartitions(partitioner)
+
+    val (emitLeft, emitRight) = joinType match {
+      case "left" => (true, false)
+      case "right" => (false, true)
+      case "inner" => (false, false)
+      case "outer" => (true, true)
+    }
+
+    val heavyPartitions = heavy.values.toArray
+    sortedLeft.zipPartitions(sortedRight, preservesPartitioning = true) { (lit, rit) =>
+      val i = TaskContext.getPartitionId()
+      val h = heavyPartitions.find(h => i >= h.firstPartition && i < h.firstPartition + h.nPartitions)
+
+      // the replicated side of a split key always matches some row of the split side, which is
+      // non-empty, so only its unmatched rows would be repeated
+      val (emitL, emitR, bufferLeft) = h match {
+        case Some(HeavyKey(_, _, true)) => (emitLeft, false, false)
+        case Some(HeavyKey(_, _, false)) => (false, emitRight, true)
+        case None => (emitLeft, emitRight, false)
+      }
+
+      new SortMergeJoinIterator(lit.map { case ((_, k), v) => (k, v) }, rit.map { case ((_, k), v) => (k, v) },
+        ord, bufferLeft, emitL, emitR, merger)
+    }
+  }
+}
+
+/**
+  * Merges two iterators of (key, value) sorted by key. The rows of each key on one side, the left if
+  * `bufferLeft', are buffered and matched against each row of the key streamed from the other side.
+  **/
+class SortMergeJoinIterator(left: Iterator[(Row, Row)], right: Iterator[(Row, Row)], ord: Ordering[Row],
+  bufferLeft: Boolean, emitUnmatchedLeft: Boolean, emitUnmatchedRight: Boolean,
+  merger: (Row, Row, Row) => Row) extends Iterator[Row] {
+
+  private val streamed = (if (bufferLeft) right else left).buffered
+  private val buffered = (if (bufferLeft) left else right).buffered
+  private val emitUnmatchedStreamed = if (bufferLeft) emitUnmatchedRight else emitUnmatchedLeft
+  private val emitUnmatchedBuffered = if (bufferLeft) emitUnmatchedLeft else emitUnmatchedRight
+
+  private val run = new mutable.ArrayBuffer[Row]()
+  private var current: Iterator[Row] = Iterator.empty
+
+  private def merge(k: Row, s: Row, b: Row): Row =
+    if (bufferLeft) merger(k, b, s) else merger(k, s, b)
+
+  // joined rows of the next key
+  private def advance(): Iterator[Row] = {
+    val c =
+      if (!streamed.hasNext)
+        1
+      else if (!buffered.hasNext)
+        -1
+      else
+        ord.compare(streamed.head._1, buffered.head._1)
+
+    if (c < 0) {
+      val (k, v) = streamed.next()
+      if (emitUnmatchedStreamed) Iterator.single(merge(k, v, null)) else Iterator.empty
+    } else if (c > 0) {
+      val (k, v) = buffered.next()
+      if (emitUnmatchedBuffered) Iterator.single(merge(k, null, v)) else Iterator.empty
+    } else {
+      val k = buffered.head._1
+      run.clear()
+      while (buffered.hasNext && ord.equiv(buffered.head._1, k))
+        run += buffered.next()._2
+
+      new Iterator[(Row, Row)] {
+        def hasNext: Boolean = streamed.hasNext && ord.equiv(streamed.head._1, k)
+
+        def next(): (Row, Row) = streamed.next()
+      }.flatMap { case (sk, s) => run.iterator.map(b => merge(sk, s, b)) }
+    }
+  }
+
+  def hasNext: Boolean = {
+    while (!current.hasNext && (streamed.hasNext || buffered.hasNext))
+      current = advance()
+    current.hasNext
+  }
+
+  def next(): Row = {
+    if (!hasNext)
+      throw new NoSuchElementException("next on empty iterator")
+    current.next()
+  }
+}
@@ -0,0 +1,60 @@
+package is.hail.rvd
+
+import is.hail.annotations.{RegionValue, UnsafeOrdering}
+import is.hail.utils._
+
+/**
+  * Groups the rows of iterators of region values, each sorted by `ord', by key. Each group holds,
+  * for each iterator, its row with the least key left or null if that key is greater; an iterator
+  * with several rows of a key contributes them to consecutive groups. The rows of a group are
+  * valid until the next group is read.
+  **/
+class AlignedRVIterator(its: Array[BufferedIterator[RegionValue]], ord: UnsafeOrdering) extends Iterator[Array[RegionValue]] {
+  // the greatest element of the heap is the iterator with the least next row
+  private val heap = new BinaryHeap[Int](maybeTieBreaker = (i: Int, j: Int) => {
+    val c = ord.compare(its(i).head, its(j).head)
+    if (c != 0) -c else j - i
+  })
+
+  private val group = new Array[RegionValue](its.length)
+
+  // the iterators with rows in the last group, to put back in the heap
+  private val taken = new ArrayBuilder[Int]()
+
+  its.indices.foreach { i =>
+    if (its(i).hasNext)
+      heap.insert(i, 0)
+  }
+
+  private def restoreTaken() {
+    var k = 0
+    while (k < taken.length) {
+      val i = taken(k)
+      group(i) = null
+      if (its(i).hasNext)
+        heap.insert(i, 0)
+      k += 1
+    }
+    taken.clear()
+  }
+
+  def hasNext: Boolean = {
+    restoreTaken()
+    heap.nonEmpty
+  }
+
+  def next(): Array[RegionValue] = {
+    if (!hasNext)
+      throw new NoSuchElementException("next on empty iterator")
+
+    val first = heap.extractMax()
+    group(first) = its(first).next()
+    taken += first
+    while (heap.nonEmpty && ord.compare(its(heap.max()).head, group(first)) == 0) {
+      val i = heap.extractMax()
+      group(i) = its(i).next()
+      taken += i
+    }
+    group
+  }
+}
@@ -0,0 +1,46 @@
+package is.hail.rvd
+
+import is.hail.annotations.{RegionValue, UnsafeOrdering}
+import is.hail.utils._
+
+/**
+  * Merges iterators of region values, each sorted by `ord', into one sorted iterator. The iterators
+  * with rows left are kept in a heap by their next row; rows that compare equal come out in the
+  * order of their iterators. The next row of an iterator is only read once the row before it has
+  * been consumed, so iterators may reuse their regions.
+  **/
+class MergedRVIterator(its: Array[BufferedIterator[RegionValue]], ord: UnsafeOrdering) extends Iterator[RegionValue] {
+  // the greatest element of the heap is the iterator with the least next row
+  private val heap = new BinaryHeap[Int](maybeTieBreaker = (i: Int, j: Int) => {
+    val c = ord.compare(its(i).head, its(j).head)
+    if (c != 0) -c else j - i
+  })
+
+  // the iterator the last row came from, to put back in the heap
+  private var last: Int = -1
+
+  its.indices.foreach { i =>
+    if (its(i).hasNext)
+      heap.insert(i, 0)
+  }
+
+  private def restoreLast() {
+    if (last >= 0) {
+      if (its(last).hasNext)
+        heap.insert(last, 0)
+      last = -1
+    }
+  }
+
+  def hasNext: Boolean = {
+    restoreLast()
+    heap.nonEmpty
+  }
+
+  def next(): RegionValue = {
+    if (!hasNext)
+      throw new NoSuchElementException("next on empty iterator")
+    last = heap.extractMax()
+    its(last).next()
+  }
+}
@@ -419,6 +419,118 @@ object OrderedRVD {
   def shuffle(typ: OrderedRVType, partitioner: OrderedRVPartitioner, rvd: RVD): OrderedRVD =
     shuffle(typ, partitioner, rvd.rdd)
 
+  /**
+    * Range bounds for the union of `partitioners', chosen from theirs: a bound is kept once the
+    * partition it closes holds about one partition of each input whose bounds span it. Inputs over
+    * disjoint ranges keep their partitions, and a partition of overlapping inputs is read by
+    * about one partition of the union.
+    **/
+  def unionRangeBounds(typ: OrderedRVType, partitioners: Array[OrderedRVPartitioner]): Array[Annotation] = {
+    val ord = typ.pkType.ordering(missingGreatest = true)
+
+    val spans = partitioners
+      .filter(_.rangeBounds.nonEmpty)
+      .map(p => (p.rangeBounds.head, p.rangeBounds.last))
+    val bounds = partitioners.flatMap(_.rangeBounds).sorted(ord)
+
+    val ab = new ArrayBuilder[Annotation]()
+    var nClosed = 0
+    var i = 0
+    while (i < bounds.length) {
+      val b = bounds(i)
+      var j = i + 1
+      while (j < bounds.length && ord.equiv(bounds(j), b))
+        j += 1
+      nClosed += j - i
+
+      val depth = spans.count { case (min, max) => ord.lteq(min, b) && ord.lteq(b, max) }
+      if (nClosed >= depth) {
+        ab += b
+        nClosed = 0
+      }
+      i = j
+    }
+    ab.result()
+  }
+
+  /**
+    * An RDD with the partitions of `partitioner', each of which applies `f' to the rows of each of
+    * `rvds' in its range. Each partition reads the partitions of `rvds' that overlap its range
+    * directly, without a shuffle.
+    **/
+  def alignPartitions(rvds: Array[OrderedRVD], partitioner: OrderedRVPartitioner)
+    (f: Array[BufferedIterator[RegionValue]] => Iterator[RegionValue]): RDD[RegionValue] = {
+    val sc = rvds(0).rdd.sparkContext
+    val nPartitions = partitioner.numPartitions
+    val partitionerBc = sc.broadcast(partitioner)
+    val pkRowOrds = rvds.map(_.typ.pkRowOrd)
+
+    val inputs = Array.tabulate(nPartitions) { i =>
+      // the partitions of each input that can hold keys in (rangeBounds(i - 1), rangeBounds(i)]
+      val partitionInputs = rvds.zipWithIndex.flatMap { case (rvd, r) =>
+        val p = rvd.partitioner
+        if (p.numPartitions == 0)
+          Array.empty[(Int, Int)]
+        else {
+          val first = if (i == 0) 0 else p.getPartitionPK(partitioner.rangeBounds(i - 1))
+          val last = if (i == nPartitions - 1) p.numPartitions - 1 else p.getPartitionPK(partitioner.rangeBounds(i))
+          (first to last).map(k => (r, k)).toArray
+        }
+      }
+      val sources = partitionInputs.map(_._1)
+      val nSources = rvds.length
+
+      val g: Array[Iterator[RegionValue]] => Iterator[RegionValue] = { its =>
+        val p = partitionerBc.value
+
+        def inRange(r: Int, it: Iterator[RegionValue]): Iterator[RegionValue] = {
+          val pkRowOrd = pkRowOrds(r)
+          val dropped =
+            if (i == 0)
+              it
+            else
+              it.dropWhile(rv => pkRowOrd.compare(p.region, p.loadElement(i - 1), rv) >= 0)
+          if (i == nPartitions - 1)
+            dropped
+          else
+            dropped.takeWhile(rv => pkRowOrd.compare(p.region, p.loadElement(i), rv) >= 0)
+        }
+
+        f(Array.tabulate(nSources) { r =>
+          its.indices.iterator.filter(k => sources(k) == r).flatMap(k => inRange(r, its(k))).buffered
+        })
+      }
+
+      (partitionInputs, g)
+    }
+
+    new GeneralRDD(sc, rvds.map(_.rdd), inputs)
+  }
+
+  /**
+    * Union of `rvds', which must have the same type, in one stage without a shuffle. Each partition
+    * of the union merges the rows of the inputs in its range in key order.
+    **/
+  def union(rvds: Array[OrderedRVD]): OrderedRVD = {
+    require(rvds.nonEmpty)
+    val typ = rvds(0).typ
+    require(rvds.forall(_.typ == typ))
+
+    val nonEmpty = rvds.filter(_.partitioner.numPartitions > 0)
+    if (nonEmpty.isEmpty)
+      return rvds(0)
+    if (nonEmpty.length == 1)
+      return nonEmpty(0)
+
+    val rangeBounds = unionRangeBounds(typ, nonEmpty.map(_.partitioner))
+    val partitioner = new OrderedRVPartitioner(rangeBounds.length + 1, typ.partitionKey, typ.kType,
+      UnsafeIndexedSeq(TArray(typ.pkType), rangeBounds))
+
+    OrderedRVD(typ, partitioner, alignPartitions(nonEmpty, partitioner) { its =>
+      new MergedRVIterator(its, typ.kInRowOrd)
+    })
+  }
+
   def rangesAndAdjustments(typ: OrderedRVType,
     sortedKeyInfo: Array[OrderedRVPartitionInfo],
     sortedness: Int): (IndexedSeq[Array[Adjustment[RegionValue]]], Array[RegionValue], Int) = {
@@ -450,15 +450,20 @@ class OrderedRDD[PK, K, V] private(rdd: RDD[(K, V)], val orderedPartitioner: Ord
   }
 
   def filterIntervals(intervals: IntervalTree[PK, _]): OrderedRDD[PK, K, V] = {
+    val iListBc = rdd.sparkContext.broadcast(intervals)
+    filterIntervals(intervals, (k: K) => iListBc.value.contains(kOk.project(k)))
+  }
+
+  // keys satisfying `p', which must only hold for keys in `intervals'; partitions that do not overlap
+  // `intervals' are skipped
+  def filterIntervals(intervals: IntervalTree[PK, _], p: K => Boolean): OrderedRDD[PK, K, V] = {
 
     import kOk.pkOrd
     import kOk._
     import Ordering.Implicits._
 
-    val iListBc = rdd.sparkContext.broadcast(intervals)
-
     if (partitions.length <= 1)
-      return filter { case (k, _) => iListBc.value.contains(project(k)) }.asOrderedRDD
+      return filter { case (k, _) => p(k) }.asOrderedRDD
 
     val intervalArray = intervals.toArray
 
@@ -496,7 +501,7 @@ class OrderedRDD[PK, K, V] private(rdd: RDD[(K, V)], val orderedPartitioner: Ord
     if (newPartitionIndices.isEmpty)
       OrderedRDD.empty[PK, K, V](rdd.sparkContext)
     else {
-      val f: Iterator[(K, V)] => Iterator[(K, V)] = _.filter { case (k, _) => iListBc.value.contains(project(k)) }
+      val f: Iterator[(K, V)] => Iterator[(K, V)] = _.filter { case (k, _) => p(k) }
       val newRDD = new AdjustedPartitionsRDD(this, newPartitionIndices.map(i => Array(Adjustment(i, f))))
       new OrderedRDD(newRDD, OrderedPartitioner(newPartitionIndices.init.map(rangeBounds), newPartitionIndices.length))
     }
@@ -0,0 +1,244 @@
+package is.hail.sparkextras
+
+import java.io._
+import java.nio.ByteBuffer
+
+import is.hail.utils._
+import org.apache.spark.memory.MemoryConsumer
+import org.apache.spark.rdd.RDD
+import org.apache.spark.serializer.{DeserializationStream, SerializerInstance}
+import org.apache.spark.util.SizeEstimator
+import org.apache.spark.{HashPartitioner, LocalSpillFile, SparkEnv, TaskContext, TaskMemory}
+
+import scala.collection.mutable
+import scala.reflect.ClassTag
+
+/**
+  * Combines values by key in a hash map, like the combiners of Spark's combineByKey. The size of the
+  * map is estimated at geometrically spaced updates and the memory it needs is acquired from the task's
+  * memory manager, as Spark's spillable collections do; if the manager grants too little, or the map
+  * exceeds `maxBytes', the combiners are sorted by key with `ord', written as a run to a local spill
+  * file, the map is cleared and its memory released. Other consumers of the task may also force a spill
+  * until iteration starts. `iterator' merges the runs with the combiners left in memory, combining the
+  * combiners of equal keys, so only one combiner per run is held in memory at a time.
+  **/
+class SpillingAggregator[K, V, C](context: TaskContext, createCombiner: V => C, mergeValue: (C, V) => C,
+  mergeCombiners: (C, C) => C, ord: Ordering[K], maxBytes: Long = Long.MaxValue)
+  extends MemoryConsumer(TaskMemory.manager(context)) {
+  private var map = new mutable.HashMap[K, C]()
+
+  // spill files and the number of combiners in each
+  private val spills = new mutable.ArrayBuffer[(File, Int)]()
+
+  // spill files being read
+  private val openStreams = new mutable.HashSet[DeserializationStream]()
+
+  private lazy val ser: SerializerInstance = SparkEnv.get.serializer.newInstance()
+
+  // size samples, the size between samples is extrapolated from the bytes per update
+  private var nUpdates = 0L
+  private var nextSample = 1L
+  private var lastSampleUpdates = 0L
+  private var lastSampleBytes = 0L
+  private var bytesPerUpdate = 0.0
+
+  // the map may grow to memoryThreshold bytes before acquiring more memory; memory beyond the initial
+  // threshold is acquired from the memory manager
+  private val initialMemoryThreshold: Long =
+    SparkEnv.get.conf.getLong("spark.shuffle.spill.initialMemoryThreshold", 5 * 1024 * 1024)
+  private var memoryThreshold = initialMemoryThreshold
+
+  private var iterating = false
+
+  context.addTaskCompletionListener { _ => cleanUp() }
+
+  def nSpills: Int = spills.length
+
+  def insert(k: K, v: V) {
+    map.get(k) match {
+      case Some(c) => map.update(k, mergeValue(c, v))
+      case None => map.update(k, createCombiner(v))
+    }
+
+    nUpdates += 1
+    if (nUpdates >= nextSample)
+      sample()
+    val bytes = estimatedBytes
+    if (bytes > maxBytes || (bytes >= memoryThreshold && !reserve(bytes)))
+      spillMap()
+  }
+
+  // asks for enough memory to double the map, as Spark's Spillable does; whether bytes fit
+  private def reserve(bytes: Long): Boolean = {
+    memoryThreshold += acquireMemory(2 * bytes - memoryThreshold)
+    bytes < memoryThreshold
+  }
+
+  private def releaseMemory(): Long = {
+    val released = memoryThreshold - initialMemoryThreshold
+    freeMemory(released)
+    memoryThreshold = initialMemoryThreshold
+    released
+  }
+
+  // called by the memory manager when a consumer of this task needs memory
+  override def spill(size: Long, trigger: MemoryConsumer): Long = {
+    if (trigger == this || iterating || map.isEmpty)
+      0L
+    else
+      spillMap()
+  }
+
+  private def sample() {
+    val bytes = SizeEstimator.estimate(map)
+    if (nUpdates > lastSampleUpdates)
+      bytesPerUpdate = math.max(0.0, (bytes - lastSampleBytes).toDouble / (nUpdates - lastSampleUpdates))
+    lastSampleUpdates = nUpdates
+    lastSampleBytes = bytes
+    nextSample = math.ceil(nUpdates * 1.1).toLong
+  }
+
+  def estimatedBytes: Long = lastSampleBytes + (bytesPerUpdate * (nUpdates - lastSampleUpdates)).toLong
+
+  private def sortedCombiners(): Array[(K, C)] = map.toArray.sortBy(_._1)(ord)
+
+  // returns the memory released
+  private def spillMap(): Long = {
+    val file = LocalSpillFile.create()
+    val out = ser.serializeStream(new BufferedOutputStream(new FileOutputStream(file)))
+    try {
+      sortedCombiners().foreach { case (k, c) =>
+        out.writeObject[Any](k)
+        out.writeObject[Any](c)
+      }
+    } finally {
+      out.close()
+    }
+    spills += ((file, map.size))
+    log.info(s"spilled ${ map.size } combiners of estimated size $estimatedBytes bytes to $file")
+
+    map = new mutable.HashMap[K, C]()
+    nUpdates = 0L
+    nextSample = 1L
+    lastSampleUpdates = 0L
+    lastSampleBytes = 0L
+    bytesPerUpdate = 0.0
+    releaseMemory()
+  }
+
+  private def readSpill(file: File, n: Int): Iterator[(K, C)] = new Iterator[(K, C)] {
+    private var in: DeserializationStream = _
+    private var i = 0
+
+    def hasNext: Boolean = i < n
+
+    def next(): (K, C) = {
+      if (!hasNext)
+        throw new NoSuchElementException("next on empty iterator")
+      if (in == null) {
+        in = ser.deserializeStream(new BufferedInputStream(new FileInputStream(file)))
+        openStreams += in
+      }
+      val k = in.readObject[Any]().asInstanceOf[K]
+      val c = in.readObject[Any]().asInstanceOf[C]
+      i += 1
+      if (i == n) {
+        in.close()
+        openStreams -= in
+        file.delete()
+      }
+      (k, c)
+    }
+  }
+
+  // closes the spills still being read and deletes them; the task may end before its output is consumed
+  private def cleanUp() {
+    openStreams.foreach(_.close())
+    openStreams.clear()
+    spills.foreach { case (file, _) => file.delete() }
+    map = new mutable.HashMap[K, C]()
+    releaseMemory()
+  }
+
+  // the combiners by key; sorted by key if any were spilled
+  def iterator: Iterator[(K, C)] = {
+    iterating = true
+    if (spills.isEmpty)
+      map.iterator
+    else {
+      val its = (spills.map { case (file, n) => readSpill(file, n) } :+ sortedCombiners().iterator)
+        .map(_.buffered)
+        .toArray
+      map = new mutable.HashMap[K, C]()
+      new MergedCombinerIterator(its, ord, mergeCombiners)
+    }
+  }
+}
+
+/**
+  * Merges iterators of combiners, each sorted by key, into one sorted iterator with one combiner per
+  * key, combining the combiners of equal keys in the order of their iterators.
+  **/
+class MergedCombinerIterator[K, C](its: Array[BufferedIterator[(K, C)]], ord: Ordering[K],
+  mergeCombiners: (C, C) => C) extends Iterator[(K, C)] {
+  // the greatest element of the heap is the iterator with the least next key
+  private val heap = new BinaryHeap[Int](maybeTieBreaker = (i: Int, j: Int) => {
+    val c = ord.compare(its(i).head._1, its(j).head._1)
+    if (c != 0) -c else j - i
+  })
+
+  its.indices.foreach { i =>
+    if (its(i).hasNext)
+      heap.insert(i, 0)
+  }
+
+  private def take(i: Int): C = {
+    val c = its(i).next()._2
+    if (its(i).hasNext)
+      heap.insert(i, 0)
+    c
+  }
+
+  def hasNext: Boolean = heap.nonEmpty
+
+  def next(): (K, C) = {
+    if (!hasNext)
+      throw new NoSuchElementException("next on empty iterator")
+
+    val first = heap.extractMax()
+    val k = its(first).head._1
+    var c = take(first)
+    while (heap.nonEmpty && ord.equiv(its(heap.max()).head._1, k))
+      c = mergeCombiners(c, take(heap.extractMax()))
+    (k, c)
+  }
+}
+
+object SpillingAggregator {
+  /**
+    * Aggregates the values of `rdd' by key into `nPartitions' hash partitions, like Spark's
+    * aggregateByKey: each partition is pre-aggregated by key before the shuffle and the partial
+    * aggregates are combined after it, each side spilling sorted runs to local disk when the task's
+    * memory manager grants too little memory or past `maxBytes'.
+    **/
+  def aggregateByKey[K: ClassTag, V, U: ClassTag](rdd: RDD[(K, V)], zeroValue: U, nPartitions: Int,
+    ord: Ordering[K], maxBytes: Long = Long.MaxValue)(seqOp: (U, V) => U, combOp: (U, U) => U): RDD[(K, U)] = {
+    // the zero is serialized once and deserialized for each key, as in Spark's aggregateByKey
+    val zeroBuffer = SparkEnv.get.serializer.newInstance().serialize(zeroValue)
+    val zeroBytes = new Array[Byte](zeroBuffer.limit())
+    zeroBuffer.get(zeroBytes)
+
+    rdd.mapPartitions { it =>
+      val ser = SparkEnv.get.serializer.newInstance()
+      val agg = new SpillingAggregator[K, V, U](TaskContext.get(),
+        v => seqOp(ser.deserialize[U](ByteBuffer.wrap(zeroBytes)), v), seqOp, combOp, ord, maxBytes)
+      it.foreach { case (k, v) => agg.insert(k, v) }
+      agg.iterator
+    }.partitionBy(new HashPartitioner(nPartitions))
+      .mapPartitions({ it =>
+        val agg = new SpillingAggregator[K, U, U](TaskContext.get(), u => u, combOp, combOp, ord, maxBytes)
+        it.foreach { case (k, u) => agg.insert(k, u) }
+        agg.iterator
+      }, preservesPartitioning = true)
+  }
+}
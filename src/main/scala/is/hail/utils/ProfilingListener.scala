@@ -0,0 +1,123 @@
+package is.hail.utils
+
+import org.apache.spark.{ListenerBusAccess, SparkContext}
+import org.apache.spark.scheduler._
+import org.json4s._
+import org.json4s.jackson.JsonMethods
+
+import scala.collection.mutable
+
+class JobProfile(val jobId: Int, val stageIds: Seq[Int], val submissionTime: Long) {
+  var completionTime: Long = -1
+  var shuffleReadBytes: Long = 0
+  var shuffleWriteBytes: Long = 0
+  var inputRecords: Long = 0
+  var outputRecords: Long = 0
+
+  def toJSON: JValue = JObject(
+    "job_id" -> JInt(jobId),
+    "stage_ids" -> JArray(stageIds.map(JInt(_)).toList),
+    "submission_time" -> JInt(submissionTime),
+    "completion_time" -> (if (completionTime >= 0) JInt(completionTime) else JNull),
+    "shuffle_read_bytes" -> JInt(shuffleReadBytes),
+    "shuffle_write_bytes" -> JInt(shuffleWriteBytes),
+    "input_records" -> JInt(inputRecords),
+    "output_records" -> JInt(outputRecords))
+}
+
+/**
+  * Records the Spark jobs started by the profiled calls of the open profiles, together with their
+  * stages and the shuffle and record counts of their completed stages. A call tags the jobs it
+  * starts with the local property `callProperty', which Spark passes to the listener with each job,
+  * so jobs are attributed to their call however late their events arrive. Jobs are only recorded
+  * for open profiles and are dropped when their profile is closed.
+  **/
+class ProfilingListener(sc: SparkContext) extends SparkListener {
+  // jobs of each open profile, by the index of the call that started them
+  private val profiles = mutable.Map.empty[String, mutable.Map[Int, mutable.ArrayBuffer[JobProfile]]]
+  private val stageJob = mutable.Map.empty[Int, JobProfile]
+  private val jobIndex = mutable.Map.empty[Int, JobProfile]
+
+  def open(profile: String): Unit = synchronized {
+    profiles.getOrElseUpdate(profile, mutable.Map.empty)
+  }
+
+  def close(profile: String): Unit = synchronized {
+    profiles.remove(profile).foreach { calls =>
+      calls.values.foreach(_.foreach { j =>
+        jobIndex -= j.jobId
+        j.stageIds.foreach(stageJob -= _)
+      })
+    }
+  }
+
+  // tags the jobs started by this thread with call `call' of `profile'; returns the previous tag
+  def startCall(profile: String, call: Int): String = {
+    val previous = sc.getLocalProperty(ProfilingListener.callProperty)
+    sc.setLocalProperty(ProfilingListener.callProperty, s"$profile/$call")
+    previous
+  }
+
+  def endCall(previous: String) {
+    sc.setLocalProperty(ProfilingListener.callProperty, previous)
+  }
+
+  // waits up to `timeoutMillis' for the events of the jobs run so far; false on timeout
+  def drain(timeoutMillis: Long): Boolean = ListenerBusAccess.waitUntilEmpty(sc, timeoutMillis)
+
+  // jobs of `profile', in submission order, by call index as a JSON object
+  def jobsJSON(profile: String): String = synchronized {
+    val calls = profiles.getOrElse(profile, mutable.Map.empty[Int, mutable.ArrayBuffer[JobProfile]])
+    JsonMethods.compact(JObject(calls.toList.sortBy(_._1).map { case (call, jobs) =>
+      call.toString -> JArray(jobs.map(_.toJSON).toList)
+    }))
+  }
+
+  override def onJobStart(jobStart: SparkListenerJobStart): Unit = synchronized {
+    Option(jobStart.properties)
+      .flatMap(p => Option(p.getProperty(ProfilingListener.callProperty)))
+      .foreach { tag =>
+        val i = tag.lastIndexOf('/')
+        profiles.get(tag.substring(0, i)).foreach { calls =>
+          val j = new JobProfile(jobStart.jobId, jobStart.stageIds, jobStart.time)
+          calls.getOrElseUpdate(tag.substring(i + 1).toInt, new mutable.ArrayBuffer[JobProfile]()) += j
+          jobIndex(j.jobId) = j
+          j.stageIds.foreach(stageJob(_) = j)
+        }
+      }
+  }
+
+  override def onJobEnd(jobEnd: SparkListenerJobEnd): Unit = synchronized {
+    jobIndex.get(jobEnd.jobId).foreach(_.completionTime = jobEnd.time)
+  }
+
+  override def onStageCompleted(stageCompleted: SparkListenerStageCompleted): Unit = synchronized {
+    val info = stageCompleted.stageInfo
+    val metrics = info.taskMetrics
+    if (metrics != null)
+      stageJob.get(info.stageId).foreach { j =>
+        j.shuffleReadBytes += metrics.shuffleReadMetrics.totalBytesRead
+        j.shuffleWriteBytes += metrics.shuffleWriteMetrics.bytesWritten
+        j.inputRecords += metrics.inputMetrics.recordsRead
+        j.outputRecords += metrics.outputMetrics.recordsWritten
+      }
+  }
+}
+
+object ProfilingListener {
+  // local property tagging a job with the profile and call that started it, as "<profile>/<call>"
+  val callProperty = "hail.profile.call"
+
+  private var current: Option[(SparkContext, ProfilingListener)] = None
+
+  def get(sc: SparkContext): ProfilingListener = synchronized {
+    current match {
+      case Some((sc2, listener)) if sc2 eq sc => listener
+      case _ =>
+        val listener = new ProfilingListener(sc)
+        sc.addSparkListener(listener)
+        current = Some((sc, listener))
+        listener
+    }
+  }
+}
@@ -1,10 +1,13 @@
 package is.hail.utils
 
-import java.io.{InputStream, OutputStream}
+import java.io.{BufferedInputStream, BufferedOutputStream, InputStream, OutputStream}
 
 import is.hail.HailContext
+import is.hail.expr.Type
 import is.hail.keytable.KeyTable
 import is.hail.variant.{GenomeReference, Locus, VariantSampleMatrix}
+import org.json4s.{JArray, JNull, JString}
+import org.json4s.jackson.JsonMethods
 
 import scala.collection.JavaConverters._
 
@@ -59,18 +62,48 @@ trait Py4jUtils {
 
   def makeDouble(d: Double): Double = d
 
+  // Invokes each of the comma-separated zero-argument methods on target and returns the string
+  // forms of the results as a JSON array, so a batch of queries costs one py4j round trip. Types
+  // are sent in their compact pretty form, which marks a required type with a single "!" at every
+  // level, unlike toString.
+  def batchInvoke(target: AnyRef, methods: String): String = {
+    val cls = target.getClass
+    val results = methods.split(",").map { name =>
+      cls.getMethod(name).invoke(target) match {
+        case null => JNull
+        case t: Type => JString(t.toPrettyString(compact = true))
+        case r => JString(r.toString)
+      }
+    }
+    JsonMethods.compact(JArray(results.toList))
+  }
+
   def readFile(path: String, hc: HailContext): HadoopPyReader = hc.hadoopConf.readFile(path) { in =>
     new HadoopPyReader(hc.hadoopConf.unsafeReader(path))
   }
 
+  def readFile(path: String, hc: HailContext, bufferSize: Int): HadoopPyReader = hc.hadoopConf.readFile(path) { in =>
+    new HadoopPyReader(new BufferedInputStream(hc.hadoopConf.unsafeReader(path), bufferSize))
+  }
+
   def writeFile(path: String, hc: HailContext): HadoopPyWriter = {
     new HadoopPyWriter(hc.hadoopConf.unsafeWriter(path))
   }
 
+  def writeFile(path: String, hc: HailContext, bufferSize: Int): HadoopPyWriter = {
+    new HadoopPyWriter(new BufferedOutputStream(hc.hadoopConf.unsafeWriter(path), bufferSize))
+  }
+
   def copyFile(from: String, to: String, hc: HailContext) {
     hc.hadoopConf.copy(from, to)
   }
 
+  def copyTree(from: String, to: String, hc: HailContext, parallelism: Int, maxAttempts: Int, verify: Boolean) {
+    hc.hadoopConf.copyTree(from, to, parallelism, maxAttempts, verify)
+  }
+
+  def profilingListener(hc: HailContext): ProfilingListener = ProfilingListener.get(hc.sc)
+
   def addSocketAppender(hostname: String, port: Int) {
     val app = new StringSocketAppender(hostname, port, HailContext.logFormat)
     consoleLog.addAppender(app)
@@ -119,6 +152,23 @@ class HadoopPyReader(in: InputStream) {
       new String(b.slice(0, bytesRead), "ISO-8859-1")
   }
 
+  // Reads up to n bytes, returning fewer only at end of file. py4j transfers the result as a
+  // single binary blob, avoiding the string round trip of read.
+  def readBytes(n: Int): Array[Byte] = {
+    val b = new Array[Byte](n)
+    var off = 0
+    var bytesRead = 0
+    while (off < n && bytesRead >= 0) {
+      bytesRead = in.read(b, off, n - off)
+      if (bytesRead > 0)
+        off += bytesRead
+    }
+    if (off == n)
+      b
+    else
+      b.slice(0, off)
+  }
+
   def close() {
     in.close()
   }
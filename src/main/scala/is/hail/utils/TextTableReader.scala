@@ -12,9 +12,11 @@ import org.apache.spark.sql.Row
 
 object TextTableReader {
 
-  def splitLine(s: String, separator: String, quote: java.lang.Character): Array[String] = {
-    val p = Pattern.compile(separator)
-    val m = p.matcher(s)
+  def splitLine(s: String, separator: String, quote: java.lang.Character): Array[String] =
+    splitLine(s, Pattern.compile(separator), quote)
+
+  def splitLine(s: String, separator: Pattern, quote: java.lang.Character): Array[String] = {
+    val m = separator.matcher(s)
 
     def matchSep(i: Int): Int = {
       m.region(i, s.length)
@@ -76,54 +78,140 @@ object TextTableReader {
   val doubleRegex = """^[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?$"""
   val intRegex = """^-?\d+$"""
 
+  // hand-written scanners accepting exactly the strings matched by the regexes above
+
+  def isBoolean(s: String): Boolean =
+    s == "true" || s == "True" || s == "TRUE" || s == "false" || s == "False" || s == "FALSE"
+
+  private def isDigit(c: Char): Boolean = c >= '0' && c <= '9'
+
+  private def isBase(c: Char): Boolean = c == 'A' || c == 'T' || c == 'G' || c == 'C'
+
+  // true if s(start until end) is non-empty and every character satisfies p
+  private def allOf(s: String, start: Int, end: Int, p: Char => Boolean): Boolean = {
+    if (start >= end)
+      return false
+    var i = start
+    while (i < end) {
+      if (!p(s(i)))
+        return false
+      i += 1
+    }
+    true
+  }
+
+  def isInt32(s: String): Boolean =
+    allOf(s, if (s.nonEmpty && s(0) == '-') 1 else 0, s.length, isDigit)
+
+  def isFloat64(s: String): Boolean = {
+    val n = s.length
+    var i = 0
+    if (i < n && (s(i) == '-' || s(i) == '+'))
+      i += 1
+    val intStart = i
+    while (i < n && isDigit(s(i)))
+      i += 1
+    if (i < n && s(i) == '.') {
+      i += 1
+      val fracStart = i
+      while (i < n && isDigit(s(i)))
+        i += 1
+      if (i == fracStart)
+        return false
+    } else if (i == intStart)
+      return false
+
+    if (i < n && (s(i) == 'e' || s(i) == 'E')) {
+      i += 1
+      if (i < n && (s(i) == '-' || s(i) == '+'))
+        i += 1
+      allOf(s, i, n, isDigit)
+    } else
+      i == n
+  }
+
+  def isLocus(s: String): Boolean = {
+    val c = s.lastIndexOf(':')
+    c > 0 && allOf(s, c + 1, s.length, isDigit)
+  }
+
+  // positions, references and alternates contain no colons, so the contig is everything before the third last one
+  def isVariant(s: String): Boolean = {
+    val c3 = s.lastIndexOf(':')
+    val c2 = if (c3 > 0) s.lastIndexOf(':', c3 - 1) else -1
+    val c1 = if (c2 > 0) s.lastIndexOf(':', c2 - 1) else -1
+    if (c1 <= 0 || !allOf(s, c1 + 1, c2, isDigit) || !allOf(s, c2 + 1, c3, isBase))
+      return false
+
+    var start = c3 + 1
+    while (start <= s.length) {
+      var end = s.indexOf(',', start)
+      if (end < 0)
+        end = s.length
+      if (!(end == start + 1 && s(start) == '*') && !allOf(s, start, end, isBase))
+        return false
+      start = end + 1
+    }
+    true
+  }
+
+  /**
+    * Imputes the type of each field from the lines of `values'. If `sample' is defined, only the first
+    * `sample' lines of each partition are read, so imputation does not scan the whole table.
+    **/
   def imputeTypes(values: RDD[WithContext[String]], header: Array[String],
     delimiter: String, missing: String, quote: java.lang.Character,
-    gr: GenomeReference = GenomeReference.defaultReference): Array[Option[Type]] = {
+    gr: GenomeReference = GenomeReference.defaultReference, sample: Option[Int] = None): Array[Option[Type]] = {
     val nFields = header.length
-    val regexes = Array(booleanRegex, variantRegex, locusRegex, intRegex, doubleRegex).map(Pattern.compile)
-
-    val regexTypes: Array[Type] = Array(TBoolean(), TVariant(gr), TLocus(gr), TInt32(), TFloat64())
-    val nRegex = regexes.length
-
-    val imputation = values.treeAggregate(MultiArray2.fill[Boolean](nFields, nRegex + 1)(true))({ case (ma, line) =>
-      line.foreach { l =>
-        val split = splitLine(l, delimiter, quote)
-        if (split.length != nFields)
-          fatal(s"expected $nFields fields, but found ${ split.length }")
-
-        var i = 0
-        while (i < nFields) {
-          val field = split(i)
-          if (field != missing) {
-            var j = 0
-            while (j < nRegex) {
-              ma.update(i, j, ma(i, j) && regexes(j).matcher(field).matches())
-              j += 1
+    val scanners: Array[String => Boolean] = Array(isBoolean, isVariant, isLocus, isInt32, isFloat64)
+
+    val scannerTypes: Array[Type] = Array(TBoolean(), TVariant(gr), TLocus(gr), TInt32(), TFloat64())
+    val nScanners = scanners.length
+
+    val imputation = values.mapPartitions { it =>
+      val separator = Pattern.compile(delimiter)
+      val ma = MultiArray2.fill[Boolean](nFields, nScanners + 1)(true)
+      sample.map(it.take).getOrElse(it).foreach { line =>
+        line.foreach { l =>
+          val split = splitLine(l, separator, quote)
+          if (split.length != nFields)
+            fatal(s"expected $nFields fields, but found ${ split.length }")
+
+          var i = 0
+          while (i < nFields) {
+            val field = split(i)
+            if (field != missing) {
+              var j = 0
+              while (j < nScanners) {
+                if (ma(i, j))
+                  ma.update(i, j, scanners(j)(field))
+                j += 1
+              }
+              ma.update(i, nScanners, false)
             }
-            ma.update(i, nRegex, false)
+            i += 1
           }
-          i += 1
         }
       }
-      ma
-    }, { case (ma1, ma2) =>
+      Iterator(ma)
+    }.treeReduce({ case (ma1, ma2) =>
       var i = 0
       while (i < nFields) {
         var j = 0
-        while (j < nRegex) {
+        while (j < nScanners) {
           ma1.update(i, j, ma1(i, j) && ma2(i, j))
           j += 1
         }
-        ma1.update(i, nRegex, ma1(i, nRegex) && ma2(i, nRegex))
+        ma1.update(i, nScanners, ma1(i, nScanners) && ma2(i, nScanners))
         i += 1
       }
       ma1
     })
 
     imputation.rowIndices.map { i =>
-      someIf(!imputation(i, nRegex),
-        (0 until nRegex).find(imputation(i, _))
-          .map(regexTypes)
+      someIf(!imputation(i, nScanners),
+        (0 until nScanners).find(imputation(i, _))
+          .map(scannerTypes)
           .getOrElse(TString()))
     }.toArray
   }
@@ -137,8 +225,10 @@ object TextTableReader {
     impute: Boolean = false,
     nPartitions: Int = sc.defaultMinPartitions,
     quote: java.lang.Character = null,
-    gr: GenomeReference = GenomeReference.defaultReference): (TStruct, RDD[WithContext[Row]]) = {
+    gr: GenomeReference = GenomeReference.defaultReference,
+    imputeSample: Option[Int] = None): (TStruct, RDD[WithContext[Row]]) = {
     require(files.nonEmpty)
+    require(imputeSample.forall(_ > 0), "imputeSample must be positive")
 
     val firstFile = files.head
     val header = sc.hadoopConfiguration.readLines(firstFile) { lines =>
@@ -177,10 +267,13 @@ object TextTableReader {
 
     val namesAndTypes = {
       if (impute) {
-        info("Reading table to impute column types")
+        imputeSample match {
+          case Some(n) => info(s"Reading the first ${ plural(n, "line") } of each partition to impute column types")
+          case None => info("Reading table to impute column types")
+        }
 
         sb.append("Finished type imputation")
-        val imputedTypes = imputeTypes(rdd, columns, separator, missing, quote, gr)
+        val imputedTypes = imputeTypes(rdd, columns, separator, missing, quote, gr, imputeSample)
         columns.zip(imputedTypes).map { case (name, imputedType) =>
           types.get(name) match {
             case Some(t) =>
@@ -216,31 +309,43 @@ object TextTableReader {
 
     val schema = TStruct(namesAndTypes: _*)
 
-    val parsed = rdd
-      .map {
-        _.map { line =>
-          val a = new Array[Annotation](nField)
-
-          val split = splitLine(line, separator, quote)
-          if (split.length != nField)
-            fatal(s"expected $nField fields, but found ${ split.length } fields")
+    // types imputed from a sample can be contradicted by later lines
+    val sampledTypes = impute && imputeSample.isDefined
 
-          var i = 0
-          while (i < nField) {
-            val (name, t) = namesAndTypes(i)
-            val field = split(i)
-            try {
-              if (field == missing)
-                a(i) = null
-              else
-                a(i) = TableAnnotationImpex.importAnnotation(field, t)
-            } catch {
-              case e: Exception =>
-                fatal(s"""${ e.getClass.getName }: could not convert "$field" to $t in column "$name" """)
+    val parsed = rdd
+      .mapPartitions { it =>
+        val separatorPattern = Pattern.compile(separator)
+        it.map {
+          _.map { line =>
+            val a = new Array[Annotation](nField)
+
+            val split = splitLine(line, separatorPattern, quote)
+            if (split.length != nField)
+              fatal(s"expected $nField fields, but found ${ split.length } fields")
+
+            var i = 0
+            while (i < nField) {
+              val (name, t) = namesAndTypes(i)
+              val field = split(i)
+              try {
+                if (field == missing)
+                  a(i) = null
+                else
+                  a(i) = TableAnnotationImpex.importAnnotation(field, t)
+              } catch {
+                case e: Exception =>
+                  if (sampledTypes && !types.contains(name))
+                    fatal(
+                      s"""${ e.getClass.getName }: could not convert "$field" to $t in column "$name"
+                         |  The type of "$name" was imputed from the first ${ plural(imputeSample.get, "line") } of each partition.
+                         |  Specify its type or impute from more lines.""".stripMargin)
+                  else
+                    fatal(s"""${ e.getClass.getName }: could not convert "$field" to $t in column "$name" """)
+              }
+              i += 1
             }
-            i += 1
+            Row.fromSeq(a)
           }
-          Row.fromSeq(a)
         }
       }
 
@@ -1,18 +1,31 @@
 package is.hail.utils.richUtils
 
 import java.io._
+import java.nio.ByteBuffer
+import java.util.concurrent.{Callable, Executors, Future}
 
 import com.esotericsoftware.kryo.io.{Input, Output}
 import is.hail.io.compress.BGzipCodec
 import is.hail.utils._
 import net.jpountz.lz4.{LZ4BlockOutputStream, LZ4Compressor}
 import org.apache.hadoop
-import org.apache.hadoop.fs.FileStatus
+import org.apache.hadoop.fs.{FileStatus, LocalFileSystem}
+import org.apache.hadoop.hdfs.DistributedFileSystem
 import org.apache.hadoop.io.IOUtils._
 import org.apache.hadoop.io.compress.CompressionCodecFactory
+import org.apache.spark.TaskContext
 
 import scala.io.Source
 
+object RichHadoopConfiguration {
+  // driver threads used to merge part files into a single output
+  val defaultMergeParallelism: Int = 16
+
+  // the path the running task attempt writes `path' to before committing it with commitTaskFile
+  def taskAttemptPath(path: String): String =
+    path + ".attempt-" + TaskContext.get().taskAttemptId()
+}
+
 class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyVal {
 
   def fileSystem(filename: String): hadoop.fs.FileSystem =
@@ -82,6 +95,40 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
     fileSystem(filename).delete(new hadoop.fs.Path(filename), recursive)
   }
 
+  /**
+    * Renames src to dst, replacing dst if it exists. The replacement is atomic where the file system
+    * supports it, as HDFS does; file systems without a FileContext implementation delete dst first.
+    **/
+  def renameOverwrite(src: String, dst: String) {
+    val srcPath = new hadoop.fs.Path(src)
+    val dstPath = new hadoop.fs.Path(dst)
+    try {
+      hadoop.fs.FileContext.getFileContext(dstPath.toUri, hConf)
+        .rename(srcPath, dstPath, hadoop.fs.Options.Rename.OVERWRITE)
+    } catch {
+      case _: hadoop.fs.UnsupportedFileSystemException =>
+        val fs = fileSystem(dst)
+        fs.delete(dstPath, false)
+        if (!fs.rename(srcPath, dstPath))
+          fatal(s"failed to rename `$src' to `$dst'")
+    }
+  }
+
+  /**
+    * Commits the file `attemptPath' that a task attempt wrote completely to `path' by renaming it, so
+    * `path' only ever holds a complete file. Attempts of a task write the same contents; if another
+    * attempt committed first, its file is kept and this one is deleted.
+    **/
+  def commitTaskFile(attemptPath: String, path: String) {
+    val fs = fileSystem(path)
+    val dstPath = new hadoop.fs.Path(path)
+    if (!fs.rename(new hadoop.fs.Path(attemptPath), dstPath)) {
+      if (!fs.exists(dstPath))
+        fatal(s"failed to commit `$attemptPath' to `$path'")
+      fs.delete(new hadoop.fs.Path(attemptPath), false)
+    }
+  }
+
   def getTemporaryFile(tmpdir: String, nChar: Int = 10,
     prefix: Option[String] = None, suffix: Option[String] = None): String = {
 
@@ -131,7 +178,89 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
       false, hConf)
   }
 
-  def copyMerge(sourceFolder: String, destinationFile: String, numPartFilesExpected: Int, deleteSource: Boolean = true, hasHeader: Boolean = true) {
+  /**
+    * Copies every file under src to the same relative path under dst, using a pool of
+    * parallelism driver threads. Each file copy is attempted up to maxAttempts times. If
+    * verify is true, the copy must match the source in length and, where both file systems
+    * report checksums with the same algorithm, in checksum.
+    **/
+  def copyTree(src: String, dst: String, parallelism: Int, maxAttempts: Int = 3, verify: Boolean = true) {
+    require(parallelism > 0 && maxAttempts > 0)
+
+    val srcFS = fileSystem(src)
+    val srcRoot = srcFS.makeQualified(new hadoop.fs.Path(src))
+    val srcRootString = srcRoot.toString
+
+    val files = new ArrayBuilder[FileStatus]()
+    val it = srcFS.listFiles(srcRoot, true)
+    while (it.hasNext)
+      files += it.next()
+
+    val jobs = files.result().map { status =>
+      val from = status.getPath.toString
+      val relative = from.stripPrefix(srcRootString)
+      val to = if (relative.isEmpty) dst else dst + "/" + relative.stripPrefix("/")
+      (from, to)
+    }
+
+    val (_, dt) = time {
+      val pool = Executors.newFixedThreadPool(math.min(parallelism, math.max(jobs.length, 1)))
+      try {
+        val futures: Array[Future[Unit]] = jobs.map { case (from, to) =>
+          pool.submit(new Callable[Unit] {
+            def call(): Unit = copyWithRetries(from, to, maxAttempts, verify)
+          })
+        }
+        futures.foreach(_.get())
+      } finally {
+        pool.shutdownNow()
+      }
+    }
+
+    info(s"copied ${ jobs.length } ${ plural(jobs.length, "file") } from $src to $dst in ${ formatTime(dt) }")
+  }
+
+  private def copyWithRetries(src: String, dst: String, maxAttempts: Int, verify: Boolean) {
+    var attempt = 1
+    var done = false
+    while (!done) {
+      try {
+        hadoop.fs.FileUtil.copy(
+          fileSystem(src), new hadoop.fs.Path(src),
+          fileSystem(dst), new hadoop.fs.Path(dst),
+          false, true, hConf)
+        if (verify)
+          verifyCopy(src, dst)
+        done = true
+      } catch {
+        case e: Exception if attempt < maxAttempts =>
+          warn(s"copy of $src to $dst failed on attempt $attempt of $maxAttempts, retrying: ${ e.getMessage }")
+          attempt += 1
+      }
+    }
+  }
+
+  private def verifyCopy(src: String, dst: String) {
+    val srcPath = new hadoop.fs.Path(src)
+    val dstPath = new hadoop.fs.Path(dst)
+    val srcFS = fileSystem(src)
+    val dstFS = fileSystem(dst)
+
+    val srcLen = srcFS.getFileStatus(srcPath).getLen
+    val dstLen = dstFS.getFileStatus(dstPath).getLen
+    if (srcLen != dstLen)
+      fatal(s"copy of $src to $dst is corrupt: expected $srcLen bytes, found $dstLen")
+
+    val srcChecksum = srcFS.getFileChecksum(srcPath)
+    val dstChecksum = dstFS.getFileChecksum(dstPath)
+    if (srcChecksum != null && dstChecksum != null
+      && srcChecksum.getAlgorithmName == dstChecksum.getAlgorithmName
+      && srcChecksum != dstChecksum)
+      fatal(s"copy of $src to $dst is corrupt: checksum mismatch")
+  }
+
+  def copyMerge(sourceFolder: String, destinationFile: String, numPartFilesExpected: Int, deleteSource: Boolean = true,
+    hasHeader: Boolean = true, parallelism: Int = 1) {
     if (!exists(sourceFolder + "/_SUCCESS"))
       fatal("write failed: no success indicator found")
 
@@ -152,7 +281,7 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
     val filesToMerge = headerFileStatus ++ partFileStatuses
 
     val (_, dt) = time {
-      copyMergeList(filesToMerge, destinationFile, deleteSource)
+      copyMergeList(filesToMerge, destinationFile, deleteSource, parallelism)
     }
 
     info(s"while writing:\n    $destinationFile\n  merge time: ${ formatTime(dt) }")
@@ -164,7 +293,36 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
     }
   }
 
-  private def copyMergeList(srcFileStatuses: Array[FileStatus], destFilename: String, deleteSource: Boolean = true) {
+  /**
+    * Concatenates srcFiles, in order, into destFilename and returns the offset of each source in it.
+    * See copyMergeList for the use of parallelism. Unlike copyMerge, sources that are deleted afterwards
+    * may be concatenated with HDFS concat, since the returned offsets account for the BGZF terminating
+    * blocks it keeps.
+    **/
+  def concatenateFiles(srcFiles: Array[String], destFilename: String, parallelism: Int = 1,
+    deleteSource: Boolean = true): Array[Long] = {
+    delete(destFilename, recursive = true) // overwriting by default
+
+    val (offsets, dt) = time {
+      copyMergeList(srcFiles.map(fileStatus), destFilename, deleteSource, parallelism, allowConcat = true)
+    }
+
+    info(s"while writing:\n    $destFilename\n  merge time: ${ formatTime(dt) }")
+
+    offsets
+  }
+
+  /**
+    * Returns the offset of each source in the destination. If allowConcat is set, sources on HDFS that
+    * are deleted afterwards are concatenated with HDFS concat, which moves blocks rather than bytes;
+    * BGZF parts then keep their terminating empty blocks. If the destination is on the local file system
+    * and parallelism is greater than one, each source is copied to its offset by a pool of parallelism
+    * threads. Otherwise the sources are copied one after another.
+    **/
+  private def copyMergeList(srcFileStatuses: Array[FileStatus], destFilename: String, deleteSource: Boolean = true,
+    parallelism: Int = 1, allowConcat: Boolean = false): Array[Long] = {
+    require(parallelism > 0)
+
     val destPath = new hadoop.fs.Path(destFilename)
     val destFS = fileSystem(destFilename)
 
@@ -176,29 +334,53 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
       fileStatus => fileStatus.getPath != destPath && fileStatus.isFile
     })
 
-    val outputStream = destFS.create(destPath)
+    val srcPaths = srcFileStatuses.map(_.getPath)
+
+    val concatenated = destFS match {
+      case dfs: DistributedFileSystem if allowConcat && deleteSource && srcFileStatuses.length > 1
+        && srcFileStatuses.forall(_.getLen > 0)
+        && srcPaths.forall(p => fileSystem(p.toString).getUri == dfs.getUri) =>
+        hdfsConcat(dfs, srcPaths, destPath)
+      case _ => false
+    }
+
+    if (concatenated)
+      return srcFileStatuses.map(_.getLen).scanLeft(0L)(_ + _).init
+
+    // drop the empty terminating block of every BGZF part but the last
+    val lengths = Array.tabulate(srcFileStatuses.length) { i =>
+      val lenAdjust: Long = if (isBGzip && i < srcFileStatuses.length - 1)
+        -28
+      else
+        0
+      srcFileStatuses(i).getLen + lenAdjust
+    }
+    val offsets = lengths.scanLeft(0L)(_ + _)
+
+    destFS match {
+      case localFS: LocalFileSystem if parallelism > 1 && srcFileStatuses.length > 1 =>
+        positionalMerge(srcPaths, lengths, offsets, localFS.pathToFile(destPath), parallelism)
+
+      case _ =>
+        val outputStream = destFS.create(destPath)
 
-    try {
-      var i = 0
-      while (i < srcFileStatuses.length) {
-        val fileStatus = srcFileStatuses(i)
-        val lenAdjust: Long = if (isBGzip && i < srcFileStatuses.length - 1)
-          -28
-        else
-          0
-        val srcFS = fileSystem(fileStatus.getPath.toString)
-        val inputStream = srcFS.open(fileStatus.getPath)
         try {
-          copyBytes(inputStream, outputStream,
-            fileStatus.getLen + lenAdjust,
-            false)
+          var i = 0
+          while (i < srcPaths.length) {
+            val srcFS = fileSystem(srcPaths(i).toString)
+            val inputStream = srcFS.open(srcPaths(i))
+            try {
+              copyBytes(inputStream, outputStream,
+                lengths(i),
+                false)
+            } finally {
+              inputStream.close()
+            }
+            i += 1
+          }
         } finally {
-          inputStream.close()
+          outputStream.close()
         }
-        i += 1
-      }
-    } finally {
-      outputStream.close()
     }
 
     if (deleteSource) {
@@ -206,6 +388,80 @@ class RichHadoopConfiguration(val hConf: hadoop.conf.Configuration) extends AnyV
         fileStatus => delete(fileStatus.getPath.toString, recursive = true)
       }
     }
+
+    offsets.init
+  }
+
+  // moves the sources next to destPath, the first onto it, and concatenates them; false, with the sources restored, if HDFS refuses
+  private def hdfsConcat(dfs: DistributedFileSystem, srcPaths: Array[hadoop.fs.Path], destPath: hadoop.fs.Path): Boolean = {
+    val moved = Array.tabulate(srcPaths.length) { i =>
+      if (i == 0)
+        destPath
+      else
+        new hadoop.fs.Path(destPath.getParent, "." + destPath.getName + ".part-" + i)
+    }
+
+    var nMoved = 0
+    try {
+      while (nMoved < srcPaths.length) {
+        if (!dfs.rename(srcPaths(nMoved), moved(nMoved)))
+          throw new IOException(s"could not move ${ srcPaths(nMoved) } to ${ moved(nMoved) }")
+        nMoved += 1
+      }
+      dfs.concat(destPath, moved.tail)
+      true
+    } catch {
+      case e: Exception =>
+        warn(s"HDFS concat into $destPath failed, copying instead: ${ e.getMessage }")
+        var i = 0
+        while (i < nMoved) {
+          dfs.rename(moved(i), srcPaths(i))
+          i += 1
+        }
+        false
+    }
+  }
+
+  private def positionalMerge(srcPaths: Array[hadoop.fs.Path], lengths: Array[Long], offsets: Array[Long],
+    dest: File, parallelism: Int) {
+    Option(dest.getParentFile).foreach(_.mkdirs())
+    val raf = new RandomAccessFile(dest, "rw")
+    try {
+      raf.setLength(offsets.last)
+      val channel = raf.getChannel
+
+      val pool = Executors.newFixedThreadPool(math.min(parallelism, srcPaths.length))
+      try {
+        val futures: Array[Future[Unit]] = Array.tabulate(srcPaths.length) { i =>
+          pool.submit(new Callable[Unit] {
+            def call() {
+              val path = srcPaths(i)
+              val inputStream = fileSystem(path.toString).open(path)
+              try {
+                val buf = new Array[Byte](1 << 20)
+                var pos = offsets(i)
+                val end = offsets(i + 1)
+                while (pos < end) {
+                  val n = inputStream.read(buf, 0, math.min(buf.length.toLong, end - pos).toInt)
+                  if (n < 0)
+                    fatal(s"$path: expected ${ lengths(i) } bytes, found ${ pos - offsets(i) }")
+                  val bb = ByteBuffer.wrap(buf, 0, n)
+                  while (bb.hasRemaining)
+                    pos += channel.write(bb, pos)
+                }
+              } finally {
+                inputStream.close()
+              }
+            }
+          })
+        }
+        futures.foreach(_.get())
+      } finally {
+        pool.shutdownNow()
+      }
+    } finally {
+      raf.close()
+    }
   }
 
   def stripCodec(s: String): String = {
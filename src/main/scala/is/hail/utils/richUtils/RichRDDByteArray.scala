@@ -43,7 +43,8 @@ class RichRDDByteArray(val r: RDD[Array[Byte]]) extends AnyVal {
       fatal("write failed: no success indicator found")
 
     if (!parallelWrite) {
-      hConf.copyMerge(parallelOutputPath, filename, rWithHeader.getNumPartitions, deleteTmpFiles, hasHeader = false)
+      hConf.copyMerge(parallelOutputPath, filename, rWithHeader.getNumPartitions, deleteTmpFiles, hasHeader = false,
+        parallelism = RichHadoopConfiguration.defaultMergeParallelism)
     }
 
   }
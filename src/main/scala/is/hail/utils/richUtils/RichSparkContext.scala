@@ -1,5 +1,6 @@
 package is.hail.utils.richUtils
 
+import is.hail.io.compress.BGzipLinesRDD
 import is.hail.utils._
 import org.apache.spark.SparkContext
 import org.apache.spark.rdd.RDD
@@ -26,6 +27,11 @@ class RichSparkContext(val sc: SparkContext) extends AnyVal {
       }
   }
 
+  // like textFilesLines, but splits BGZF files on block boundaries and inflates blocks ahead of the reader
+  def bgzipFilesLines(files: Array[String],
+    nPartitions: Int = sc.defaultMinPartitions): RDD[WithContext[String]] =
+    new BGzipLinesRDD(sc, files, nPartitions)
+
   def textFileLines(file: String, nPartitions: Int = sc.defaultMinPartitions): RDD[WithContext[String]] =
     sc.textFile(file, nPartitions)
       .map(l => WithContext(l, Context(l, file, None)))
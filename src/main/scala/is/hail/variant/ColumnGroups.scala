@@ -0,0 +1,256 @@
+package is.hail.variant
+
+import is.hail.HailContext
+import is.hail.annotations._
+import is.hail.expr._
+import is.hail.rvd.{OrderedRVD, OrderedRVPartitioner}
+import is.hail.utils._
+import org.apache.commons.lang3.StringUtils
+import org.apache.hadoop
+import org.apache.spark.rdd.RDD
+import org.json4s._
+import org.json4s.jackson.JsonMethods
+import org.json4s.jackson.Serialization
+
+case class ColumnGroupMetadata(
+  version: Int,
+  sample_annotations: JValue,
+  n_partitions: Int)
+
+case class ColumnGroup(name: String, sampleIds: IndexedSeq[Annotation], sampleAnnotations: IndexedSeq[Annotation]) {
+  def nSamples: Int = sampleIds.length
+}
+
+/**
+  * Samples appended to a VDS after it was written. Each group holds the genotypes of its samples for
+  * the variants of the VDS in `columns/<name>', partitioned like the VDS itself, so reading stitches
+  * part i of every group onto part i of the VDS without a shuffle. The groups are listed, in order, in
+  * `column_groups.json.gz'.
+  **/
+object ColumnGroups {
+  def manifestPath(dirname: String): String = dirname + "/column_groups.json.gz"
+
+  def groupPath(dirname: String, name: String): String = dirname + "/columns/" + name
+
+  def rowType(typ: MatrixType): TStruct =
+    TStruct("v" -> typ.vType, "gs" -> !TArray(typ.genotypeType))
+
+  def names(hConf: hadoop.conf.Configuration, dirname: String): Array[String] = {
+    val path = manifestPath(dirname)
+    if (hConf.exists(path))
+      hConf.readFile(path)(in => JsonMethods.parse(in).extract[List[String]].toArray)
+    else
+      Array.empty[String]
+  }
+
+  def read(hConf: hadoop.conf.Configuration, dirname: String,
+    sSignature: Type, saSignature: Type, nPartitions: Int): Array[ColumnGroup] = {
+    names(hConf, dirname).map { name =>
+      val metadataFile = groupPath(dirname, name) + "/metadata.json.gz"
+      val metadata = hConf.readFile(metadataFile) { in =>
+        try {
+          JsonMethods.parse(in).extract[ColumnGroupMetadata]
+        } catch {
+          case e: Exception => fatal(
+            s"""corrupt VDS: invalid metadata for column group `$name'
+               |  Detailed exception:
+               |  ${ e.getMessage }""".stripMargin)
+        }
+      }
+
+      if (metadata.version != VariantSampleMatrix.fileVersion || metadata.n_partitions != nPartitions)
+        fatal(s"corrupt VDS: column group `$name' does not match the VDS it was appended to")
+
+      val (ids, annotations) = metadata.sample_annotations.asInstanceOf[JArray]
+        .arr
+        .map {
+          case JObject(List(("id", id), ("annotation", jv))) =>
+            (JSONAnnotationImpex.importAnnotation(id, sSignature, "sample_annotations.id"),
+              JSONAnnotationImpex.importAnnotation(jv, saSignature, "sample_annotations.annotation"))
+          case other => fatal(
+            s"""corrupt VDS: invalid metadata for column group `$name'
+               |  Invalid sample annotation metadata""".stripMargin)
+        }
+        .toArray
+        .unzip
+
+      ColumnGroup(name, ids, annotations)
+    }
+  }
+
+  /**
+    * Writes the samples of `vsm' as a new column group of the VDS at `dirname'. Variants of `vsm' not
+    * in the VDS are dropped on read; genotypes of the new samples at variants missing from `vsm' are
+    * missing.
+    **/
+  def append(vsm: VariantSampleMatrix, dirname: String) {
+    val hc = vsm.hc
+    val hConf = hc.hadoopConf
+
+    val (fileMetadata, nPartitions) = VariantSampleMatrix.readFileMetadata(hConf, dirname)
+    val base = fileMetadata.metadata
+
+    if (base.sSignature != vsm.sSignature || base.saSignature != vsm.saSignature
+      || base.vSignature != vsm.vSignature || base.genotypeSignature != vsm.genotypeSignature)
+      fatal(
+        s"""cannot append samples to `$dirname': schemas differ
+           |  VDS:      s: ${ base.sSignature.toPrettyString(compact = true) }, sa: ${ base.saSignature.toPrettyString(compact = true) }, v: ${ base.vSignature.toPrettyString(compact = true) }, g: ${ base.genotypeSignature.toPrettyString(compact = true) }
+           |  appended: s: ${ vsm.sSignature.toPrettyString(compact = true) }, sa: ${ vsm.saSignature.toPrettyString(compact = true) }, v: ${ vsm.vSignature.toPrettyString(compact = true) }, g: ${ vsm.genotypeSignature.toPrettyString(compact = true) }""".stripMargin)
+
+    if (base.wasSplit != vsm.wasSplit)
+      fatal(
+        s"""cannot append samples to `$dirname': split status differs
+           |  VDS was split:      ${ base.wasSplit }
+           |  appended was split: ${ vsm.wasSplit }""".stripMargin)
+
+    if (vsm.genotypeSignature.required)
+      fatal(s"cannot append samples to `$dirname': genotype schema `${ vsm.genotypeSignature.toPrettyString(compact = true) }' is required")
+
+    val existing = fileMetadata.localValue.sampleIds.toSet
+    val duplicates = vsm.sampleIds.filter(existing.contains)
+    if (duplicates.nonEmpty)
+      fatal(
+        s"""cannot append samples to `$dirname': ${ plural(duplicates.length, "sample is", "samples are") } already present
+           |  ${ duplicates.take(10).mkString("\n  ") }""".stripMargin)
+
+    val groups = names(hConf, dirname)
+    val name = "group-" + StringUtils.leftPad(groups.length.toString, 4, "0")
+    val path = groupPath(dirname, name)
+    // left by an append that failed before updating the manifest
+    if (hConf.exists(path))
+      hConf.delete(path, recursive = true)
+
+    val typ = vsm.matrixType
+    val partitioner = OrderedRVPartitioner(hc.sc,
+      hConf.readFile(dirname + "/partitioner.json.gz")(JsonMethods.parse(_)))
+    val shuffled = OrderedRVD.shuffle(typ.orderedRVType, partitioner, vsm.rdd2.rdd)
+    assert(shuffled.partitions.length == nPartitions)
+
+    val localRowType = typ.rowType
+    val groupRowType = rowType(typ)
+    val groupRows = shuffled.rdd.mapPartitions { it =>
+      val rvb = new RegionValueBuilder()
+      val rv2 = RegionValue()
+
+      it.map { rv =>
+        rvb.set(rv.region)
+        rvb.start(groupRowType)
+        rvb.startStruct()
+        rvb.addField(localRowType, rv, 1) // v
+        rvb.addField(localRowType, rv, 3) // gs
+        rvb.endStruct()
+        rv2.set(rv.region, rvb.end())
+        rv2
+      }
+    }
+
+    groupRows.writeRows(path, groupRowType)
+
+    val sampleAnnotationsJ = JArray(
+      vsm.sampleIdsAndAnnotations
+        .map { case (id, annotation) =>
+          JObject(List(("id", JSONAnnotationImpex.exportAnnotation(id, vsm.sSignature)),
+            ("annotation", JSONAnnotationImpex.exportAnnotation(annotation, vsm.saSignature))))
+        }
+        .toList)
+    hConf.writeTextFile(path + "/metadata.json.gz")(out =>
+      Serialization.write(ColumnGroupMetadata(VariantSampleMatrix.fileVersion, sampleAnnotationsJ, nPartitions), out))
+
+    // the group is only visible once it is in the manifest, which is replaced by renaming a complete
+    // new manifest over it, so a failed append leaves the old one in place
+    val tmpManifest = dirname + "/.column_groups." + scala.util.Random.alphanumeric.take(10).mkString + ".json.gz"
+    hConf.writeTextFile(tmpManifest)(out =>
+      Serialization.write((groups :+ name).toList, out))
+    hConf.renameOverwrite(tmpManifest, manifestPath(dirname))
+
+    info(s"appended ${ plural(vsm.nSamples, "sample") } to `$dirname' as column group `$name'")
+  }
+
+  /**
+    * Rows of the VDS at `path' with the genotypes of each column group appended to `gs'. `typ' is
+    * the type of the VDS with all groups, `nBaseSamples' the number of samples written with it.
+    **/
+  def stitch(hc: HailContext, path: String, typ: MatrixType, nPartitions: Int,
+    nBaseSamples: Int, groups: Array[ColumnGroup]): RDD[RegionValue] = {
+    val localRowType = typ.rowType
+    val groupRowType = rowType(typ)
+    val gsType = localRowType.fieldType(3).asInstanceOf[TArray]
+    val vOrd = typ.vType.unsafeOrdering(missingGreatest = true)
+
+    val groupPaths = groups.map(g => groupPath(path, g.name))
+    val groupSizes = groups.map(_.nSamples)
+    val nSamples = nBaseSamples + groupSizes.sum
+    val d = digitsNeeded(nPartitions)
+
+    val sHadoopConfBc = hc.sc.broadcast(new SerializableHadoopConfiguration(hc.hadoopConf))
+
+    hc.readPartitions[RegionValue](path, nPartitions, { (i, in) =>
+      val partFile = "/parts/part-" + StringUtils.leftPad(i.toString, d, "0")
+      val groupIns = groupPaths.map(gp => sHadoopConfBc.value.value.unsafeReader(gp + partFile))
+      val groupIts = groupIns.map(HailContext.readRowsPartition(groupRowType)(i, _).buffered)
+
+      // group rows past the last row of the VDS are never read, so close their streams here
+      val base = HailContext.readRowsPartition(localRowType)(i, in)
+      val it = new Iterator[RegionValue] {
+        def hasNext: Boolean = {
+          val r = base.hasNext
+          if (!r)
+            groupIns.foreach(_.close())
+          r
+        }
+
+        def next(): RegionValue = base.next()
+      }
+
+      val rvb = new RegionValueBuilder()
+      val rv2 = RegionValue()
+
+      it.map { rv =>
+        val vOff = localRowType.loadField(rv, 1)
+
+        rvb.set(rv.region)
+        rvb.start(localRowType)
+        rvb.startStruct()
+        rvb.addField(localRowType, rv, 0) // pk
+        rvb.addField(localRowType, rv, 1) // v
+        rvb.addField(localRowType, rv, 2) // va
+
+        rvb.startArray(nSamples)
+        val gsOff = localRowType.loadField(rv, 3)
+        var j = 0
+        while (j < nBaseSamples) {
+          rvb.addElement(gsType, rv.region, gsOff, j)
+          j += 1
+        }
+
+        var k = 0
+        while (k < groupIts.length) {
+          val git = groupIts(k)
+          while (git.hasNext && vOrd.compare(git.head.region, groupRowType.loadField(git.head, 0), rv.region, vOff) < 0)
+            git.next()
+
+          j = 0
+          if (git.hasNext && vOrd.compare(git.head.region, groupRowType.loadField(git.head, 0), rv.region, vOff) == 0) {
+            val grv = git.head
+            val ggsOff = groupRowType.loadField(grv, 1)
+            while (j < groupSizes(k)) {
+              rvb.addElement(gsType, grv.region, ggsOff, j)
+              j += 1
+            }
+          } else {
+            while (j < groupSizes(k)) {
+              rvb.setMissing()
+              j += 1
+            }
+          }
+          k += 1
+        }
+        rvb.endArray()
+
+        rvb.endStruct()
+        rv2.set(rv.region, rvb.end())
+        rv2
+      }
+    })
+  }
+}
@@ -0,0 +1,268 @@
+package is.hail.variant
+
+import is.hail.annotations._
+import is.hail.expr.TStruct
+import is.hail.utils._
+import org.apache.spark.sql.Row
+
+import scala.collection.mutable
+
+/**
+  * Half-open intervals [start, end) of positions on one contig, sorted by start and then end, as an
+  * implicit interval tree: node i of the sorted arrays has level k, the number of trailing ones of i,
+  * and children i - 2^(k-1) and i + 2^(k-1); maxEnds(i) is the greatest end in the subtree of i.
+  * A query only descends into subtrees that can contain the position, so it takes O(log n + m)
+  * for m hits. `values' holds the offset of the value of each interval in a region, if any.
+  **/
+class ContigIntervals(val starts: Array[Int], val ends: Array[Int], val values: Array[Long]) extends Serializable {
+  val n: Int = starts.length
+
+  val maxEnds: Array[Int] = new Array[Int](n)
+
+  // level of the root
+  val maxLevel: Int = {
+    var lastI = 0
+    var last = 0
+    var i = 0
+    while (i < n) {
+      lastI = i
+      maxEnds(i) = ends(i)
+      last = ends(i)
+      i += 2
+    }
+
+    var k = 1
+    while ((1L << k) <= n) {
+      val x = 1 << (k - 1)
+      i = (x << 1) - 1
+      while (i < n) {
+        val el = maxEnds(i - x)
+        // the right child is past the end of the array; `last' is the greatest end in the part that exists
+        val er = if (i + x < n) maxEnds(i + x) else last
+        maxEnds(i) = math.max(ends(i), math.max(el, er))
+        i += x << 2
+      }
+      lastI = if (((lastI >> k) & 1) == 1) lastI - x else lastI + x
+      if (lastI < n && maxEnds(lastI) > last)
+        last = maxEnds(lastI)
+      k += 1
+    }
+    k - 1
+  }
+
+  // appends to `ab' the indices of the intervals containing `pos', in order; stops at the first if `first'
+  def query(pos: Int, ab: ArrayBuilder[Int], first: Boolean) {
+    if (n == 0)
+      return
+
+    // stack of (node, level, whether its left subtree is done)
+    val nodes = new Array[Int](2 * 32)
+    val levels = new Array[Int](2 * 32)
+    val leftDone = new Array[Boolean](2 * 32)
+    nodes(0) = (1 << maxLevel) - 1
+    levels(0) = maxLevel
+    leftDone(0) = false
+    var top = 1
+
+    while (top > 0) {
+      top -= 1
+      val x = nodes(top)
+      val k = levels(top)
+
+      if (k <= 3) {
+        // small subtrees are scanned
+        val i0 = (x >> k) << k
+        val i1 = math.min(n, i0 + (1 << (k + 1)) - 1)
+        var i = i0
+        while (i < i1 && starts(i) <= pos) {
+          if (pos < ends(i)) {
+            ab += i
+            if (first)
+              return
+          }
+          i += 1
+        }
+      } else if (!leftDone(top)) {
+        leftDone(top) = true
+        top += 1
+        val y = x - (1 << (k - 1))
+        if (y >= n || maxEnds(y) > pos) {
+          nodes(top) = y
+          levels(top) = k - 1
+          leftDone(top) = false
+          top += 1
+        }
+      } else if (x < n && starts(x) <= pos) {
+        if (pos < ends(x)) {
+          ab += x
+          if (first)
+            return
+        }
+        nodes(top) = x + (1 << (k - 1))
+        levels(top) = k - 1
+        leftDone(top) = false
+        top += 1
+      }
+    }
+  }
+
+  def contains(pos: Int): Boolean = {
+    val ab = new ArrayBuilder[Int](1)
+    query(pos, ab, first = true)
+    ab.length > 0
+  }
+}
+
+object ContigIntervals {
+  // sorts the intervals [starts(i), ends(i)) by start, then end, then position in the input
+  def apply(starts: Array[Int], ends: Array[Int], values: Array[Long]): ContigIntervals = {
+    val n = starts.length
+
+    // the index in the low bits keeps equal keys in input order
+    val keys = Array.tabulate(n)(i => (starts(i).toLong << 32) | i)
+    java.util.Arrays.sort(keys)
+    val order = keys.map(_.toInt)
+
+    var i = 0
+    while (i < n) {
+      var j = i + 1
+      while (j < n && starts(order(j)) == starts(order(i)))
+        j += 1
+      if (j - i > 1) {
+        val run = Array.tabulate(j - i)(r => (ends(order(i + r)).toLong << 32) | order(i + r))
+        java.util.Arrays.sort(run)
+        var r = 0
+        while (r < run.length) {
+          order(i + r) = run(r).toInt
+          r += 1
+        }
+      }
+      i = j
+    }
+
+    new ContigIntervals(order.map(starts), order.map(ends), if (values == null) null else order.map(values))
+  }
+}
+
+/**
+  * Locus intervals, split by contig into compact sorted interval indices, with an optional value of
+  * type `valueSignature' per interval stored in `region'. Queries return intervals in the order of
+  * their start and end.
+  **/
+class LocusIntervalIndex(val contigs: Map[String, ContigIntervals], valueSignature: TStruct,
+  region: MemoryBuffer) extends Serializable {
+  def nIntervals: Int = contigs.values.map(_.n).sum
+
+  def contains(l: Locus): Boolean = contigs.get(l.contig) match {
+    case Some(ci) => ci.contains(l.position)
+    case None => false
+  }
+
+  // values of the intervals containing `l'
+  def queryValues(l: Locus): IndexedSeq[Row] = contigs.get(l.contig) match {
+    case Some(ci) =>
+      val ab = new ArrayBuilder[Int]()
+      ci.query(l.position, ab, first = false)
+      ab.result().map(i => new UnsafeRow(valueSignature, region, ci.values(i)): Row)
+    case None => IndexedSeq.empty
+  }
+
+  // value of the first interval containing `l', or null if there is none
+  def queryFirst(l: Locus): Row = contigs.get(l.contig) match {
+    case Some(ci) =>
+      val ab = new ArrayBuilder[Int](1)
+      ci.query(l.position, ab, first = true)
+      if (ab.length > 0) new UnsafeRow(valueSignature, region, ci.values(ab(0))) else null
+    case None => null
+  }
+}
+
+object LocusIntervalIndex {
+  // the pieces (contig, start, end) of `i' on the contigs it spans; an interval across contigs
+  // covers the whole of each reference contig in between
+  def split(gr: GenomeReference, i: Interval[Locus]): Iterator[(String, Int, Int)] = {
+    val start = i.start
+    val end = i.end
+    if (start.contig == end.contig)
+      Iterator.single((start.contig, start.position, end.position))
+    else
+      Iterator.single((start.contig, start.position, Int.MaxValue)) ++
+        gr.contigs.iterator
+          .filter(c => gr.compare(start.contig, c) < 0 && gr.compare(c, end.contig) < 0)
+          .map(c => (c, Int.MinValue, Int.MaxValue)) ++
+        Iterator.single((end.contig, Int.MinValue, end.position))
+  }
+
+  def apply(gr: GenomeReference, intervals: Array[Interval[Locus]]): LocusIntervalIndex =
+    build(gr, intervals.iterator.map(i => (i, null)), null)
+
+  def apply(gr: GenomeReference, intervals: Array[(Interval[Locus], Row)], valueSignature: TStruct): LocusIntervalIndex =
+    build(gr, intervals.iterator, valueSignature)
+
+  private def build(gr: GenomeReference, intervals: Iterator[(Interval[Locus], Row)],
+    valueSignature: TStruct): LocusIntervalIndex = {
+    val region = if (valueSignature != null) MemoryBuffer() else null
+    val rvb = if (valueSignature != null) new RegionValueBuilder(region) else null
+
+    val builders = mutable.Map.empty[String, (ArrayBuilder[Int], ArrayBuilder[Int], ArrayBuilder[Long])]
+    intervals.foreach { case (interval, v) =>
+      val off =
+        if (valueSignature != null) {
+          rvb.start(valueSignature)
+          rvb.addAnnotation(valueSignature, v)
+          rvb.end()
+        } else
+          0L
+
+      split(gr, interval).foreach { case (contig, start, end) =>
+        val (starts, ends, values) = builders.getOrElseUpdate(contig,
+          (new ArrayBuilder[Int](), new ArrayBuilder[Int](), new ArrayBuilder[Long]()))
+        starts += start
+        ends += end
+        values += off
+      }
+    }
+
+    val contigs = builders.map { case (contig, (starts, ends, values)) =>
+      (contig, ContigIntervals(starts.result(), ends.result(), if (valueSignature != null) values.result() else null))
+    }.toMap
+
+    new LocusIntervalIndex(contigs, valueSignature, region)
+  }
+}
+
+/**
+  * Intervals sorted by start, consumed in step with a nondecreasing sequence of loci: `advance(l)'
+  * returns the values of the intervals containing `l', in order. Intervals ending at or before a
+  * locus are dropped, so only the intervals overlapping the current locus are held in memory.
+  **/
+class IntervalSweep[U](intervals: Iterator[(Interval[Locus], U)], locusOrd: Ordering[Locus]) {
+  private val it = intervals.buffered
+  private val activeEnds = new mutable.ArrayBuffer[Locus]()
+  private val activeValues = new mutable.ArrayBuffer[U]()
+
+  def advance(l: Locus): IndexedSeq[U] = {
+    var j = 0
+    var i = 0
+    while (i < activeEnds.length) {
+      if (locusOrd.gt(activeEnds(i), l)) {
+        activeEnds(j) = activeEnds(i)
+        activeValues(j) = activeValues(i)
+        j += 1
+      }
+      i += 1
+    }
+    activeEnds.reduceToSize(j)
+    activeValues.reduceToSize(j)
+
+    while (it.hasNext && locusOrd.lteq(it.head._1.start, l)) {
+      val (interval, v) = it.next()
+      if (locusOrd.gt(interval.end, l)) {
+        activeEnds += interval.end
+        activeValues += v
+      }
+    }
+
+    activeValues.toVector
+  }
+}
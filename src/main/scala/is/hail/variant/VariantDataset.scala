@@ -164,7 +164,8 @@ class VariantDatasetFunctions(private val vsm: VariantSampleMatrix) extends AnyV
     CalculateConcordance(vsm, other)
   }
 
-  def exportPlink(path: String, famExpr: String = "id = s") {
+  def exportPlink(path: String, famExpr: String = "id = s", perContig: Boolean = false,
+    parallelism: Int = ExportBedBimFam.defaultParallelism) {
     require(vsm.wasSplit)
     vsm.requireColKeyString("export plink")
 
@@ -227,16 +228,22 @@ class VariantDatasetFunctions(private val vsm: VariantSampleMatrix) extends AnyV
            |  Bad sample IDs: @1 """.stripMargin, badSampleIds)
     }
 
-    val bedHeader = Array[Byte](108, 27, 1)
+    val hConf = vsm.hc.hadoopConf
+    val tmp = hConf.getTemporaryFile(vsm.hc.tmpDir)
 
-    // FIXME: don't reevaluate the upstream RDD twice
-    vsm.rdd2.mapPartitions(
-      ExportBedBimFam.bedRowTransformer(vsm.nSamples, vsm.rdd2.typ.rowType)
-    ).saveFromByteArrays(path + ".bed", vsm.hc.tmpDir, header = Some(bedHeader))
+    val parts = ExportBedBimFam.writeParts(vsm.rdd2.rdd, vsm.rdd2.typ.rowType, vsm.nSamples, tmp)
 
-    vsm.rdd2.mapPartitions(
-      ExportBedBimFam.bimRowTransformer(vsm.rdd2.typ.rowType)
-    ).writeTable(path + ".bim", vsm.hc.tmpDir)
+    val filesets =
+      if (perContig)
+        parts.map(_.contig).distinct.map(contig => (path + "." + contig, parts.filter(_.contig == contig)))
+      else
+        Array((path, parts))
+
+    if (filesets.isEmpty)
+      warn(s"export plink: no variants, no filesets written to `$path'")
+
+    ExportBedBimFam.mergeParts(hConf, tmp, vsm.rdd2.getNumPartitions, filesets, parallelism)
+    hConf.delete(tmp, recursive = true)
 
     val famRows = vsm
       .sampleIdsAndAnnotations
@@ -246,11 +253,13 @@ class VariantDatasetFunctions(private val vsm: VariantSampleMatrix) extends AnyV
         famFns.map(_ (a)).mkString("\t")
       }
 
-    vsm.hc.hadoopConf.writeTextFile(path + ".fam")(out =>
-      famRows.foreach(line => {
-        out.write(line)
-        out.write("\n")
-      }))
+    filesets.foreach { case (root, _) =>
+      hConf.writeTextFile(root + ".fam")(out =>
+        famRows.foreach(line => {
+          out.write(line)
+          out.write("\n")
+        }))
+    }
   }
 
   def filterAlleles(filterExpr: String, variantExpr: String = "",
@@ -380,12 +389,11 @@ g = let newgt = gtIndex(oldToNew[gtj(g.GT)], oldToNew[gtk(g.GT)]) and
 
     val iList2 = IntervalTree.annotationTree(ab.result())
 
+    val indexBc = vsm.sparkContext.broadcast(LocusIntervalIndex(vsm.genomeReference, iList.map(_._1).toArray))
     if (keep)
-      vsm.copy(rdd = vsm.rdd.filterIntervals(iList2))
-    else {
-      val iListBc = vsm.sparkContext.broadcast(iList)
-      vsm.filterVariants { (v, va, gs) => !iListBc.value.contains(v.asInstanceOf[Variant].locus) }
-    }
+      vsm.copy(rdd = vsm.rdd.filterIntervals(iList2, (v: Annotation) => indexBc.value.contains(v.asInstanceOf[Variant].locus)))
+    else
+      vsm.filterVariants { (v, va, gs) => !indexBc.value.contains(v.asInstanceOf[Variant].locus) }
   }
 
   /**
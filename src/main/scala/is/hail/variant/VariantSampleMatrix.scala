@@ -7,11 +7,11 @@ import is.hail.check.Gen
 import is.hail.expr._
 import is.hail.io.VCFMetadata
 import is.hail.io.vcf.ExportVCF
-import is.hail.keytable.KeyTable
+import is.hail.keytable.{KeyTable, KeyTableIndex}
 import is.hail.methods.Aggregators.SampleFunctions
 import is.hail.methods._
 import is.hail.sparkextras._
-import is.hail.rvd.{OrderedRVD, OrderedRVType}
+import is.hail.rvd.{AlignedRVIterator, OrderedRVD, OrderedRVPartitioner, OrderedRVType}
 import is.hail.stats.RegressionUtils
 import is.hail.utils._
 import is.hail.{HailContext, utils}
@@ -161,8 +161,10 @@ object VariantSampleMatrix {
     val globalAnnotation = JSONAnnotationImpex.importAnnotation(metadata.global_annotation,
       globalSignature, "global")
 
-    val ids = sampleInfo.map(_._1)
-    val annotations = sampleInfo.map(_._2)
+    val groups = ColumnGroups.read(hConf, dirname, sSignature, saSignature, metadata.n_partitions)
+
+    val ids = sampleInfo.map(_._1) ++ groups.flatMap(_.sampleIds)
+    val annotations = sampleInfo.map(_._2) ++ groups.flatMap(_.sampleAnnotations)
 
     (VSMFileMetadata(VSMMetadata(sSignature, saSignature, vSignature, vaSignature, globalSignature, genotypeSignature, metadata.split),
       VSMLocalValue(globalAnnotation, ids, annotations)),
@@ -258,8 +260,118 @@ object VariantSampleMatrix {
     require(datasets.length >= 2)
 
     checkDatasetSchemasCompatible(datasets)
-    val (first, others) = (datasets.head, datasets.tail)
-    first.copyLegacy(rdd = first.sparkContext.union(datasets.map(_.rdd)))
+    datasets.head.copy2(rdd2 = OrderedRVD.union(datasets.map(_.rdd2)))
+  }
+
+  def joinAll(datasets: java.util.ArrayList[VariantSampleMatrix], joinType: String): VariantSampleMatrix =
+    joinAll(datasets.asScala.toArray, joinType)
+
+  /**
+    * Concatenates the samples of `datasets', aligning their variants in one pass. With an inner
+    * join, the result has the variants in every dataset; with an outer join, those in any dataset,
+    * with missing genotypes for the samples of datasets without the variant. Variant and global
+    * annotations are taken from the first dataset with the variant.
+    **/
+  def joinAll(datasets: Array[VariantSampleMatrix], joinType: String = "inner"): VariantSampleMatrix = {
+    require(datasets.nonEmpty)
+    if (joinType != "inner" && joinType != "outer")
+      fatal(s"Unknown join type `$joinType'. Choose from `inner' or `outer'.")
+
+    val first = datasets(0)
+    datasets.indices.tail.foreach { i =>
+      val vds = datasets(i)
+      if (vds.wasSplit != first.wasSplit)
+        warn(
+          s"""joining split and unsplit datasets
+             |  datasets[0] was split: ${ first.wasSplit }
+             |  datasets[$i] was split: ${ vds.wasSplit }""".stripMargin)
+
+      def check(what: String, t1: Type, t2: Type) {
+        if (t1 != t2)
+          fatal(
+            s"""cannot join datasets with different $what schemata
+               |  Schema in datasets[0]: @1
+               |  Schema in datasets[$i]: @2""".stripMargin,
+            t1.toPrettyString(compact = true),
+            t2.toPrettyString(compact = true))
+      }
+
+      check("genotype", first.genotypeSignature, vds.genotypeSignature)
+      check("sample", first.sSignature, vds.sSignature)
+      check("sample annotation", first.saSignature, vds.saSignature)
+      check("variant", first.vSignature, vds.vSignature)
+      check("variant annotation", first.vaSignature, vds.vaSignature)
+    }
+
+    val newSampleIds = datasets.flatMap(_.sampleIds).toIndexedSeq
+    val duplicates = newSampleIds.duplicates()
+    if (duplicates.nonEmpty)
+      fatal("duplicate sample IDs: @1", duplicates)
+
+    val outer = joinType == "outer"
+    if (outer && first.genotypeSignature.required)
+      fatal(s"cannot fill in missing genotypes of required type ${ first.genotypeSignature }")
+
+    val typ = first.rdd2.typ
+    val rvds = datasets.map(_.rdd2)
+    val rangeBounds = OrderedRVD.unionRangeBounds(typ, rvds.map(_.partitioner))
+    val partitioner = new OrderedRVPartitioner(rangeBounds.length + 1, typ.partitionKey, typ.kType,
+      UnsafeIndexedSeq(TArray(typ.pkType), rangeBounds))
+
+    val localRowType = typ.rowType
+    val tgs = localRowType.fieldType(3).asInstanceOf[TArray]
+    val nSamples = datasets.map(_.nSamples)
+    val nNewSamples = newSampleIds.length
+
+    val joined = OrderedRVD.alignPartitions(rvds, partitioner) { its =>
+      val region = MemoryBuffer()
+      val rvb = new RegionValueBuilder(region)
+      val rv = RegionValue(region)
+
+      new AlignedRVIterator(its, typ.kInRowOrd)
+        .filter(group => outer || group.forall(_ != null))
+        .map { group =>
+          var r = 0
+          while (group(r) == null)
+            r += 1
+          val firstRV = group(r)
+
+          region.clear()
+          rvb.start(localRowType)
+          rvb.startStruct()
+          rvb.addField(localRowType, firstRV, 0) // pk
+          rvb.addField(localRowType, firstRV, 1) // v
+          rvb.addField(localRowType, firstRV, 2) // va
+          rvb.startArray(nNewSamples)
+          r = 0
+          while (r < group.length) {
+            val grv = group(r)
+            var i = 0
+            if (grv != null) {
+              val gsOffset = localRowType.loadField(grv.region, grv.offset, 3)
+              assert(tgs.loadLength(grv.region, gsOffset) == nSamples(r))
+              while (i < nSamples(r)) {
+                rvb.addElement(tgs, grv.region, gsOffset, i)
+                i += 1
+              }
+            } else {
+              while (i < nSamples(r)) {
+                rvb.setMissing()
+                i += 1
+              }
+            }
+            r += 1
+          }
+          rvb.endArray()
+          rvb.endStruct()
+          rv.setOffset(rvb.end())
+          rv
+        }
+    }
+
+    first.copy2(sampleIds = newSampleIds,
+      sampleAnnotations = datasets.flatMap(_.sampleAnnotations).toIndexedSeq,
+      rdd2 = OrderedRVD(typ, partitioner, joined))
   }
 }
 
@@ -532,8 +644,8 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
     }
 
     val signature = TStruct("pk" -> pkType, "v" -> keyType, Annotation.VARIANT_HEAD -> TStruct.empty(), Annotation.GENOTYPE_HEAD -> TArray(resultType))
-    val rdd = keyedRDD
-      .aggregateByKey(zero)(seqOp, combOp)
+    val keyOrd = keyType.ordering(missingGreatest = true)
+    val rdd = SpillingAggregator.aggregateByKey(keyedRDD, zero, keyedRDD.getNumPartitions, keyOrd)(seqOp, combOp)
       .mapPartitions { it =>
         val region = MemoryBuffer()
         val rv = RegionValue(region)
@@ -856,26 +968,37 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
              |  Computed keys:  [ ${ vdsKeyType.mkString(", ") } ]
              |  Key table keys: [ ${ keyTypes.mkString(", ") } ]""".stripMargin)
 
-      val thisRdd = rdd.map { case (v, (va, gs)) =>
-        keyEC.setAll(v, va)
-        (Row.fromSeq(vdsKeyFs.map(_ ())), v)
-      }
+      if (KeyTableIndex.isSmall(kt, KeyTableIndex.broadcastMaxRows))
+        annotateVariantsIndex(kt, finalType, inserter, product) { (v, va) =>
+          keyEC.setAll(v, va)
+          Row.fromSeq(vdsKeyFs.map(_ ()))
+        }
+      else {
+        val thisRdd = rdd.map { case (v, (va, gs)) =>
+          keyEC.setAll(v, va)
+          (Row.fromSeq(vdsKeyFs.map(_ ())), v)
+        }
 
-      val joinedRDD = keyedRDD
-        .join(thisRdd)
-        .map { case (_, (table, v)) => (v, table: Annotation) }
-        .orderedRepartitionBy(rdd.orderedPartitioner)
+        val joinedRDD = keyedRDD
+          .join(thisRdd)
+          .map { case (_, (table, v)) => (v, table: Annotation) }
+          .orderedRepartitionBy(rdd.orderedPartitioner)
 
-      annotateVariants(joinedRDD, finalType, inserter, product = product)
+        annotateVariants(joinedRDD, finalType, inserter, product = product)
+      }
 
     } else {
       keyTypes match {
         case Array(`vSignature`) =>
-          val ord = keyedRDD
-            .map { case (k, v) => (k.getAs[Annotation](0), v: Annotation) }
-            .toOrderedRDD(rdd.orderedPartitioner)
+          if (KeyTableIndex.isSmall(kt, KeyTableIndex.broadcastMaxRows))
+            annotateVariantsIndex(kt, finalType, inserter, product)((v, _) => Row(v))
+          else {
+            val ord = keyedRDD
+              .map { case (k, v) => (k.getAs[Annotation](0), v: Annotation) }
+              .toOrderedRDD(rdd.orderedPartitioner)
 
-          annotateVariants(ord, finalType, inserter, product = product)
+            annotateVariants(ord, finalType, inserter, product = product)
+          }
 
         case Array(vSignature.partitionKey) =>
           val ord = keyedRDD
@@ -885,39 +1008,59 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
           annotateLoci(ord, finalType, inserter, product = product)
 
         case Array(TInterval(_, _)) if vSignature.isInstanceOf[TVariant] =>
-          implicit val locusOrd = genomeReference.locusOrdering
-          val partBc = sparkContext.broadcast(rdd.orderedPartitioner)
-          val partitionKeyedIntervals = keyedRDD
-            .flatMap { case (k, v) =>
-              val interval = k.getAs[Interval[Locus]](0)
-              val start = partBc.value.getPartitionT(interval.start.asInstanceOf[Annotation])
-              val end = partBc.value.getPartitionT(interval.end.asInstanceOf[Annotation])
-              (start to end).view.map(i => (i, (interval, v)))
+          val gr = genomeReference
+          val intervals = keyedRDD.map { case (k, v) => (k.getAs[Interval[Locus]](0), v) }
+
+          if (KeyTableIndex.isSmall(kt, KeyTableIndex.broadcastMaxRows)) {
+            val indexBc = sparkContext.broadcast(LocusIntervalIndex(gr, intervals.collect(), kt.valueSignature))
+            mapAnnotations(finalType, { (v, va, _) =>
+              val locus = v.asInstanceOf[Variant].locus
+              val annotation =
+                if (product)
+                  indexBc.value.queryValues(locus)
+                else
+                  indexBc.value.queryFirst(locus)
+              inserter(va, annotation)
+            })
+          } else {
+            // each interval is sent to the partitions it overlaps, sorted by start, and merged with the variants
+            val locusOrd = gr.locusOrdering
+            val intervalOrd = gr.intervalOrdering
+            val partBc = sparkContext.broadcast(rdd.orderedPartitioner)
+            val partitionKeyedIntervals = intervals
+              .flatMap { case (interval, v) =>
+                val start = partBc.value.getPartitionT(interval.start.asInstanceOf[Annotation])
+                val end = partBc.value.getPartitionT(interval.end.asInstanceOf[Annotation])
+                (start to end).view.map(i => ((i, interval), v: Annotation))
+              }
+
+            implicit val keyOrd: Ordering[(Int, Interval[Locus])] = new Ordering[(Int, Interval[Locus])] {
+              def compare(x: (Int, Interval[Locus]), y: (Int, Interval[Locus])): Int = intervalOrd.compare(x._2, y._2)
             }
 
-          type IntervalT = (Interval[Locus], Annotation)
-          val nParts = rdd.partitions.length
-          val zipRDD = partitionKeyedIntervals.partitionBy(new Partitioner {
-            def getPartition(key: Any): Int = key.asInstanceOf[Int]
+            val nParts = rdd.partitions.length
+            val zipRDD = partitionKeyedIntervals.repartitionAndSortWithinPartitions(new Partitioner {
+              def getPartition(key: Any): Int = key.asInstanceOf[(Int, Interval[Locus])]._1
 
-            def numPartitions: Int = nParts
-          }).values
+              def numPartitions: Int = nParts
+            })
 
-          val res = rdd.zipPartitions(zipRDD, preservesPartitioning = true) { case (it, intervals) =>
-            val iTree = IntervalTree.annotationTree[Locus, Annotation](intervals.toArray)
+            val res = rdd.zipPartitions(zipRDD, preservesPartitioning = true) { case (it, intervals) =>
+              val sweep = new IntervalSweep(intervals.map { case ((_, interval), v) => (interval, v) }, locusOrd)
 
-            it.map { case (v, (va, gs)) =>
-              val queries = iTree.queryValues(v.asInstanceOf[Variant].locus)
-              val annot = if (product)
-                queries: IndexedSeq[Annotation]
-              else
-                queries.headOption.orNull
+              it.map { case (v, (va, gs)) =>
+                val queries = sweep.advance(v.asInstanceOf[Variant].locus)
+                val annot = if (product)
+                  queries: IndexedSeq[Annotation]
+                else
+                  queries.headOption.orNull
 
-              (v, (inserter(va, annot), gs))
-            }
-          }.asOrderedRDD
+                (v, (inserter(va, annot), gs))
+              }
+            }.asOrderedRDD
 
-          copy(rdd = res, vaSignature = finalType)
+            copy(rdd = res, vaSignature = finalType)
+          }
 
         case other =>
           fatal(
@@ -930,6 +1073,24 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
     }
   }
 
+  // annotates each variant with the rows of the small table `kt' with key `key(v, va)', looked up
+  // in a broadcast index of `kt' without shuffling either side
+  def annotateVariantsIndex(kt: KeyTable, newSignature: Type, inserter: Inserter, product: Boolean)
+    (key: (Annotation, Annotation) => Row): VariantSampleMatrix = {
+    val indexBc = sparkContext.broadcast(KeyTableIndex(kt))
+    mapAnnotations(newSignature, { (v, va, _) =>
+      val k = key(v, va)
+      // rows with missing keys are never joined
+      val missingKey = k.toSeq.exists(_ == null)
+      val annotation =
+        if (product)
+          if (missingKey) IndexedSeq.empty[Annotation] else indexBc.value.get(k)
+        else
+          if (missingKey) null else indexBc.value.getFirst(k)
+      inserter(va, annotation)
+    })
+  }
+
   def annotateLoci(lociRDD: OrderedRDD[Annotation, Annotation, Annotation], newSignature: Type,
     inserter: Inserter, product: Boolean): VariantSampleMatrix = {
 
@@ -1341,7 +1502,7 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
           rdd.orderedPartitioner)
 
       case Array(TInterval(_, _)) if vSignature.isInstanceOf[TVariant] =>
-        implicit val locusOrd = genomeReference.locusOrdering
+        val gr = genomeReference
         val partBc = sparkContext.broadcast(rdd.orderedPartitioner)
         val intRDD = kt.keyedRDD()
           .map { case (k, _) => k.getAs[Interval[Locus]](0) }
@@ -1369,8 +1530,8 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
 
           rdd.subsetPartitions(overlapPartitions)
             .zipPartitions(zipRDD, preservesPartitioning = true) { case (it, intervals) =>
-              val itree = IntervalTree.apply[Locus](intervals.toArray)
-              it.filter { case (v, _) => itree.contains(v.asInstanceOf[Variant].locus) }
+              val index = LocusIntervalIndex(gr, intervals.toArray)
+              it.filter { case (v, _) => index.contains(v.asInstanceOf[Variant].locus) }
             }
         } else {
           val zipRDD = intRDD.partitionBy(new Partitioner {
@@ -1380,8 +1541,8 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
           }).values
 
           rdd.zipPartitions(zipRDD, preservesPartitioning = true) { case (it, intervals) =>
-            val itree = IntervalTree.apply[Locus](intervals.toArray)
-            it.filter { case (v, _) => !itree.contains(v.asInstanceOf[Variant].locus) }
+            val index = LocusIntervalIndex(gr, intervals.toArray)
+            it.filter { case (v, _) => !index.contains(v.asInstanceOf[Variant].locus) }
           }
         }
 
@@ -2279,6 +2440,10 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
 
   def rowType: TStruct = matrixType.rowType
 
+  def appendSamples(dirname: String) {
+    ColumnGroups.append(this, dirname)
+  }
+
   def write(dirname: String, overwrite: Boolean = false): Unit = {
     require(dirname.endsWith(".vds"), "generic dataset write paths must end in '.vds'")
 
@@ -2341,9 +2506,11 @@ class VariantSampleMatrix(val hc: HailContext, val metadata: VSMMetadata,
     * @param append   append file to header
     * @param parallel export VCF in parallel using the path argument as a directory
     * @param metadata metadata to export in header
+    * @param tabix    write a tabix index of the block-compressed output to path.tbi
     */
-  def exportVCF(path: String, append: Option[String] = None, parallel: Boolean = false, metadata: Option[VCFMetadata] = None) {
-    ExportVCF(this, path, append, parallel, metadata)
+  def exportVCF(path: String, append: Option[String] = None, parallel: Boolean = false, metadata: Option[VCFMetadata] = None,
+    tabix: Boolean = false) {
+    ExportVCF(this, path, append, parallel, metadata, tabix)
   }
 
   def minRep(leftAligned: Boolean = false): VariantSampleMatrix = {
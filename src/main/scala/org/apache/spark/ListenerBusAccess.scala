@@ -0,0 +1,14 @@
+package org.apache.spark
+
+import java.util.concurrent.TimeoutException
+
+object ListenerBusAccess {
+  // waits up to `timeoutMillis' for the events posted so far to reach the listeners; false on timeout
+  def waitUntilEmpty(sc: SparkContext, timeoutMillis: Long): Boolean =
+    try {
+      sc.listenerBus.waitUntilEmpty(timeoutMillis)
+      true
+    } catch {
+      case _: TimeoutException => false
+    }
+}
@@ -0,0 +1,8 @@
+package org.apache.spark
+
+import java.io.File
+
+object LocalSpillFile {
+  // a new file in the local directories of this executor, which are removed when it stops
+  def create(): File = SparkEnv.get.blockManager.diskBlockManager.createTempLocalBlock()._2
+}
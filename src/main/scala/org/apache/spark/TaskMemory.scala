@@ -0,0 +1,8 @@
+package org.apache.spark
+
+import org.apache.spark.memory.TaskMemoryManager
+
+object TaskMemory {
+  // the manager of the execution memory of the task, from which memory consumers acquire memory
+  def manager(context: TaskContext): TaskMemoryManager = context.taskMemoryManager()
+}
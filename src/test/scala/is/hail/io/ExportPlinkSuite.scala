@@ -82,4 +82,25 @@ class ExportPlinkSuite extends SparkSuite {
       .hardCalls()
       .same(vds))
   }
+
+  @Test def testPerContig() {
+    val vds = hc.importPlink(bed = "src/test/resources/fastlmmTest.bed",
+      bim = "src/test/resources/fastlmmTest.bim",
+      fam = "src/test/resources/fastlmmTest.fam",
+      nPartitions = Some(7))
+
+    val all = tmpDir.createTempFile("all")
+    vds.exportPlink(all)
+    val exported = hc.importPlinkBFile(all)
+    assert(exported.countVariants() == 2000)
+
+    val byContig = tmpDir.createTempFile("contig")
+    vds.exportPlink(byContig, perContig = true)
+
+    assert(!hadoopConf.exists(byContig + ".2.bed"))
+    for (contig <- Array("1", "3")) {
+      assert(hc.importPlinkBFile(byContig + "." + contig)
+        .same(exported.filterVariantsExpr(s"""v.contig == "$contig"""")))
+    }
+  }
 }
@@ -7,7 +7,7 @@ import is.hail.check.Prop._
 import is.hail.expr._
 import is.hail.utils._
 import is.hail.testUtils._
-import is.hail.variant.{VSMSubgen, Variant, VariantSampleMatrix}
+import is.hail.variant.{GenomeReference, Locus, VSMSubgen, Variant, VariantSampleMatrix}
 import org.testng.annotations.Test
 
 import scala.io.Source
@@ -26,6 +26,27 @@ class ExportVCFSuite extends SparkSuite {
       tolerance = 1e-3))
   }
 
+  @Test def testTabix() {
+    implicit val locusOrd = GenomeReference.GRCh37.locusOrdering
+    val vdsOrig = hc.importVCF("src/test/resources/multipleChromosomes.vcf", nPartitions = Some(10))
+
+    val outFile = tmpDir.createTempFile("export", "vcf.bgz")
+    vdsOrig.exportVCF(outFile, tabix = true)
+
+    assert(hadoopConf.exists(outFile + ".tbi"))
+    assert(vdsOrig.same(hc.importVCF(outFile), tolerance = 1e-3))
+
+    val intervals = IndexedSeq(
+      Interval(Locus("3", 1), Locus("5", 1)),
+      Interval(Locus("22", 1), Locus("22", 100000000)))
+    assert(hc.importVCF(outFile, intervals = Some(intervals))
+      .same(vdsOrig.filterIntervals(IntervalTree(intervals.toArray), keep = true), tolerance = 1e-3))
+
+    TestUtils.interceptFatal("tabix index") {
+      vdsOrig.exportVCF(tmpDir.createTempFile("export", "vcf"), tabix = true)
+    }
+  }
+
   @Test def testSameAsOrigNoCompression() {
     val vcfFile = "src/test/resources/multipleChromosomes.vcf"
     val outFile = tmpDir.createTempFile("export", "vcf")
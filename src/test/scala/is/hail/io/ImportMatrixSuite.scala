@@ -1,6 +1,6 @@
 package is.hail.io
 
-import is.hail.SparkSuite
+import is.hail.{SparkSuite, TestUtils}
 import is.hail.annotations.Annotation
 import is.hail.check.Gen
 import is.hail.check.Prop.forAll
@@ -64,4 +64,44 @@ class ImportMatrixSuite extends SparkSuite {
     }.check()
 
   }
-}
\ No newline at end of file
+
+  @Test def testNumericCellParsers() {
+    val cells = Array("0", "-0", "+1", "17", "-2147483648", "1.5", "-.25", "3.", "1e10", "1E-7", "6.02214076e23",
+      "2.2250738585072014E-308", "4.9e-324", "1.7976931348623157e308", "123456789012345678901234567890",
+      "0.1000000000000000055511151231257827", "9007199254740993", "NaN", "-Infinity", "3.4028235e38", "NA")
+    val line = "row\t" + cells.mkString("\t")
+    val off = 4
+
+    val pd = NumericCellParser(TFloat64(), cells.length, '\t', "NA").asInstanceOf[Float64CellParser]
+    pd.parse(line, off, "row", "file")
+    val pf = NumericCellParser(TFloat32(), cells.length, '\t', "NA").asInstanceOf[Float32CellParser]
+    pf.parse(line, off, "row", "file")
+
+    cells.zipWithIndex.foreach { case (c, i) =>
+      if (c == "NA") {
+        assert(pd.missing(i) && pf.missing(i))
+      } else {
+        assert(!pd.missing(i) && !pf.missing(i))
+        assert(java.lang.Double.compare(pd.values(i), c.toDouble) == 0, c)
+        assert(java.lang.Float.compare(pf.values(i), c.toFloat) == 0, c)
+      }
+    }
+
+    val pl = NumericCellParser(TInt64(), 3, ',', "").asInstanceOf[Int64CellParser]
+    pl.parse("r,-9223372036854775807,,+42", 2, "r", "file")
+    assert(pl.values(0) == -9223372036854775807L && pl.missing(1) && pl.values(2) == 42L)
+
+    TestUtils.interceptFatal("Invalid Int32 at column: 1") {
+      NumericCellParser(TInt32(), 2, '\t', "NA").parse("r\t1\t1.0", 2, "r", "file")
+    }
+    TestUtils.interceptFatal("x is not a Float64") {
+      NumericCellParser(TFloat64(), 1, '\t', "NA").parse("r\tx", 2, "r", "file")
+    }
+    TestUtils.interceptFatal("only 1 elements found") {
+      NumericCellParser(TFloat32(), 2, '\t', "NA").parse("r\t1", 2, "r", "file")
+    }
+    TestUtils.interceptFatal("more data found") {
+      NumericCellParser(TFloat32(), 1, '\t', "NA").parse("r\t1\t2", 2, "r", "file")
+    }
+  }
+}
@@ -0,0 +1,101 @@
+package is.hail.io
+
+import java.nio.{ByteBuffer, ByteOrder}
+import java.nio.charset.StandardCharsets
+
+import breeze.linalg.{DenseMatrix => BDM}
+import is.hail.distributedmatrix.BlockMatrix
+import is.hail.expr._
+import is.hail.utils._
+import is.hail.{SparkSuite, TestUtils}
+import org.testng.annotations.Test
+
+class ImportNpySuite extends SparkSuite {
+
+  // writes `values', given row by row, as an .npy file of dtype `descr'
+  def writeNpy(values: Array[Array[Double]], descr: String, fortranOrder: Boolean): String = {
+    val nRows = values.length
+    val nCols = values.head.length
+    val elementSize = descr.substring(2).toInt
+
+    val dict = s"{'descr': '$descr', 'fortran_order': ${ if (fortranOrder) "True" else "False" }, 'shape': ($nRows, $nCols), }"
+    // numpy pads the header with spaces to a multiple of 64 bytes, ending with a newline
+    val headerLength = ((10 + dict.length + 1 + 63) / 64) * 64 - 10
+    val header = dict + " " * (headerLength - dict.length - 1) + "\n"
+
+    val bb = ByteBuffer.allocate(10 + headerLength + nRows * nCols * elementSize)
+    bb.put(LoadNpy.magic)
+    bb.put(1.toByte)
+    bb.put(0.toByte)
+    bb.order(ByteOrder.LITTLE_ENDIAN).putShort(headerLength.toShort)
+    bb.put(header.getBytes(StandardCharsets.ISO_8859_1))
+
+    bb.order(if (descr(0) == '>') ByteOrder.BIG_ENDIAN else ByteOrder.LITTLE_ENDIAN)
+    val cells =
+      if (fortranOrder)
+        for (j <- 0 until nCols; i <- 0 until nRows) yield values(i)(j)
+      else
+        for (i <- 0 until nRows; j <- 0 until nCols) yield values(i)(j)
+    cells.foreach { x =>
+      descr.substring(1) match {
+        case "f8" => bb.putDouble(x)
+        case "f4" => bb.putFloat(x.toFloat)
+        case "i4" => bb.putInt(x.toInt)
+        case "i8" => bb.putLong(x.toLong)
+      }
+    }
+
+    val f = tmpDir.createTempFile("matrix", ".npy")
+    hadoopConf.writeDataFile(f)(_.write(bb.array()))
+    f
+  }
+
+  val values: Array[Array[Double]] = Array.tabulate(7, 5)((i, j) => i * 10 + j - 20)
+
+  @Test def testDataset() {
+    for (descr <- Array("<f8", ">f8", "<f4", "<i4", "<i8")) {
+      val f = writeNpy(values, descr, fortranOrder = false)
+      val vsm = LoadNpy(hc, f, nPartitions = Some(3))
+      assert(vsm.nSamples == 5)
+      assert(vsm.sampleIds == (0 until 5))
+
+      val rows = vsm.rdd.map { case (v, (_, gs)) =>
+        (v.asInstanceOf[Long], gs.map(_.asInstanceOf[Number].doubleValue()).toArray)
+      }.collect()
+      assert(rows.map(_._1) sameElements (0L until 7L))
+      rows.foreach { case (i, gs) => assert(gs sameElements values(i.toInt), descr) }
+    }
+
+    assert(LoadNpy(hc, writeNpy(values, "<f4", fortranOrder = false)).genotypeSignature == TFloat32())
+
+    TestUtils.interceptFatal("Fortran order") {
+      LoadNpy(hc, writeNpy(values, "<f8", fortranOrder = true))
+    }
+  }
+
+  @Test def testBlockMatrix() {
+    val expected = new BDM[Double](7, 5, Array.tabulate(35)(k => values(k % 7)(k / 7)))
+    for (descr <- Array("<f8", ">f8", "<f4", "<i8"); fortranOrder <- Array(false, true)) {
+      val f = writeNpy(values, descr, fortranOrder)
+      assert(BlockMatrix.importNpy(hc, f, blockSize = 3).toLocalMatrix() == expected, s"$descr $fortranOrder")
+    }
+  }
+
+  @Test def testInvalid() {
+    val f = tmpDir.createTempFile("matrix", ".npy")
+    hadoopConf.writeTextFile(f)(_.write("not an array"))
+    TestUtils.interceptFatal("not a NumPy .npy file") {
+      LoadNpy.readHeader(hadoopConf, f)
+    }
+
+    val unsupported = writeNpy(values, "<f8", fortranOrder = false)
+    val bytes = hadoopConf.readFile(unsupported)(in => org.apache.commons.io.IOUtils.toByteArray(in))
+    val i = new String(bytes, StandardCharsets.ISO_8859_1).indexOf("<f8")
+    bytes(i + 1) = 'u'
+    bytes(i + 2) = '1'
+    hadoopConf.writeDataFile(unsupported)(_.write(bytes))
+    TestUtils.interceptFatal("expected a float32, float64, int32 or int64 array") {
+      LoadNpy.readHeader(hadoopConf, unsupported)
+    }
+  }
+}
@@ -3,10 +3,15 @@ package is.hail.io
 import is.hail.check.Gen._
 import is.hail.check.Prop._
 import is.hail.check.Properties
-import is.hail.io.plink.PlinkLoader
+import is.hail.annotations._
+import is.hail.expr.{TArray, TCall, TStruct}
+import is.hail.io.plink.{MappedBedRDD, PlinkInputFormat, PlinkLoader, PlinkRecord}
 import is.hail.utils._
 import is.hail.variant._
 import is.hail.{SparkSuite, TestUtils}
+import org.apache.hadoop.io.LongWritable
+import org.apache.spark.rdd.RDD
+import org.apache.spark.sql.Row
 import org.testng.annotations.Test
 
 import scala.language.postfixOps
@@ -67,6 +72,39 @@ class ImportPlinkSuite extends SparkSuite {
     Spec.check()
   }
 
+  @Test def testMappedBed() {
+    val bed = "src/test/resources/fastlmmTest.bed"
+    val nSamples = hc.sc.textFile("src/test/resources/fastlmmTest.fam").count().toInt
+    val nVariants = hc.sc.textFile("src/test/resources/fastlmmTest.bim").count().toInt
+
+    val file = MappedBedRDD.localFile(hadoopConf, bed)
+    assert(file.isDefined)
+
+    def calls(rdd: RDD[(LongWritable, PlinkRecord)]): Map[Int, IndexedSeq[Any]] =
+      rdd.mapPartitions { it =>
+        val region = MemoryBuffer()
+        val rvb = new RegionValueBuilder(region)
+        val t = TArray(TStruct("GT" -> TCall()))
+        it.map { case (_, record) =>
+          region.clear()
+          rvb.start(t)
+          record.getValue(rvb)
+          val gs = UnsafeRow.readArray(t, region, rvb.end())
+          (record.getKey, gs.map(g => if (g == null) null else g.asInstanceOf[Row].get(0)).toVector)
+        }
+      }.collect().toMap
+
+    hc.sc.hadoopConfiguration.setInt("nSamples", nSamples)
+    hc.sc.hadoopConfiguration.setBoolean("a2Reference", true)
+    val expected = calls(hc.sc.hadoopFile(bed, classOf[PlinkInputFormat], classOf[LongWritable], classOf[PlinkRecord], 3))
+
+    for (nPartitions <- Seq(1, 3, nVariants + 5)) {
+      val actual = calls(new MappedBedRDD(hc.sc, file.get, nSamples, nVariants, nPartitions, a2Reference = true))
+      assert(actual.size == nVariants)
+      assert(actual == expected)
+    }
+  }
+
   @Test def testA1Major() {
     val plinkFileRoot = tmpDir.createTempFile("plink_reftest")
     hc.importVCF("src/test/resources/sample.vcf")
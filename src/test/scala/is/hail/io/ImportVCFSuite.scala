@@ -2,9 +2,12 @@ package is.hail.io
 
 import is.hail.check.Prop._
 import is.hail.SparkSuite
-import is.hail.io.vcf.LoadVCF
-import is.hail.variant.{Call, Genotype, VSMSubgen, Variant, VariantSampleMatrix}
+import is.hail.annotations._
+import is.hail.expr._
+import is.hail.io.vcf.{FormatParser, FormatParserCompiler, LoadVCF, TabixVCF, VCFLine}
+import is.hail.variant._
 import org.apache.spark.SparkException
+import org.apache.spark.sql.Row
 import org.testng.annotations.Test
 import is.hail.utils._
 import is.hail.testUtils._
@@ -213,4 +216,59 @@ class ImportVCFSuite extends SparkSuite {
     // no error thrown if user provides own header
     hc.importVCFs(Array(tmp1, tmp2), headerFile = Some("src/test/resources/sample.vcf"))
   }
+
+  @Test def testTabixIntervals() {
+    implicit val locusOrd = GenomeReference.GRCh37.locusOrdering
+    val intervals = IndexedSeq(
+      Interval(Locus("22", 16050000), Locus("22", 16100000)),
+      Interval(Locus("22", 16090000), Locus("22", 16200000)),
+      Interval(Locus("22", 17000000), Locus("22", 17400000)),
+      Interval(Locus("20", 1), Locus("20", 1000000)))
+
+    val indexed = hc.importVCF("src/test/resources/sample2.vcf.gz", intervals = Some(intervals))
+    val expected = hc.importVCF("src/test/resources/sample2.vcf")
+      .filterIntervals(IntervalTree(intervals.toArray), keep = true)
+
+    assert(indexed.countVariants() > 0)
+    assert(indexed.same(expected))
+
+    assert(TabixVCF.contigRanges(intervals, GenomeReference.GRCh37).toSeq ==
+      Seq(("20", 1, 1000000), ("22", 16050000, 16200000), ("22", 17000000, 17400000)))
+  }
+
+  @Test def testCompiledFormatParser() {
+    val gType = TStruct(
+      "GT" -> TCall(),
+      "AD" -> TArray(TInt32()),
+      "DP" -> TInt32(),
+      "GQ" -> TInt32(),
+      "PL" -> TArray(TInt32()),
+      "FT" -> TString())
+    val t = TStruct("gs" -> TArray(gType))
+    val samples = Array(
+      "0/1:10,12:22:99:200,0,180",
+      "./.:.:.",
+      "1/1:0,7:7:21:210,21,0",
+      "0/0",
+      "0|1:.:.:.:.")
+
+    val fp = FormatParser(gType, "GT:AD:DP:GQ:PL")
+    val compiled = FormatParserCompiler(fp)
+
+    def parse(f: (VCFLine, RegionValueBuilder) => Unit): Annotation = {
+      val region = MemoryBuffer()
+      val rvb = new RegionValueBuilder(region)
+      rvb.start(t)
+      rvb.startStruct()
+      rvb.startArray(samples.length)
+      f(new VCFLine(samples.mkString("\t")), rvb)
+      rvb.endArray()
+      rvb.endStruct()
+      new UnsafeRow(t, region, rvb.end())
+    }
+
+    val generic = parse((l, rvb) => fp.parseSamplesGeneric(l, rvb, samples.length))
+    assert(parse((l, rvb) => compiled(l, rvb, samples.length)) == generic)
+    assert(generic.asInstanceOf[Row].getAs[IndexedSeq[Row]](0)(2).getAs[Int](2) == 7)
+  }
 }
@@ -1,13 +1,16 @@
 package is.hail.io
 
 import is.hail.SparkSuite
+import is.hail.annotations.Annotation
 import is.hail.check.Gen._
 import is.hail.check.Prop._
 import is.hail.check.{Gen, Properties}
-import is.hail.io.bgen.BGen12ProbabilityArray
+import is.hail.expr.{TFloat32, TStruct}
+import is.hail.io.bgen.{BGen12ProbabilityArray, BgenLoader}
 import is.hail.utils._
 import is.hail.testUtils._
 import is.hail.variant._
+import org.apache.commons.io.IOUtils
 import org.apache.spark.sql.Row
 import org.testng.annotations.Test
 
@@ -262,6 +265,89 @@ class LoadBgenSuite extends SparkSuite {
     hc.importBgen(bgen, Option(sample)).count()
   }
 
+  @Test def testSamplesAndIntervals() {
+    implicit val locusOrd = GenomeReference.defaultReference.locusOrdering
+    val sampleFile = "src/test/resources/example.sample"
+    val intervals = IndexedSeq(
+      Interval(Locus("01", 10000), Locus("01", 50000)),
+      Interval(Locus("01", 40000), Locus("01", 60000)),
+      Interval(Locus("01", 80000), Locus("01", 90001)))
+
+    for (bgen <- Array("src/test/resources/example.v11.bgen", "src/test/resources/example.10bits.bgen",
+      "src/test/resources/example.8bits.bgen")) {
+      hc.indexBgen(bgen)
+      val full = hc.importBgen(bgen, Some(sampleFile))
+      val samples = full.sampleIds.map(_.asInstanceOf[String]).zipWithIndex.filter(_._2 % 3 == 0).map(_._1)
+
+      val subset = hc.importBgen(bgen, Some(sampleFile), samples = Some(samples), intervals = Some(intervals))
+      val expected = full.filterSamplesList(samples.toSet[Annotation])
+        .filterIntervals(IntervalTree(intervals.toArray), keep = true)
+
+      assert(subset.sampleIds == samples)
+      assert(subset.countVariants() > 0)
+      assert(subset.same(expected))
+    }
+  }
+
+  @Test def testDosageOnly() {
+    val sampleFile = "src/test/resources/example.sample"
+
+    for (bgen <- Array("src/test/resources/example.v11.bgen", "src/test/resources/example.10bits.bgen",
+      "src/test/resources/example.8bits.bgen")) {
+      hc.indexBgen(bgen)
+      val expected = hc.importBgen(bgen, Some(sampleFile))
+        .mapWithKeys { (v, s, g) =>
+          ((v, s), Option(g).map { g => val gp = g.asInstanceOf[Row].getAs[IndexedSeq[Double]](1); gp(1) + 2 * gp(2) })
+        }.collectAsMap()
+
+      val dosages = hc.importBgen(bgen, Some(sampleFile), dosageOnly = true)
+      assert(dosages.genotypeSignature == TStruct("dosage" -> TFloat32()))
+
+      val actual = dosages.mapWithKeys { (v, s, g) =>
+        ((v, s), Option(g).map(_.asInstanceOf[Row].getAs[Float](0)))
+      }.collectAsMap()
+
+      assert(actual.size == expected.size)
+      actual.foreach { case (k, d) =>
+        assert((d, expected(k)) match {
+          case (Some(x), Some(y)) => D_==(x, y, 1e-5)
+          case (None, None) => true
+          case _ => false
+        })
+      }
+    }
+  }
+
+  @Test def testResumeIndex() {
+    val bgen = tmpDir.createTempFile("resume", extension = ".bgen")
+    hadoopConf.copy("src/test/resources/example.10bits.bgen", bgen)
+
+    hc.indexBgen(bgen)
+    assert(BgenLoader.isIndexed(hadoopConf, bgen))
+    val expected = hadoopConf.readFile(bgen + ".idx")(is => IOUtils.toByteArray(is))
+
+    val btree = new IndexBTree(bgen + ".idx", hadoopConf)
+    val offsets = Array.tabulate(51)(i => btree(i))
+    btree.close()
+    hadoopConf.delete(bgen + ".idx", recursive = false)
+
+    // an interrupted run that got through 55 variants, checkpointing every 10
+    BgenLoader.findDataBlocks(hadoopConf, bgen, checkpointInterval = 10, until = Some(55))
+    assert(hadoopConf.glob(BgenLoader.partialIndexPath(bgen) + "/[0-9]*").map(_.getPath.getName).toSet ==
+      Set("0-10", "10-20", "20-30", "30-40", "40-50"))
+    assert(BgenLoader.readPartialIndex(hadoopConf, bgen).exists(_ sameElements offsets.take(50)))
+    assert(!BgenLoader.isIndexed(hadoopConf, bgen))
+
+    // a second run resumes from the saved offsets and adds segments 50-60 and 60-70
+    BgenLoader.findDataBlocks(hadoopConf, bgen, checkpointInterval = 10, until = Some(70))
+    assert(BgenLoader.readPartialIndex(hadoopConf, bgen).exists(_.take(51) sameElements offsets))
+
+    hc.indexBgen(bgen)
+    assert(BgenLoader.isIndexed(hadoopConf, bgen))
+    assert(!hadoopConf.exists(BgenLoader.partialIndexPath(bgen)))
+    assert(hadoopConf.readFile(bgen + ".idx")(is => IOUtils.toByteArray(is)) sameElements expected)
+  }
+
   @Test def testReIterate() {
     hc.indexBgen("src/test/resources/example.v11.bgen")
     val vds = hc.importBgen("src/test/resources/example.v11.bgen", Some("src/test/resources/example.sample"))
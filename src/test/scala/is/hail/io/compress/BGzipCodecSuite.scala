@@ -114,4 +114,27 @@ class BGzipCodecSuite extends SparkSuite {
     }
     p.check()
   }
+
+  @Test def testBGzipLines() {
+    val compPath = tmpDir.createTempFile("bgz.test.sample", ".vcf.bgz")
+    hadoopConf.copy("src/test/resources/bgz.test.sample.vcf.bgz", compPath)
+    val fileLength = hadoopConf.getFileSize(compPath)
+
+    val lines = hadoopConf.readLines("src/test/resources/sample.vcf")(_.map(_.value).toArray)
+
+    // 100 splits are smaller than a block, so many partitions find no block of their own
+    for (n <- Array(1, 2, 3, 7, 20, 100)) {
+      val rdd = sc.bgzipFilesLines(Array(compPath), n)
+      assert(rdd.getNumPartitions == n)
+      assert(rdd.map(_.value).collect().sameElements(lines))
+    }
+
+    // nothing is written next to the input
+    assert(hadoopConf.glob(compPath + "*").map(_.getPath.getName).toSet == Set(new hd.fs.Path(compPath).getName))
+
+    assert(BGzipBlockReader.firstBlock(hadoopConf, compPath, 0, fileLength) == 0)
+    val second = BGzipBlockReader.firstBlock(hadoopConf, compPath, 1, fileLength)
+    assert(second > 1 && second < fileLength)
+    assert(BGzipBlockReader.firstBlock(hadoopConf, compPath, second, fileLength) == second)
+  }
 }
@@ -3,7 +3,7 @@ package is.hail.methods
 import is.hail.{SparkSuite, TestUtils}
 import is.hail.annotations._
 import is.hail.expr._
-import is.hail.keytable.KeyTable
+import is.hail.keytable.{KeyTable, KeyTableIndex, SortMergeJoin}
 import is.hail.utils._
 import org.apache.spark.sql.Row
 import org.apache.spark.util.StatCounter
@@ -174,6 +174,64 @@ class KeyTableSuite extends SparkSuite {
     ).rdd.forall { r => !r.toSeq.exists(_ == null) })
   }
 
+  @Test def testSkewedJoin() {
+    // key 0 is frequent on the left, key 1 on the right; missing keys match each other
+    val leftRows = (Array.fill(3000)(0) ++ Array.fill(20)(1) ++ (2 until 300) ++ Array.fill(5)(-1))
+      .zipWithIndex.map { case (k, i) => Row(if (k == -1) null else k, i) }
+    val rightRows = (Array.fill(10)(0) ++ Array.fill(2000)(1) ++ (150 until 400) ++ Array.fill(3)(-1))
+      .zipWithIndex.map { case (k, i) => Row(if (k == -1) null else k, -i) }
+
+    val ktLeft = KeyTable(hc, sc.parallelize(leftRows, 8), TStruct("k" -> TInt32(), "l" -> TInt32()), Array("k"))
+    val ktRight = KeyTable(hc, sc.parallelize(rightRows, 5), TStruct("k" -> TInt32(), "r" -> TInt32()), Array("k"))
+
+    def expected(joinType: String): Map[Seq[Any], Int] = {
+      val matched = for (l <- leftRows; r <- rightRows if l.get(0) == r.get(0)) yield Seq(l.get(0), l.get(1), r.get(1))
+      val leftOnly = leftRows.filter(l => !rightRows.exists(_.get(0) == l.get(0))).map(l => Seq(l.get(0), l.get(1), null))
+      val rightOnly = rightRows.filter(r => !leftRows.exists(_.get(0) == r.get(0))).map(r => Seq(r.get(0), null, r.get(1)))
+      val rows = joinType match {
+        case "inner" => matched
+        case "left" => matched ++ leftOnly
+        case "right" => matched ++ rightOnly
+        case "outer" => matched ++ leftOnly ++ rightOnly
+      }
+      rows.groupBy(identity).mapValues(_.length)
+    }
+
+    for (joinType <- Array("inner", "left", "right", "outer")) {
+      val joined = ktLeft.join(ktRight, joinType, broadcastMaxRows = 0)
+      assert(joined.nPartitions > 8)
+      val actual = joined.rdd.collect().map(_.toSeq).groupBy(identity).mapValues(_.length)
+      assert(actual == expected(joinType), joinType)
+
+      // left and inner joins with a small right table are map-side
+      if (joinType == "left" || joinType == "inner") {
+        val broadcastJoined = ktLeft.join(ktRight, joinType, broadcastMaxRows = rightRows.length)
+        assert(broadcastJoined.nPartitions == 8)
+        assert(broadcastJoined.rdd.collect().map(_.toSeq).groupBy(identity).mapValues(_.length) == expected(joinType), joinType)
+      }
+    }
+  }
+
+  @Test def testJoinSample() {
+    // 20 of 200 partitions of 50 rows each are sampled in full, each standing for 10 partitions
+    val rdd = sc.parallelize((0 until 10000).map(i => (Row(i % 7), Row(i))), 200)
+    val sample = SortMergeJoin.weightedSample(rdd)
+    assert(sample.length == 20 * 50)
+    assert(D_==(sample.map(_._2).sum, 10000.0))
+  }
+
+  @Test def testIsSmall() {
+    val kt = KeyTable(hc, sc.parallelize((0 until 1000).map(i => Row(i, "x" * 100)), 50),
+      TStruct("k" -> TInt32(), "s" -> TString()), Array("k"))
+
+    assert(KeyTableIndex.isSmall(kt, 1000))
+    assert(!KeyTableIndex.isSmall(kt, 999))
+    assert(!KeyTableIndex.isSmall(kt, 0))
+    // each row holds a string of 100 characters
+    assert(!KeyTableIndex.isSmall(kt, 1000, maxBytes = 100 * 1000))
+    assert(KeyTableIndex.isSmall(kt, 1000, maxBytes = 1000 * 1000))
+  }
+
   @Test def testJoinDiffKeyNames() = {
     val inputFile1 = "src/test/resources/sampleAnnotations.tsv"
     val inputFile2 = "src/test/resources/sampleAnnotations2.tsv"
@@ -602,6 +660,37 @@ class KeyTableSuite extends SparkSuite {
     assert(hc.readTable(tmpPath).same(kt))
   }
 
+  @Test def testImportCache() {
+    val file = tmpDir.createTempFile("variantAnnotations", "tsv")
+    hadoopConf.copy("src/test/resources/variantAnnotations.tsv", file)
+    val cacheDir = tmpDir.createTempFile("importCache")
+
+    def nEntries: Int = hadoopConf.glob(cacheDir + "/*.kt").count(!_.getPath.getName.startsWith("."))
+
+    val expected = hc.importTable(file, impute = true)
+
+    hc.enableImportCache(cacheDir, 1L << 30)
+    try {
+      val kt = hc.importTable(file, impute = true)
+      assert(nEntries == 1)
+      assert(kt.same(expected))
+
+      val cached = hc.importTable(file, impute = true)
+      assert(nEntries == 1)
+      assert(cached.same(expected))
+
+      hc.importTable(file)
+      assert(nEntries == 2)
+
+      // every entry is larger than the cache, so only the newest is kept
+      hc.enableImportCache(cacheDir, 1)
+      hc.importTable(file, keyNames = Array("Gene"))
+      assert(nEntries == 1)
+    } finally {
+      hc.disableImportCache()
+    }
+  }
+
   @Test def testSchemaAttrParse() { // FIXME: This should be deleted when not parsing attributes in types
     val kt = KeyTable.range(hc, 10).annotate("FOO = if (false) {AC: [0, 5]} else NA:Struct{AC:Array[Int32]" +
       "@Description=\"Allele count in genotypes, for each ALT allele, in the same order as listed\"@Number=\"A\"@Type=\"Integer\"}")
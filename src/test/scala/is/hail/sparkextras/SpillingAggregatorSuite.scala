@@ -0,0 +1,50 @@
+package is.hail.sparkextras
+
+import is.hail.SparkSuite
+import org.apache.spark.TaskContext
+import org.testng.annotations.Test
+
+import scala.util.Random
+
+class SpillingAggregatorSuite extends SparkSuite {
+
+  @Test def testSpill() {
+    val rand = new Random(5)
+    val kvs = Array.fill(20000)((rand.nextInt(3000), rand.nextInt(100)))
+    val expected = kvs.groupBy(_._1).mapValues(_.map(_._2.toLong).sum)
+
+    // aggregators acquire memory from the memory manager of their task
+    def aggregate(maxBytes: Long): (Int, Array[(Int, Long)]) =
+      sc.parallelize(kvs, 1).mapPartitions { it =>
+        val agg = new SpillingAggregator[Int, Int, Long](TaskContext.get(), _.toLong, _ + _, _ + _, Ordering.Int,
+          maxBytes)
+        it.foreach { case (k, v) => agg.insert(k, v) }
+        Iterator.single((agg.nSpills, agg.iterator.toArray))
+      }.collect()(0)
+
+    val (nSpills, result) = aggregate(16 * 1024)
+    assert(nSpills > 1)
+    assert(result.map(_._1).toSeq == result.map(_._1).sorted.toSeq)
+    assert(result.toMap == expected)
+
+    val (nInMemorySpills, inMemory) = aggregate(Long.MaxValue)
+    assert(nInMemorySpills == 0)
+    assert(inMemory.toMap == expected)
+  }
+
+  @Test def testAggregateByKey() {
+    val rand = new Random(7)
+    val kvs = Array.fill(20000)((s"k${ rand.nextInt(5000) }", rand.nextInt(100)))
+    val rdd = sc.parallelize(kvs, 4)
+
+    val expected = rdd.aggregateByKey(0L)((acc, v) => acc + v, _ + _).collect().toMap
+    for (maxBytes <- Seq(4 * 1024L, Long.MaxValue)) {
+      val result = SpillingAggregator.aggregateByKey(rdd, 0L, 3, Ordering.String, maxBytes)(
+        (acc: Long, v: Int) => acc + v, (a1: Long, a2: Long) => a1 + a2)
+      assert(result.getNumPartitions == 3)
+      val collected = result.collect()
+      assert(collected.length == expected.size)
+      assert(collected.toMap == expected)
+    }
+  }
+}
@@ -90,6 +90,44 @@ class TextTableSuite extends SparkSuite {
       "qPhen" -> TInt32()))
   }
 
+  @Test def testScanners() {
+    val strings = Seq("", "-", "+", ".", "1", ".1", "-1", "+1", "-.1", "1.", "1e1", "-1E1", "1.0e-2", "1e", "1ee1",
+      "1e--2", "1e0.1", "1e1.", "12312398", "-123098172398", "1-1", "true", "True", "TRUE", "tRUE", "false",
+      "False", "FALSE", "falsey", "1:1:A:T", "MT:12309123:A:*", "22:1201092:ATTTAC:T,TACC,*", "1:X:A:T",
+      "1:1:*:T", "1:1:A", "1:1:A:T,", "1:1:AAAT:*A", "1:1:A:**", "1:1:A:,T", ":1:A:T", "a:b:1:A:T", "MT:123123",
+      "1:1", "GRCH12.1:151515", ":1", "1:", "1:1a")
+
+    val checks: Seq[(String, String => Boolean)] = Seq(
+      TextTableReader.booleanRegex -> (TextTableReader.isBoolean _),
+      TextTableReader.variantRegex -> (TextTableReader.isVariant _),
+      TextTableReader.locusRegex -> (TextTableReader.isLocus _),
+      TextTableReader.intRegex -> (TextTableReader.isInt32 _),
+      TextTableReader.doubleRegex -> (TextTableReader.isFloat64 _))
+
+    for ((regex, scanner) <- checks; str <- strings)
+      assert(scanner(str) == str.matches(regex), s"$regex: $str")
+  }
+
+  @Test def testImputeSample() {
+    val rdd = sc.parallelize(Seq(
+      "1 1.5 a",
+      "2 x b",
+      "3 2.5 c",
+      "4 y d"), 2).map { x => WithContext(x, Context(x, "none", None)) }
+
+    val header = Array("1", "2", "3")
+    assert(TextTableReader.imputeTypes(rdd, header, "\\s+", ".", null, sample = Some(1))
+      .sameElements(Array(Some(TInt32()), Some(TFloat64()), Some(TString()))))
+    assert(TextTableReader.imputeTypes(rdd, header, "\\s+", ".", null)
+      .sameElements(Array(Some(TInt32()), Some(TString()), Some(TString()))))
+
+    val (schema, _) = TextTableReader.read(sc)(Array("src/test/resources/variantAnnotations.tsv"),
+      impute = true, imputeSample = Some(100))
+    val (expected, _) = TextTableReader.read(sc)(Array("src/test/resources/variantAnnotations.tsv"),
+      impute = true)
+    assert(schema == expected)
+  }
+
   @Test def testAnnotationsReadWrite() {
     val outPath = tmpDir.createTempFile("annotationOut", ".tsv")
     val p = Prop.forAll(VariantSampleMatrix.gen(hc, VSMSubgen.realistic)
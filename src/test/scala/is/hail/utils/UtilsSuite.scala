@@ -66,6 +66,24 @@ class UtilsSuite extends SparkSuite {
     assert(hadoopConf.stripCodec("file") == "file")
   }
 
+  @Test def testCommitTaskFile() {
+    val dir = tmpDir.createTempFile("commit")
+    val path = dir + "/part-0"
+    val sHadoopConfBc = sc.broadcast(new SerializableHadoopConfiguration(hadoopConf))
+
+    // a second attempt of the task commits over the file of the first
+    for (_ <- 0 until 2)
+      sc.parallelize(Seq(0), 1).foreachPartition { _ =>
+        val hConf = sHadoopConfBc.value.value
+        val attemptPath = RichHadoopConfiguration.taskAttemptPath(path)
+        hConf.writeTextFile(attemptPath)(_.write("contents"))
+        hConf.commitTaskFile(attemptPath, path)
+      }
+
+    assert(hadoopConf.readFile(path)(scala.io.Source.fromInputStream(_).mkString) == "contents")
+    assert(hadoopConf.glob(dir + "/*.attempt-*").isEmpty)
+  }
+
   @Test def testPairRDDNoDup() {
     val answer1 = Array((1, (1, Option(1))), (2, (4, Option(2))), (3, (9, Option(3))), (4, (16, Option(4))))
     val pairRDD1 = sc.parallelize(Array(1, 2, 3, 4)).map { i => (i, i * i) }
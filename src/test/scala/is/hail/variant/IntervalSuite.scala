@@ -3,9 +3,10 @@ package is.hail.variant
 import is.hail.{SparkSuite, TestUtils}
 import is.hail.annotations.Annotation
 import is.hail.check.{Gen, Prop}
-import is.hail.expr.{TArray, TString}
+import is.hail.expr.{TArray, TInt32, TString, TStruct}
 import is.hail.io.annotators.IntervalList
 import is.hail.utils._
+import org.apache.spark.sql.Row
 import org.testng.annotations.Test
 
 class IntervalSuite extends SparkSuite {
@@ -129,6 +130,57 @@ class IntervalSuite extends SparkSuite {
     p.check()
   }
 
+  @Test def testLocusIntervalIndex() {
+    val lgen = Gen.zip(Gen.oneOf("1", "2", "3"), Gen.choose(1, 100)).map { case (c, p) => Locus(c, p) }
+    val g = Gen.zip(Gen.buildableOf[Array, Interval[Locus]](Interval.gen(lgen)), lgen)
+
+    Prop.forAll(g) { case (intervals, locus) =>
+      val index = LocusIntervalIndex(gr, intervals.zipWithIndex.map { case (i, j) => (i, Row(j)) }, TStruct("j" -> TInt32()))
+
+      val expected = intervals.zipWithIndex
+        .filter(_._1.contains(locus))
+        .sortBy { case (i, j) => (i, j) }
+        .map(_._2)
+
+      // intervals across contigs are split, so only compare the order of those on one contig
+      val values = index.queryValues(locus).map(_.getInt(0))
+      values.toSet == expected.toSet &&
+        (!intervals.forall(i => i.start.contig == i.end.contig) || values == expected.toIndexedSeq) &&
+        index.contains(locus) == expected.nonEmpty &&
+        (index.queryFirst(locus) == null) == expected.isEmpty
+    }.check()
+
+    // enough intervals for the implicit tree to have several levels
+    val starts = Array.tabulate(1000)(i => (i * 37) % 500)
+    val ends = starts.zipWithIndex.map { case (s, i) => s + 1 + (i * 13) % 50 }
+    val ci = ContigIntervals(starts, ends, null)
+    (0 until 600).foreach { pos =>
+      val ab = new ArrayBuilder[Int]()
+      ci.query(pos, ab, first = false)
+      val found = ab.result().map(i => (ci.starts(i), ci.ends(i)))
+      val expected = starts.zip(ends).filter { case (s, e) => s <= pos && pos < e }.sorted
+      assert(found sameElements expected, s"$pos")
+      assert(ci.contains(pos) == expected.nonEmpty)
+    }
+  }
+
+  @Test def testIntervalSweep() {
+    val intervals = Array(
+      genomicInterval("1", 10, 20),
+      genomicInterval("1", 12, 15),
+      genomicInterval("1", 30, 40),
+      genomicInterval("2", 5, 6))
+    val sweep = new IntervalSweep(intervals.iterator.zipWithIndex, locusOrd)
+
+    assert(sweep.advance(Locus("1", 5)) == IndexedSeq())
+    assert(sweep.advance(Locus("1", 12)) == IndexedSeq(0, 1))
+    assert(sweep.advance(Locus("1", 12)) == IndexedSeq(0, 1))
+    assert(sweep.advance(Locus("1", 15)) == IndexedSeq(0))
+    assert(sweep.advance(Locus("1", 35)) == IndexedSeq(2))
+    assert(sweep.advance(Locus("2", 5)) == IndexedSeq(3))
+    assert(sweep.advance(Locus("2", 6)) == IndexedSeq())
+  }
+
   @Test def testAnnotateIntervalsAll() {
     val vds = hc.importVCF("src/test/resources/sample2.vcf")
       .annotateVariantsTable(IntervalList.read(hc, "src/test/resources/annotinterall.interval_list"),
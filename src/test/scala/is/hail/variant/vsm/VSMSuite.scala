@@ -241,6 +241,42 @@ class VSMSuite extends SparkSuite {
     }
   }
 
+  @Test def testAppendSamples() {
+    val vds = hc.importVCF("src/test/resources/sample.vcf")
+    val samples = vds.sampleIds
+    val first = samples.take(40).toSet
+    val second = samples.slice(40, 70).toSet
+
+    val f = tmpDir.createTempFile("append", extension = ".vds")
+    vds.filterSamplesList(first).write(f)
+    vds.filterSamplesList(second).appendSamples(f)
+    vds.filterSamplesList(first ++ second, keep = false)
+      .filterVariantsExpr("v.start % 2 == 0")
+      .appendSamples(f)
+
+    val appended = hc.readVDS(f)
+    assert(appended.sampleIds == samples)
+    assert(appended.filterSamplesList(first ++ second).same(vds.filterSamplesList(first ++ second)))
+
+    val last = appended.filterSamplesList(first ++ second, keep = false)
+    assert(last.filterVariantsExpr("v.start % 2 == 0").same(
+      vds.filterSamplesList(first ++ second, keep = false).filterVariantsExpr("v.start % 2 == 0")))
+    assert(last.filterVariantsExpr("v.start % 2 == 1").mapWithKeys((v, s, g) => g).filter(_ != null).count() == 0)
+
+    TestUtils.interceptFatal("already present") {
+      vds.filterSamplesList(second).appendSamples(f)
+    }
+
+    TestUtils.interceptFatal("split status differs") {
+      hc.importVCF("src/test/resources/sample.vcf").renameSamples(samples.map(s => s"$s-new": Annotation).toArray)
+        .splitMulti().appendSamples(f)
+    }
+
+    // the manifest is replaced by a rename, leaving no temporary files behind
+    assert(hadoopConf.glob(f + "/.column_groups.*").isEmpty)
+    assert(ColumnGroups.names(hadoopConf, f).length == 2)
+  }
+
   @Test def testSkipGenotypes() {
     val f = tmpDir.createTempFile("sample", extension = ".vds")
     hc.importVCF("src/test/resources/sample2.vcf")
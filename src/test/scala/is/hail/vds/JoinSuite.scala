@@ -1,10 +1,10 @@
 package is.hail.vds
 
-import is.hail.SparkSuite
+import is.hail.{SparkSuite, TestUtils}
 import is.hail.annotations.UnsafeRow
 import is.hail.expr.{TStruct, TVariant}
 import is.hail.keytable.KeyTable
-import is.hail.variant.{GenomeReference, Variant, VariantDataset}
+import is.hail.variant.{GenomeReference, Variant, VariantDataset, VariantSampleMatrix}
 import is.hail.utils._
 
 import scala.language.implicitConversions
@@ -26,6 +26,43 @@ class JoinSuite extends SparkSuite {
     assert(joined.same(hc.readVDS(joinedPath)))
   }
 
+  @Test def testJoinAll() {
+    val left = hc.importVCF("src/test/resources/joinleft.vcf")
+    val right = hc.importVCF("src/test/resources/joinright.vcf")
+    assert(VariantSampleMatrix.joinAll(Array(left, right)).same(hc.importVCF("src/test/resources/joined.vcf")))
+
+    val vds = hc.importVCF("src/test/resources/sample2.vcf", nPartitions = Some(4)).cache()
+    val ids = vds.sampleIds
+    val bounds = Array(0, ids.length / 3, ids.length / 2, ids.length)
+    val batches = Array.tabulate(3) { i =>
+      vds.filterSamplesList(ids.slice(bounds(i), bounds(i + 1)).toSet).naiveCoalesce(i + 2)
+    }
+    assert(VariantSampleMatrix.joinAll(batches).same(vds))
+
+    // the second batch lacks odd positions
+    val partial = batches.updated(1, batches(1).filterVariantsExpr("v.start % 2 == 0"))
+    val inner = VariantSampleMatrix.joinAll(partial)
+    assert(inner.same(vds.filterVariantsExpr("v.start % 2 == 0")))
+
+    val outer = VariantSampleMatrix.joinAll(partial, "outer")
+    assert(outer.countVariants() == vds.countVariants())
+    val expected = vds.rdd.collect().toMap
+    outer.rdd.collect().foreach { case (v, (_, gs)) =>
+      val gsArray = gs.toArray
+      val expectedGs = expected(v)._2.toArray
+      (0 until gsArray.length).foreach { j =>
+        if (v.asInstanceOf[Variant].start % 2 == 1 && j >= bounds(1) && j < bounds(2))
+          assert(gsArray(j) == null)
+        else
+          assert(gsArray(j) == expectedGs(j))
+      }
+    }
+
+    TestUtils.interceptFatal("duplicate sample IDs") {
+      VariantSampleMatrix.joinAll(Array(vds, vds))
+    }
+  }
+
   @Test def testIterator() {
     val leftVariants = Array(
       Variant("1", 1, "A", "T"),
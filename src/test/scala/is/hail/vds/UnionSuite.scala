@@ -0,0 +1,54 @@
+package is.hail.vds
+
+import is.hail.SparkSuite
+import is.hail.annotations.{Annotation, UnsafeIndexedSeq}
+import is.hail.expr.{TArray, TInt32, TStruct}
+import is.hail.rvd.{OrderedRVD, OrderedRVPartitioner, OrderedRVType}
+import is.hail.variant.VariantSampleMatrix
+import org.apache.spark.sql.Row
+import org.testng.annotations.Test
+
+class UnionSuite extends SparkSuite {
+
+  @Test def testUnion() {
+    val vds = hc.importVCF("src/test/resources/sample2.vcf", nPartitions = Some(8)).cache()
+    val n = vds.countVariants()
+
+    val left = vds.filterVariantsExpr("v.start < 16500000")
+    val right = vds.filterVariantsExpr("v.start >= 16500000")
+    val disjoint = VariantSampleMatrix.union(Array(left, right))
+    assert(disjoint.same(vds))
+    assert(disjoint.nPartitions == vds.nPartitions)
+
+    // interleaved datasets with different partitioning
+    val parts = Array.tabulate(5)(i => vds.filterVariantsExpr(s"v.start % 5 == $i").naiveCoalesce(i + 1))
+    val interleaved = VariantSampleMatrix.union(parts)
+    assert(interleaved.same(vds))
+    assert(interleaved.nPartitions <= vds.nPartitions)
+
+    val twice = VariantSampleMatrix.union(Array(vds, vds.naiveCoalesce(3)))
+    assert(twice.countVariants() == 2 * n)
+    assert(twice.deduplicate().same(vds))
+
+    val empty = vds.filterVariantsExpr("false")
+    assert(VariantSampleMatrix.union(Array(empty, vds, empty)).same(vds))
+  }
+
+  @Test def testUnionRangeBounds() {
+    val typ = new OrderedRVType(Array("k"), Array("k"), TStruct("k" -> TInt32()))
+
+    def partitioner(bounds: Int*): OrderedRVPartitioner =
+      new OrderedRVPartitioner(bounds.length + 1, typ.partitionKey, typ.kType,
+        UnsafeIndexedSeq(TArray(typ.pkType), bounds.map(b => Row(b): Annotation).toIndexedSeq))
+
+    def unionBounds(ps: OrderedRVPartitioner*): Seq[Int] =
+      OrderedRVD.unionRangeBounds(typ, ps.toArray).map(_.asInstanceOf[Row].getInt(0)).toSeq
+
+    val p = partitioner(10, 20, 30)
+    assert(unionBounds(p, p, p) == Seq(10, 20, 30))
+    assert(unionBounds(p, partitioner(100, 200)) == Seq(10, 20, 30, 100, 200))
+    // interleaved bounds are kept once a partition holds a partition of each input
+    assert(unionBounds(p, partitioner(15, 25, 35)) == Seq(10, 20, 30, 35))
+    assert(unionBounds(p, partitioner()) == Seq(10, 20, 30))
+  }
+}